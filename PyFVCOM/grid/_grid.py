@@ -9,6 +9,7 @@ Tools for manipulating and converting unstructured grids in a range of formats.
 from __future__ import print_function, division
 
 import copy
+import hashlib
 import math
 import multiprocessing
 import os
@@ -21,6 +22,7 @@ import matplotlib.path as mpath
 import matplotlib.pyplot as plt
 import networkx
 import numpy as np
+import scipy.sparse
 import scipy.spatial
 import shapefile
 import shapely.geometry
@@ -40,6 +42,233 @@ from PyFVCOM.utilities.general import PassiveStore, fix_range, cart2pol, pol2car
 from PyFVCOM.utilities.time import date_range
 
 
+class GridCache(object):
+    """
+    On-disk cache of derived grid geometry (element areas, control volumes, grid metrics etc.).
+
+    Each grid is identified by a hash of its triangulation and node positions and each set of derived arrays is
+    stored as a `.npz' file named for that hash in the cache directory. Caching is disabled until a directory is
+    given, either here, by setting `cache_dir' on the module-level `grid_cache' instance or with the
+    PYFVCOM_GRID_CACHE environment variable.
+
+    Methods
+    -------
+    key - make the hash for a given grid
+    get - return cached arrays for a grid, if we have them
+    put - store arrays for a grid
+    invalidate - remove cached arrays for a grid (or everything)
+
+    Attributes
+    ----------
+    cache_dir - the directory in which the cached arrays are stored (None disables caching).
+    hits, misses - the number of successful and unsuccessful cache lookups.
+
+    """
+
+    def __init__(self, cache_dir=None):
+        """
+        Parameters
+        ----------
+        cache_dir : str, pathlib.Path, optional
+            The directory in which to store the cached arrays. It is created if it does not exist. If omitted,
+            caching is disabled.
+
+        """
+
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        """ True if we have somewhere to store the cache. """
+        return self.cache_dir is not None
+
+    @staticmethod
+    def key(triangles, x, y, extra=None):
+        """
+        Make the hash which identifies a grid.
+
+        Parameters
+        ----------
+        triangles : np.ndarray
+            The grid triangulation (zero-indexed).
+        x, y : np.ndarray
+            The node positions.
+        extra : str, optional
+            Any additional information on which the cached arrays depend (e.g. a UTM zone).
+
+        Returns
+        -------
+        key : str
+            The hexadecimal SHA-1 hash of the triangulation and node positions.
+
+        """
+
+        digest = hashlib.sha1()
+        for array, dtype in ((triangles, np.int64), (x, np.float64), (y, np.float64)):
+            array = np.ascontiguousarray(np.ma.getdata(array), dtype=dtype)
+            digest.update(str(array.shape).encode())
+            digest.update(array.tobytes())
+        if extra is not None:
+            digest.update(str(extra).encode())
+
+        return digest.hexdigest()
+
+    def _path(self, key, name):
+        return Path(self.cache_dir) / '{}_{}.npz'.format(key, name)
+
+    def get(self, key, name):
+        """
+        Fetch the cached arrays called `name' for the grid identified by `key'.
+
+        Parameters
+        ----------
+        key : str
+            The grid hash (see `GridCache.key').
+        name : str
+            The name of the set of arrays (e.g. 'areas').
+
+        Returns
+        -------
+        arrays : dict, None
+            The cached arrays, or None if we don't have them (or caching is disabled).
+
+        """
+
+        if not self.enabled:
+            return None
+
+        path = self._path(key, name)
+        try:
+            with np.load(path) as cached:
+                arrays = {i: cached[i] for i in cached.files}
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError):
+            # A partially written or otherwise corrupt file. Remove it and start again.
+            warn('Removing unreadable grid cache file {}'.format(path))
+            path.unlink()
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return arrays
+
+    def put(self, key, name, **arrays):
+        """
+        Store the given arrays as `name' for the grid identified by `key'. Does nothing if caching is disabled.
+
+        Parameters
+        ----------
+        key : str
+            The grid hash (see `GridCache.key').
+        name : str
+            The name of the set of arrays (e.g. 'areas').
+
+        Remaining keyword arguments are the arrays to store.
+
+        """
+
+        if not self.enabled:
+            return
+
+        path = self._path(key, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file and move it into place so other processes never read a partial file.
+        temporary = path.with_name('.{}.{}.tmp'.format(path.name, os.getpid()))
+        with open(temporary, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(temporary, path)
+
+    def invalidate(self, key=None, name=None):
+        """
+        Remove cached arrays.
+
+        Parameters
+        ----------
+        key : str, optional
+            The grid hash (see `GridCache.key'). If omitted, entries for all grids are removed.
+        name : str, optional
+            The name of the set of arrays to remove. If omitted, all sets for the grid(s) are removed.
+
+        """
+
+        if not self.enabled or not Path(self.cache_dir).exists():
+            return
+
+        # Match the key and name exactly rather than with a glob as names can contain underscores (e.g. 'elements'
+        # would otherwise also match 'spherical_elements').
+        for path in Path(self.cache_dir).glob('*_*.npz'):
+            this_key, this_name = path.stem.split('_', 1)
+            if (key is None or this_key == key) and (name is None or this_name == name):
+                path.unlink()
+
+    def reset_counters(self):
+        """ Set the hit and miss counters back to zero. """
+        self.hits = 0
+        self.misses = 0
+
+
+# The cache used by the grid readers and Domain methods.
+grid_cache = GridCache(os.environ.get('PYFVCOM_GRID_CACHE'))
+
+
+def _cached_arrays(name, grid, compute, extra=None):
+    """
+    Return the arrays called `name' for the given grid from `grid_cache', computing and storing them if they're
+    missing.
+
+    Parameters
+    ----------
+    name : str
+        The name of the set of arrays (e.g. 'areas').
+    grid : tuple
+        The (triangles, x, y) which identify the grid (see `GridCache.key').
+    compute : callable
+        Function which returns a dict of the arrays to cache.
+    extra : str, optional
+        Additional information to include in the grid hash.
+
+    Returns
+    -------
+    arrays : dict
+        The cached or newly computed arrays.
+
+    """
+
+    if not grid_cache.enabled:
+        return compute()
+
+    key = grid_cache.key(*grid, extra=extra)
+    arrays = grid_cache.get(key, name)
+    if arrays is None:
+        arrays = compute()
+        grid_cache.put(key, name, **arrays)
+
+    return arrays
+
+
+def _pack_points(points):
+    """ Flatten an object array of (n, 2) arrays (or None) into arrays suitable for saving with numpy.savez. """
+    counts = np.asarray([0 if i is None else len(i) for i in points])
+    valid = [i for i in points if i is not None]
+    flat = np.concatenate(valid) if valid else np.zeros((0, 2))
+
+    return flat, counts
+
+
+def _unpack_points(flat, counts):
+    """ Reverse `_pack_points'. """
+    points = np.empty(len(counts), dtype=object)
+    for i, chunk in enumerate(np.split(flat, np.cumsum(counts)[:-1])):
+        points[i] = chunk if counts[i] else None
+
+    return points
+
+
 class GridReaderNetCDF(object):
     """ Read in and store a given FVCOM grid in our data format. """
 
@@ -114,8 +343,8 @@ class GridReaderNetCDF(object):
             # original triangulation used in the model run.
             if self._debug:
                 print("Creating new triangulation since we're missing one", flush=True)
-            triangulation = Triangulation(self.lon, self.lat)
-            self.triangles = triangulation.triangles
+            self.triangles = _cached_arrays('triangulation', (np.zeros((0, 3)), self.lon, self.lat),
+                                            lambda: {'triangles': Triangulation(self.lon, self.lat).triangles})['triangles']
             self.nv = copy.copy(self.triangles.T + 1)
             dims.nele = self.triangles.shape[0]
             warn('Triangulation created from node positions. This may be inconsistent with the original triangulation.')
@@ -342,22 +571,37 @@ class GridReaderNetCDF(object):
         elif self.lon_range != 0 and self.x_range == 0:
             self.native_coordinates = 'spherical'
 
+        # The coordinate conversions are slow for large grids, so use the grid cache, if enabled.
+        def _to_spherical(x, y):
+            return lambda: dict(zip(('lon', 'lat'), lonlat_from_utm(x, y, zone=zone)))
+
+        def _to_cartesian(lon, lat):
+            return lambda: dict(zip(('x', 'y'), utm_from_lonlat(lon, lat)[:2]))
+
         if len(self.lon) > 1:
             if self.lon_range == 0 and self.lat_range == 0:
-                self.lon, self.lat = lonlat_from_utm(self.x, self.y, zone=zone)
+                converted = _cached_arrays('spherical_nodes', (self.triangles, self.x, self.y),
+                                           _to_spherical(self.x, self.y), extra=zone)
+                self.lon, self.lat = converted['lon'], converted['lat']
                 self.lon_range = np.ptp(self.lon)
                 self.lat_range = np.ptp(self.lat)
             if self.x_range == 0 and self.y_range == 0:
-                self.x, self.y, _ = utm_from_lonlat(self.lon, self.lat)
+                converted = _cached_arrays('cartesian_nodes', (self.triangles, self.lon, self.lat),
+                                           _to_cartesian(self.lon, self.lat))
+                self.x, self.y = converted['x'], converted['y']
                 self.x_range = np.ptp(self.x)
                 self.y_range = np.ptp(self.y)
         if len(self.lonc) > 1:
             if self.lonc_range == 0 and self.latc_range == 0:
-                self.lonc, self.latc = lonlat_from_utm(self.xc, self.yc, zone=zone)
+                converted = _cached_arrays('spherical_elements', (self.triangles, self.xc, self.yc),
+                                           _to_spherical(self.xc, self.yc), extra=zone)
+                self.lonc, self.latc = converted['lon'], converted['lat']
                 self.lonc_range = np.ptp(self.lonc)
                 self.latc_range = np.ptp(self.latc)
             if self.xc_range == 0 and self.yc_range == 0:
-                self.xc, self.yc, _ = utm_from_lonlat(self.lonc, self.latc)
+                converted = _cached_arrays('cartesian_elements', (self.triangles, self.lonc, self.latc),
+                                           _to_cartesian(self.lonc, self.latc))
+                self.xc, self.yc = converted['x'], converted['y']
                 self.xc_range = np.ptp(self.xc)
                 self.yc_range = np.ptp(self.yc)
 
@@ -983,39 +1227,41 @@ class OpenBoundary(object):
                 np.asarray(results), (1, 0, 2)))[tbool, ...])
 
     def _prepare_tides(self, amplitudes, phases, latitudes, serial=False,
-            pool_size=None, noisy=False):
+            pool_size=None, noisy=False, chunk_size=None):
         """
-        Prepare the UTide inputs for the constituents we've loaded.
+        Predict the tides at the given positions for the constituents we've loaded.
 
-        """
-        const_idx = np.asarray([ut_constants['const']['name'].tolist().index(i)
-                for i in self.tide.constituents])
-        frq = ut_constants['const']['freq'][const_idx]
+        The astronomical arguments and nodal corrections are calculated once for the time series and all the
+        positions are predicted together (see PyFVCOM.tide.harmonic_prediction), which is much faster than calling
+        utide.reconstruct for each position. The `serial' and `pool_size' arguments are retained for compatibility
+        but are no longer used.
+
+        Parameters
+        ----------
+        amplitudes, phases : np.ndarray
+            The amplitudes and phases (degrees) of the constituents shaped [positions, nconst].
+        latitudes : np.ndarray
+            The latitudes of the positions. Positions with NaN latitudes are returned as NaNs.
+        noisy : bool, optional
+            Set to True to enable verbose output. Defaults to False.
+        chunk_size : int, optional
+            Predict this many times at once to limit memory usage. Defaults to all times at once.
+
+        Returns
+        -------
+        results : np.ndarray
+            The predicted time series shaped [positions, times].
 
-        coef = Bunch(name=self.tide.constituents, mean=0, slope=0)
-        coef['aux'] = Bunch(reftime=729572.47916666674, lind=const_idx, frq=frq)
-        coef['aux']['opt'] = Bunch(twodim=False, nodsatlint=False,
-                nodsatnone=False, gwchlint=False, gwchnone=False,
-                notrend=True, prefilt=[], nodiagn=True)
+        """
+        # Avoid a circular import (PyFVCOM.tide imports PyFVCOM.grid).
+        from PyFVCOM.tide import harmonic_prediction
 
-        # Prepare the time data for predicting the time series. 
-        # UTide needs netCDF date2num times.
+        # Prepare the time data for predicting the time series. Give UTide the epoch for the netCDF date2num times
+        # as it otherwise assumes numeric times are milliseconds since 1970.
         times = mtime(self.tide.time, units='days since 1858-11-17 00:00:00')
-        args = [(latitudes[i], times, coef, amplitudes[i], phases[i], noisy)
-                for i in range(len(latitudes))]
-        if serial:
-            results = []
-            for arg in args:
-                results.append(self._predict_tide(arg))
-        else:
-            if pool_size is None:
-                pool = multiprocessing.Pool()
-            else:
-                pool = multiprocessing.Pool(pool_size)
-            results = pool.map(self._predict_tide, args)
-            pool.close()
 
-        return results
+        return harmonic_prediction(times, amplitudes, phases, latitudes, self.tide.constituents,
+                                   epoch='1858-11-17', chunk_size=chunk_size, noisy=noisy)
 
     @staticmethod
     def _load_harmonics_fvcom(harmonics, constituents, names):
@@ -1829,6 +2075,9 @@ class Domain(object):
     to_nodes - move values from elements to nodes
     to_elements - move values from nodes to elements
     in_element - check if a position in an element
+    in_domain - check if positions are in the grid
+    which_element - find the elements in which positions lie
+    locate - find the elements in which positions lie and their barycentric coordinates
     exterior - return the boundary of the grid
     info - print some information about the grid
 
@@ -1890,8 +2139,108 @@ class Domain(object):
     def __iter__(self):
         return (a for a in self.__dict__.keys() if not a.startswith('_'))
 
+    def _spatial_index(self, name, coordinates, build):
+        """
+        Return the spatial index (KD-tree, trifinder or adjacency tables) called `name' cached on the current grid,
+        building it with `build' if we haven't already done so or if any of the arrays from which it was made have been
+        replaced.
+
+        """
+
+        cache = getattr(self.grid, '_spatial_indices', None)
+        if cache is None:
+            cache = self.grid._spatial_indices = {}
+
+        if name in cache:
+            cached_coordinates, index = cache[name]
+            if all(i is j for i, j in zip(cached_coordinates, coordinates)):
+                return index
+
+        index = build()
+        cache[name] = (coordinates, index)
+
+        return index
+
+    def _kdtree(self, where, cartesian=False, geodesic=False):
+        """
+        Return a KD-tree of the node or element centre positions, built the first time it is requested.
+
+        Parameters
+        ----------
+        where : str
+            'node' or 'element'.
+        cartesian : bool, optional
+            Set to True to use cartesian coordinates. Defaults to False.
+        geodesic : bool, optional
+            Set to True for a tree of the spherical positions on a unit sphere for great circle searches (see
+            `PyFVCOM.grid.find_nearest_point_geodesic'). Overrides `cartesian'.
+
+        Returns
+        -------
+        kdtree : scipy.spatial.cKDTree
+            The tree of the grid positions.
+
+        """
+
+        if geodesic:
+            cartesian = False
+
+        if where == 'node':
+            coordinates = (self.grid.x, self.grid.y) if cartesian else (self.grid.lon, self.grid.lat)
+        elif where == 'element':
+            coordinates = (self.grid.xc, self.grid.yc) if cartesian else (self.grid.lonc, self.grid.latc)
+        else:
+            raise ValueError("Unrecognised grid position `{}'; choose 'node' or 'element'.".format(where))
+
+        if geodesic:
+            return self._spatial_index(('kdtree', where, 'geodesic'), coordinates,
+                                       lambda: scipy.spatial.cKDTree(_unit_sphere(*coordinates)))
+
+        return self._spatial_index(('kdtree', where, cartesian), coordinates,
+                                   lambda: scipy.spatial.cKDTree(np.array(coordinates).T))
+
+    def _trifinder(self, cartesian=False):
+        """
+        Return a matplotlib TriFinder for the grid, built the first time it is requested.
+
+        Parameters
+        ----------
+        cartesian : bool, optional
+            Set to True to use cartesian coordinates. Defaults to False.
+
+        Returns
+        -------
+        finder : matplotlib.tri.TriFinder
+            Callable which returns the element in which each given position lies (-1 for outside the grid).
+
+        """
+
+        if cartesian:
+            coordinates = (self.grid.x, self.grid.y, self.grid.triangles)
+        else:
+            coordinates = (self.grid.lon, self.grid.lat, self.grid.triangles)
+
+        return self._spatial_index(('trifinder', cartesian), coordinates,
+                                   lambda: Triangulation(*coordinates).get_trifinder())
+
+    def _topology(self):
+        """
+        Return the node-to-element and node-to-node adjacency tables for the grid, built the first time they are
+        requested.
+
+        Returns
+        -------
+        topology : PyFVCOM.grid.MeshTopology
+            The adjacency tables for the grid triangulation.
+
+        """
+
+        return self._spatial_index('topology', (self.grid.triangles, self.grid.lon),
+                                   lambda: MeshTopology(self.grid.triangles, len(self.grid.lon)))
+
     @staticmethod
-    def _closest_point(x, y, lon, lat, where, threshold=np.inf, vincenty=False, haversine=False, return_dists=False):
+    def _closest_point(x, y, lon, lat, where, threshold=np.inf, vincenty=False, haversine=False, return_dists=False,
+                       kdtree=None):
         """
         Find the index of the closest node to the supplied position (x, y). Set `cartesian' to True for cartesian
         coordinates (defaults to spherical).
@@ -1918,6 +2267,9 @@ class Domain(object):
             but threshold in metres.
         return_dists : bool, optional
             Return the distance to the identified closest point as well as index, units are as for threshold
+        kdtree : scipy.spatial.cKDTree, optional
+            A tree built from `x' and `y' to reuse for the search or, with `vincenty' or `haversine', one built from
+            the unit sphere positions of `lon' and `lat' (see `PyFVCOM.grid.find_nearest_point_geodesic').
 
         Returns
         -------
@@ -1932,35 +2284,27 @@ class Domain(object):
 
         # We have to split this into two parts: if our threshold is in the same units as the grid (i.e. haversine and
         # vincenty are both False), then we can use the quick find_nearest_point function; if either of haversine or
-        # vincenty have been given, we need to use the distance conversion functions, which are slower.
+        # vincenty have been given, we need to search by great circle distance instead.
         if not vincenty and not haversine:
-            _, _, dist, index = find_nearest_point(x, y, *where, maxDistance=threshold)
+            _, _, dist, index = find_nearest_point(x, y, *where, maxDistance=threshold, kdtree=kdtree)
             if np.any(np.isnan(index)):
                 index[np.isnan(index)] = None
 
             if return_dists:
                 index = [index, dist]
 
-        # Note: this is really slow! Computing the distances between the entire grid and the point of interest is
-        # very slow. There must be a faster way of doing this! which fall inside the `where' bounding box.
-        # TODO: implement a faster conversion
-        if vincenty:
-            grid_pts = np.asarray([lon, lat]).T
-            dist = np.asarray([vincenty_distance(pt_1, where) for pt_1 in grid_pts]) * 1000
-        elif haversine:
-            grid_pts = np.asarray([lon, lat]).T
-            dist = np.asarray([haversine_distance(pt_1, where) for pt_1 in grid_pts]) * 1000
-
         if vincenty or haversine:
-            index = np.argmin(dist)
-            if threshold:
-                if dist.min() < threshold:
-                    index = np.argmin(dist)
-                else:
-                    index = None
-        
+            max_distance = threshold / 1000 if threshold else np.inf  # metres to kilometres
+            _, _, dist, index = find_nearest_point_geodesic(lon, lat, *where, maxDistance=max_distance,
+                                                            vincenty=vincenty, kdtree=kdtree)
+            dist = dist * 1000  # kilometres to metres
+            if np.ndim(where[0]) == 0:
+                # Single positions return a single index (or None if beyond the threshold).
+                dist = dist[0]
+                index = None if np.isnan(index[0]) else int(index[0])
+
             if return_dists:
-                index = [index, dist.min()]
+                index = [index, dist]
 
         return index
 
@@ -1972,7 +2316,8 @@ class Domain(object):
         Parameters
         ----------
         where : list-like
-            Arbitrary x, y position for which to find the closest model grid position.
+            Arbitrary x, y position for which to find the closest model grid position. Give arrays of x and y
+            positions (i.e. shaped (2, n)) to find the closest grid positions for all of them in one go.
         cartesian : bool, optional
             Set to True to use cartesian coordinates. Defaults to False.
         threshold : float, optional
@@ -1997,7 +2342,10 @@ class Domain(object):
         else:
             x, y = self.grid.lon, self.grid.lat
 
-        return self._closest_point(x, y, self.grid.lon, self.grid.lat, where, threshold=threshold, vincenty=vincenty, haversine=haversine, return_dists=return_dists)
+        kdtree = self._kdtree('node', cartesian, geodesic=vincenty or haversine)
+
+        return self._closest_point(x, y, self.grid.lon, self.grid.lat, where, threshold=threshold, vincenty=vincenty, haversine=haversine,
+                                   return_dists=return_dists, kdtree=kdtree)
 
     def closest_element(self, where, cartesian=False, threshold=np.inf, vincenty=False, haversine=False, return_dists=False):
         """
@@ -2007,7 +2355,8 @@ class Domain(object):
         Parameters
         ----------
         where : list-like
-            Arbitrary x, y position for which to find the closest model grid position.
+            Arbitrary x, y position for which to find the closest model grid position. Give arrays of x and y
+            positions (i.e. shaped (2, n)) to find the closest grid positions for all of them in one go.
         cartesian : bool, optional
             Set to True to use cartesian coordinates. Defaults to False.
         threshold : float, optional
@@ -2032,7 +2381,10 @@ class Domain(object):
         else:
             x, y = self.grid.lonc, self.grid.latc
 
-        return self._closest_point(x, y, self.grid.lonc, self.grid.latc, where, threshold=threshold, vincenty=vincenty, haversine=haversine, return_dists=return_dists)
+        kdtree = self._kdtree('element', cartesian, geodesic=vincenty or haversine)
+
+        return self._closest_point(x, y, self.grid.lonc, self.grid.latc, where, threshold=threshold, vincenty=vincenty, haversine=haversine,
+                                   return_dists=return_dists, kdtree=kdtree)
 
     def horizontal_transect_nodes(self, positions):
         """
@@ -2119,14 +2471,20 @@ class Domain(object):
         This differs from self.calculate_control_area_and_volume which provides what's needed for integrating fields
         in the domain. This simply calculates the area of each triangle in the domain.
 
+        The results are stored in (and retrieved from) `PyFVCOM.grid.grid_cache', if enabled.
+
         """
 
         triangles = self.grid.triangles
         x = self.grid.x
         y = self.grid.y
-        self.grid.areas = get_area(np.asarray((x[triangles[:, 0]], y[triangles[:, 0]])).T,
-                                   np.asarray((x[triangles[:, 1]], y[triangles[:, 1]])).T,
-                                   np.asarray((x[triangles[:, 2]], y[triangles[:, 2]])).T)
+
+        def _areas():
+            return {'areas': get_area(np.asarray((x[triangles[:, 0]], y[triangles[:, 0]])).T,
+                                      np.asarray((x[triangles[:, 1]], y[triangles[:, 1]])).T,
+                                      np.asarray((x[triangles[:, 2]], y[triangles[:, 2]])).T)}
+
+        self.grid.areas = _cached_arrays('areas', (triangles, x, y), _areas)['areas']
 
     def calculate_control_area_and_volume(self, **kwargs):
         """
@@ -2138,22 +2496,52 @@ class Domain(object):
             Area of interior control volume (for node value integration)
         self.grid.art2 : np.ndarray
             Sum area of all cells around each node.
+        self.grid.art1_points : np.ndarray
+            The points which form each node control area (only if `return_points' is True).
 
-        Additional kwargs are passed to `PyFVCOM.grid.control_volumes`.
+        Additional kwargs are passed to `PyFVCOM.grid.control_volumes`. Only the areas requested with its
+        `node_control' and `element_control' options are set.
 
         Notes
         -----
 
-        This is a python reimplementation of the FVCOM function CELL_AREA in cell_area.F. Whilst the reimplementation
-        is coded with efficiency in mind (the calculations occur in parallel), this is still slow for large grids.
-        Please be patient!
+        This is a python reimplementation of the FVCOM function CELL_AREA in cell_area.F. The areas for all nodes are
+        calculated in a single vectorised pass.
+
+        The results are stored in (and retrieved from) `PyFVCOM.grid.grid_cache', if enabled.
 
         """
 
-        if 'return_points' in kwargs:
-            self.grid.art1, self.grid.art2, self.grid.art1_points = control_volumes(self.grid.x, self.grid.y, self.grid.triangles, **kwargs)
+        return_points = kwargs.get('return_points', False)
+        grid = (self.grid.triangles, self.grid.x, self.grid.y)
+
+        def _control_volumes():
+            art1, art2, art1_points = control_volumes(self.grid.x, self.grid.y, self.grid.triangles,
+                                                      **dict(kwargs, return_points=True))
+            points, counts = _pack_points(art1_points)
+            return {'art1': art1, 'art2': art2, 'points': points, 'counts': counts}
+
+        node_control = kwargs.get('node_control', True)
+        element_control = kwargs.get('element_control', True)
+
+        if node_control and element_control and (return_points or grid_cache.enabled):
+            # Always include the points when caching so we can satisfy either type of request later. Only the full
+            # calculation is cached, but include the options in the hash so it's clear what the arrays are.
+            options = 'node_control={},element_control={}'.format(node_control, element_control)
+            cached = _cached_arrays('control_volumes', grid, _control_volumes, extra=options)
+            self.grid.art1, self.grid.art2 = cached['art1'], cached['art2']
+            if return_points:
+                self.grid.art1_points = _unpack_points(cached['points'], cached['counts'])
         else:
-            self.grid.art1, self.grid.art2 = control_volumes(self.grid.x, self.grid.y, self.grid.triangles, **kwargs)
+            # control_volumes only returns the areas (and points) we've asked for.
+            areas = control_volumes(self.grid.x, self.grid.y, self.grid.triangles, **kwargs)
+            areas = list(areas) if isinstance(areas, tuple) else [areas]
+            if node_control:
+                self.grid.art1 = areas.pop(0)
+            if element_control:
+                self.grid.art2 = areas.pop(0)
+            if node_control and return_points:
+                self.grid.art1_points = areas.pop(0)
 
     def calculate_element_lengths(self):
         """
@@ -2164,9 +2552,15 @@ class Domain(object):
         self.grid.lengths : np.ndarray
             The lengths of each vertex in each element in the grid.
 
+        Notes
+        -----
+        The results are stored in (and retrieved from) `PyFVCOM.grid.grid_cache', if enabled.
+
         """
 
-        self.grid.lengths = element_side_lengths(self.grid.triangles, self.grid.x, self.grid.y)
+        grid = (self.grid.triangles, self.grid.x, self.grid.y)
+        self.grid.lengths = _cached_arrays('element_lengths', grid,
+                                           lambda: {'lengths': element_side_lengths(*grid)})['lengths']
 
     def gradient(self, field):
         """
@@ -2187,7 +2581,56 @@ class Domain(object):
 
         return dx, dy
 
-    def to_nodes(self, field):
+    def _node_element_operator(self, direction, weighted=False):
+        """
+        Return the cached sparse operator for moving values between the nodes and elements of the current grid,
+        building it if we haven't already done so (or if the triangulation has changed since).
+
+        Parameters
+        ----------
+        direction : str
+            'nodes' for the elements to nodes operator or 'elements' for the nodes to elements operator.
+        weighted : bool, optional
+            Set to True to weight by element areas (for 'nodes') or node control volume areas (for 'elements').
+
+        Returns
+        -------
+        operator : scipy.sparse.csr_matrix
+            The sparse operator (see `PyFVCOM.grid.elems2nodes_operator' and `PyFVCOM.grid.nodes2elems_operator').
+
+        """
+
+        cache = getattr(self.grid, '_node_element_operators', None)
+        if cache is None:
+            cache = self.grid._node_element_operators = {}
+
+        key = (direction, weighted)
+        if key in cache and cache[key][0] is self.grid.triangles:
+            return cache[key][1]
+
+        nvert = len(self.grid.x)
+        if direction == 'nodes':
+            weights = None
+            if weighted:
+                if not hasattr(self.grid, 'areas'):
+                    self.calculate_areas()
+                weights = self.grid.areas
+            operator = elems2nodes_operator(self.grid.triangles, nvert=nvert, weights=weights)
+        elif direction == 'elements':
+            weights = None
+            if weighted:
+                if not hasattr(self.grid, 'art1'):
+                    self.calculate_control_area_and_volume()
+                weights = self.grid.art1
+            operator = nodes2elems_operator(self.grid.triangles, nvert=nvert, weights=weights)
+        else:
+            raise ValueError("Unrecognised direction `{}'; choose 'nodes' or 'elements'.".format(direction))
+
+        cache[key] = (self.grid.triangles, operator)
+
+        return operator
+
+    def to_nodes(self, field, weighted=False):
         """
         Calculate a nodal value based on the average value for the elements
         of which it is a part. This necessarily involves an average, so the
@@ -2197,18 +2640,26 @@ class Domain(object):
         ----------
         field : np.ndarray
             Array of unstructured grid element values to move to the grid
-            nodes.
+            nodes. The last dimension must be the element dimension.
+        weighted : bool, optional
+            Set to True to weight each element by its area. As each element
+            contributes a third of its area to each of its nodes' control
+            volumes, this gives the control volume average. Defaults to False.
 
         Returns
         -------
         nodes : np.ndarray
             Array of values at the grid nodes.
 
+        Notes
+        -----
+        The sparse operator is built once for the grid and reused for subsequent calls.
+
         """
 
-        return elems2nodes(field, self.grid.triangles)
+        return elems2nodes(field, self.grid.triangles, operator=self._node_element_operator('nodes', weighted))
 
-    def to_elements(self, field):
+    def to_elements(self, field, weighted=False):
         """
         Calculate an element-centre value based on the average value for the
         nodes from which it is formed. This involves an average, so the
@@ -2217,16 +2668,24 @@ class Domain(object):
         Parameters
         ----------
         field : np.ndarray
-            Array of unstructured grid node values to move to the element centres.
+            Array of unstructured grid node values to move to the element centres. The last dimension must be the
+            node dimension.
+        weighted : bool, optional
+            Set to True to weight each node by its control volume area (`self.grid.art1', which is calculated if it
+            is missing). Defaults to False.
 
         Returns
         -------
         elems : np.ndarray
-            Array of values at the grid nodes.
+            Array of values at the element centres.
+
+        Notes
+        -----
+        The sparse operator is built once for the grid and reused for subsequent calls.
 
         """
 
-        return nodes2elems(field, self.grid.triangles)
+        return nodes2elems(field, self.grid.triangles, operator=self._node_element_operator('elements', weighted))
 
     def in_element(self, x, y, element, cartesian=False):
         """
@@ -2286,9 +2745,8 @@ class Domain(object):
             grid_x = self.grid.lon
             grid_y = self.grid.lat
 
-        tri = Triangulation(grid_x, grid_y, self.grid.triangles)
-        finder = tri.get_trifinder()
-        in_domain_xy = finder(x,y) != -1
+        finder = self._trifinder(cartesian)
+        in_domain_xy = finder(np.asarray(x, dtype=float), np.asarray(y, dtype=float)) != -1
 
         if z is not None:
             if zeta_timestep == None:
@@ -2308,7 +2766,8 @@ class Domain(object):
                 
             elif z_meth == 'barycentric':
                 xy_red = np.asarray([x,y]).T[in_domain_xy]
-                interped_h = interpolate_node_barycentric(xy_red, grid_h, grid_x, grid_y, self.grid.triangles)
+                interped_h = interpolate_node_barycentric(xy_red, grid_h, grid_x, grid_y, self.grid.triangles,
+                                                          finder=finder)
                 in_depth = z[in_domain_xy] <= interped_h
                 in_domain_xy[in_domain_xy==True] = in_depth
 
@@ -2325,16 +2784,60 @@ class Domain(object):
 
         Parameters
         ----------
-        x, y : float
-            The position in spherical coordinates (or cartesian if cartesian=True).
+        x, y : float, np.ndarray
+            The position(s) in spherical coordinates (or cartesian if cartesian=True).
+
+        Returns
+        -------
+        ele : np.ndarray
+            For a single position, an array of the element ID the point is in (empty if the point is outside the
+            grid). For arrays of positions, the element ID for each position (-1 for those outside the grid).
+
+        Notes
+        -----
+        The search uses a TriFinder which is built once for the grid and reused for subsequent calls.
+
+        """
+
+        elements = self._trifinder(cartesian)(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+
+        if np.ndim(x) == 0:
+            elements = np.atleast_1d(elements)
+            return elements[elements != -1]
+
+        return elements
+
+    def locate(self, x, y, cartesian=False):
+        """
+        Find the element in which each position lies and the position's barycentric coordinates within it.
+
+        Parameters
+        ----------
+        x, y : float, np.ndarray
+            The position(s) in spherical coordinates (or cartesian if cartesian=True).
 
         Returns
         -------
-        ele : int
-            The element ID the point is in.
+        elements : np.ndarray
+            The element ID for each position (-1 for those outside the grid).
+        weights : np.ndarray
+            The weights for each of the element's nodes (self.grid.triangles[elements]) [n, 3]. Multiplying node
+            values by these and summing interpolates linearly to the positions. NaN for positions outside the grid.
+
+        Notes
+        -----
+        The search uses a TriFinder which is built once for the grid and reused for subsequent calls.
 
         """
-        return np.where([self.in_element(x, y, this_ele, cartesian=cartesian) for this_ele in np.arange(0, len(self.grid.lonc))])[0]
+
+        if cartesian:
+            grid_x, grid_y = self.grid.x, self.grid.y
+        else:
+            grid_x, grid_y = self.grid.lon, self.grid.lat
+
+        positions = np.column_stack((np.ravel(x), np.ravel(y)))
+
+        return _barycentric_weights(positions, grid_x, grid_y, self.grid.triangles, finder=self._trifinder(cartesian))
 
     def exterior(self):
         """
@@ -2382,6 +2885,46 @@ def mp_interp_func(input):
     interp = LinearNDInterpolator((lon, lat), data)
     return interp((x, y))
 
+def linear_interpolation_weights(points, targets):
+    """
+    Make a reusable linear interpolation operator from scattered `points' to `targets'.
+
+    The weights are the barycentric coordinates of the targets in the Delaunay triangulation of the points (the same
+    triangulation scipy.interpolate.LinearNDInterpolator makes), so applying them to any number of fields on the
+    same points is just a sparse matrix product.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        The positions of the data [npoints, 2].
+    targets : np.ndarray
+        The positions onto which to interpolate [ntargets, 2].
+
+    Returns
+    -------
+    weights : scipy.sparse.csr_matrix
+        The interpolation weights [ntargets, npoints]. `weights @ data' interpolates `data' [npoints, ...].
+    outside : np.ndarray
+        True for the targets outside the triangulation (whose rows in `weights' are empty).
+
+    """
+
+    points = np.asarray(points, dtype=float)
+    targets = np.asarray(targets, dtype=float)
+
+    triangulation = scipy.spatial.Delaunay(points)
+    simplex = triangulation.find_simplex(targets)
+    inside = simplex >= 0
+    transform = triangulation.transform[simplex[inside]]
+    partial_weights = np.einsum('ijk,ik->ij', transform[:, :2, :], targets[inside] - transform[:, 2, :])
+    weights = np.column_stack((partial_weights, 1 - partial_weights.sum(axis=1)))
+    rows = np.repeat(np.flatnonzero(inside), 3)
+    columns = triangulation.simplices[simplex[inside]].ravel()
+    weights = scipy.sparse.csr_matrix((weights.ravel(), (rows, columns)), shape=(len(targets), len(points)))
+
+    return weights, ~inside
+
+
 def read_sms_mesh(mesh, nodestrings=False):
     """
     Reads in the SMS unstructured grid format. Also creates IDs for output to
@@ -3494,7 +4037,7 @@ def shp2cst(file, output_file):
                 file_out.write('\t{}\t{}\t{}\n'.format(float(arcPos[0]), float(arcPos[1]), float(z)))
 
 
-def find_nearest_point(grid_x, grid_y, x, y, maxDistance=np.inf):
+def find_nearest_point(grid_x, grid_y, x, y, maxDistance=np.inf, kdtree=None):
     """
     Given some point(s) `x' and `y', find the nearest grid node in `grid_x' and `grid_y'.
 
@@ -3515,6 +4058,9 @@ def find_nearest_point(grid_x, grid_y, x, y, maxDistance=np.inf):
     maxDistance : float, optional
         Unless given, there is no upper limit on the distance away from the source for which a result is deemed
         valid. Any other value specified here limits the upper threshold.
+    kdtree : scipy.spatial.cKDTree, optional
+        A tree already built from `grid_x' and `grid_y'. Give this to avoid rebuilding the tree when searching the
+        same grid repeatedly.
 
     Returns
     -------
@@ -3539,7 +4085,8 @@ def find_nearest_point(grid_x, grid_y, x, y, maxDistance=np.inf):
     else:
         search_xy = np.array((x, y)).T
 
-    kdtree = scipy.spatial.cKDTree(grid_xy)
+    if kdtree is None:
+        kdtree = scipy.spatial.cKDTree(grid_xy)
     dist, indices = kdtree.query(search_xy)
     # Replace positions outside the grid with NaNs. Should these simply be removed?
     if np.any(indices == len(grid_xy)):
@@ -3559,22 +4106,108 @@ def find_nearest_point(grid_x, grid_y, x, y, maxDistance=np.inf):
     return nearest_x, nearest_y, dist, indices
 
 
-def element_side_lengths(triangles, x, y):
+def _unit_sphere(lon, lat):
+    """ Convert decimal degree longitudes and latitudes to cartesian (x, y, z) positions on a unit sphere. """
+    lon = np.deg2rad(np.asarray(lon, dtype=float))
+    lat = np.deg2rad(np.asarray(lat, dtype=float))
+
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def find_nearest_point_geodesic(grid_lon, grid_lat, lon, lat, maxDistance=np.inf, vincenty=False, kdtree=None,
+                                candidates=8):
     """
-    Given a list of triangle nodes, calculate the length of each side of each
-    triangle and return as an array of lengths. Units are in the original input
-    units (no conversion from lat/long to metres, for example).
+    Given some point(s) `lon' and `lat', find the nearest grid node in `grid_lon' and `grid_lat' by great circle
+    distance.
 
-    The arrays triangles, x and y can be created by running read_sms_mesh(),
-    read_fvcom_mesh() or read_mike_mesh() on a given SMS, FVCOM or MIKE grid
-    file.
+    The search uses a KD-tree of the positions on a unit sphere, in which the straight line distances increase
+    monotonically with great circle distance, so the closest point in the tree is the closest point with the
+    haversine formula. For Vincenty's formula, the closest few points in the tree are checked to account for the
+    ellipsoid.
 
     Parameters
     ----------
-    triangles : np.ndarray
-        Integer array of shape (ntri, 3). Each triangle is composed of
-        three points and this contains the three node numbers (stored in
-        nodes) which refer to the coordinates in `x' and `y' (see below). Give as
+    grid_lon, grid_lat : np.ndarray
+        Decimal degree positions within which to search for the nearest point given in `lon' and `lat'.
+    lon, lat : float, np.ndarray
+        Decimal degree position(s) for which to find the closest value in `grid_lon' and `grid_lat'.
+    maxDistance : float, optional
+        Unless given, there is no upper limit on the distance (in kilometres) away from the source for which a result
+        is deemed valid. Any other value specified here limits the upper threshold.
+    vincenty : bool, optional
+        Set to True to use `PyFVCOM.grid.vincenty_distance' for the distances. Defaults to False, which uses
+        `PyFVCOM.grid.haversine_distance'.
+    kdtree : scipy.spatial.cKDTree, optional
+        A tree already built from the unit sphere positions of `grid_lon' and `grid_lat'. Give this to avoid
+        rebuilding the tree when searching the same grid repeatedly.
+    candidates : int, optional
+        The number of nearby points to check with Vincenty's formula. Defaults to 8. Ignored for haversine.
+
+    Returns
+    -------
+    nearest_lon, nearest_lat : np.ndarray
+        Positions from `grid_lon' and `grid_lat' which are within maxDistance (if given) and closest to the
+        corresponding point in `lon' and `lat'.
+    distance : np.ndarray
+        Distance (in kilometres) between each point in `lon' and `lat' and the closest value in `grid_lon' and
+        `grid_lat'. Even if maxDistance is given (and exceeded), the distance is reported here.
+    index : np.ndarray
+        List of indices of `grid_lon' and `grid_lat' for the closest positions to those given in `lon', `lat'. NaN
+        for positions beyond maxDistance.
+
+    """
+
+    grid_lon = np.asarray(grid_lon)
+    grid_lat = np.asarray(grid_lat)
+    lon = np.atleast_1d(np.asarray(lon, dtype=float)).ravel()
+    lat = np.atleast_1d(np.asarray(lat, dtype=float)).ravel()
+    if lon.shape != lat.shape:
+        raise ValueError("Number of points in `lon' and `lat' do not match")
+
+    if kdtree is None:
+        kdtree = scipy.spatial.cKDTree(_unit_sphere(grid_lon, grid_lat))
+
+    k = min(candidates, kdtree.n) if vincenty else 1
+    _, indices = kdtree.query(_unit_sphere(lon, lat), k=k)
+    indices = np.reshape(indices, (len(lon), k))
+
+    if vincenty:
+        dist = vincenty_distance((grid_lat[indices], grid_lon[indices]), (lat[:, np.newaxis], lon[:, np.newaxis]))
+        # Don't pick points for which the distance calculation failed to converge.
+        best = np.argmin(np.where(np.isnan(dist), np.inf, dist), axis=1)
+    else:
+        dist = haversine_distance((grid_lon[indices], grid_lat[indices]), (lon[:, np.newaxis], lat[:, np.newaxis]))
+        best = np.zeros(len(lon), dtype=int)
+    dist = dist[np.arange(len(lon)), best]
+    indices = indices[np.arange(len(lon)), best].astype(float)
+
+    # Replace positions beyond the given distance threshold (or whose distance we couldn't calculate) with NaNs.
+    indices[~(dist <= maxDistance)] = np.nan
+
+    valid = ~np.isnan(indices)
+    nearest_lon, nearest_lat = np.full(len(indices), np.nan), np.full(len(indices), np.nan)
+    nearest_lon[valid] = grid_lon[indices[valid].astype(int)]
+    nearest_lat[valid] = grid_lat[indices[valid].astype(int)]
+
+    return nearest_lon, nearest_lat, dist, indices
+
+
+def element_side_lengths(triangles, x, y):
+    """
+    Given a list of triangle nodes, calculate the length of each side of each
+    triangle and return as an array of lengths. Units are in the original input
+    units (no conversion from lat/long to metres, for example).
+
+    The arrays triangles, x and y can be created by running read_sms_mesh(),
+    read_fvcom_mesh() or read_mike_mesh() on a given SMS, FVCOM or MIKE grid
+    file.
+
+    Parameters
+    ----------
+    triangles : np.ndarray
+        Integer array of shape (ntri, 3). Each triangle is composed of
+        three points and this contains the three node numbers (stored in
+        nodes) which refer to the coordinates in `x' and `y' (see below). Give as
         a zero-indexed array.
     x, y : np.ndarray
         Coordinates of each grid node.
@@ -3598,7 +4231,7 @@ def element_side_lengths(triangles, x, y):
     return element_sides
 
 
-def mesh2grid(mesh_x, mesh_y, mesh_z, nx, ny, thresh=None, noisy=False):
+def mesh2grid(mesh_x, mesh_y, mesh_z, nx, ny, thresh=None, noisy=False, method='nearest', triangles=None):
     """
     Resample the unstructured grid in mesh_x and mesh_y onto a regular grid whose
     size is nx by ny or which is specified by the arrays nx, ny. Optionally
@@ -3621,6 +4254,15 @@ def mesh2grid(mesh_x, mesh_y, mesh_z, nx, ny, thresh=None, noisy=False):
         node to be included.
     noisy : bool, optional
         Set to True to enable verbose messages.
+    method : str, optional
+        Set to 'nearest' (default) to use the value of the nearest node or
+        'linear' to interpolate linearly (with barycentric coordinates) within
+        the triangle containing each sample.
+    triangles : np.ndarray, optional
+        The unstructured grid triangulation table (zero-indexed). Used by the
+        'linear' method so samples outside the model domain (e.g. on islands)
+        are left as NaN. If omitted, the Delaunay triangulation of the nodes
+        is used instead.
 
     Returns
     -------
@@ -3632,81 +4274,71 @@ def mesh2grid(mesh_x, mesh_y, mesh_z, nx, ny, thresh=None, noisy=False):
         input is now replaced with two dimensions (x, y). All other input
         dimensions follow.
 
+    Notes
+    -----
+    All the samples are found with a single KD-tree query of the mesh nodes.
+    Where several nodes are equally close to a sample, the lowest node index
+    is used. For the 'linear' method, `thresh' still applies to the distance
+    to the nearest node.
+
     """
 
     if not thresh:
         thresh = np.inf
 
-    # Get the extents of the input data.
-    xmin, xmax, ymin, ymax = mesh_x.min(), mesh_x.max(), mesh_y.min(), mesh_y.max()
+    if method not in ('nearest', 'linear'):
+        raise ValueError(f"Unrecognised method '{method}'. Choose 'nearest' or 'linear'.")
+
+    mesh_x, mesh_y = np.asarray(mesh_x, dtype=float), np.asarray(mesh_y, dtype=float)
+    mesh_z = np.asarray(mesh_z)
 
     if isinstance(nx, int) and isinstance(ny, int):
-        xx = np.linspace(xmin, xmax, nx)
-        yy = np.linspace(ymin, ymax, ny)
+        xx = np.linspace(mesh_x.min(), mesh_x.max(), nx)
+        yy = np.linspace(mesh_y.min(), mesh_y.max(), ny)
+        # The output is indexed (x, y) for the regularly sampled grid.
+        sample_x, sample_y = np.meshgrid(xx, yy, indexing='ij')
     else:
         xx = nx
         yy = ny
-
-    # We need to check the input we're resampling for its number of dimensions
-    # so we can create an output array of the right shape. We can just take the
-    # shape of the input, omitting the first value (the nodes). That should
-    # leave us with the right shape. This even works for 1D inputs (i.e. a
-    # single value at each unstructured grid location).
-    if isinstance(nx, int) and isinstance(ny, int):
-        zz = np.empty((nx, ny) + mesh_z.shape[1:]) * np.nan
-    else:
-        zz = np.empty((nx.shape) + mesh_z.shape[1:]) * np.nan
+        sample_x, sample_y = np.asarray(xx, dtype=float), np.asarray(yy, dtype=float)
 
     if noisy:
-        if isinstance(nx, int) and isinstance(ny, int):
-            print('Resampling unstructured to regular ({} by {}). '.format(nx, ny), end='')
-            print('Be patient...')
-        else:
-            _nx, _ny = len(nx[:, 1]), len(ny[0, :])
-            print('Resampling unstructured to regular ({} by {}). '.format(_nx, _ny), end='')
-            print('Be patient...')
-
+        print('Resampling unstructured to regular ({} by {}). '.format(*sample_x.shape), end='')
         sys.stdout.flush()
 
-    if isinstance(nx, int) and isinstance(ny, int):
-        for xi, xpos in enumerate(xx):
-            # Do all the y-positions with findNearestPoint
-            for yi, ypos in enumerate(yy):
-                # Find the nearest node in the unstructured grid data and grab
-                # its u and v values. If it's beyond some threshold distance,
-                # leave the z value as NaN.
-                dist = np.sqrt((mesh_x - xpos)**2 + (mesh_y - ypos)**2)
-
-                # Get the index of the minimum and extract the values only if
-                # the nearest point is within the threshold distance (thresh).
-                if dist.min() < thresh:
-                    idx = dist.argmin()
-
-                    # The ... means "and all the other dimensions". Since we've
-                    # asked for our input array to have the nodes as the first
-                    # dimension, this means we can just get all the others when
-                    # using the node index.
-                    zz[xi, yi, ...] = mesh_z[idx, ...]
+    samples = np.column_stack((sample_x.ravel(), sample_y.ravel()))
+    nodes = np.column_stack((mesh_x, mesh_y))
+
+    # Grab a few neighbours so we can pick the lowest index of any equally close nodes (as a brute force search
+    # with argmin would).
+    neighbours = min(4, len(nodes))
+    distance, index = scipy.spatial.cKDTree(nodes).query(samples, k=neighbours)
+    distance, index = distance.reshape(len(samples), -1), index.reshape(len(samples), -1)
+    ties = np.isclose(distance, distance[:, :1], rtol=1e-12, atol=0)
+    nearest = np.where(ties, index, len(nodes)).min(axis=1)
+    valid = distance[:, 0] < thresh
+
+    values = mesh_z.reshape(len(nodes), -1)
+    zz = np.full((len(samples), values.shape[-1]), np.nan)
+    if method == 'nearest':
+        zz[valid] = values[nearest[valid]]
     else:
-        # We've been given positions, so run through those instead of our
-        # regularly sampled grid.
-        c = 0
-        for ci, _ in enumerate(xx[0, :]):
-            for ri, _ in enumerate(yy[:, 0]):
-                if noisy:
-                    if np.mod(c, 1000) == 0 or c == 0:
-                        print('{} of {}'.format(
-                            c,
-                            len(xx[0, :]) * len(yy[:, 0])
-                            ))
-                c += 1
-
-                dist = np.sqrt(
-                    (mesh_x - xx[ri, ci])**2 + (mesh_y - yy[ri, ci])**2
-                )
-                if dist.min() < thresh:
-                    idx = dist.argmin()
-                    zz[ri, ci, ...] = mesh_z[idx, ...]
+        if triangles is None:
+            weights, outside = linear_interpolation_weights(nodes, samples)
+        else:
+            triangles = np.asarray(triangles)
+            element = Triangulation(mesh_x, mesh_y, triangles).get_trifinder()(samples[:, 0], samples[:, 1])
+            outside = element < 0
+            element_nodes = triangles[element[~outside]]
+            phi = get_barycentric_coords(samples[~outside, 0], samples[~outside, 1],
+                                         mesh_x[element_nodes].T, mesh_y[element_nodes].T)
+            rows = np.repeat(np.flatnonzero(~outside), 3)
+            weights = scipy.sparse.csr_matrix((np.column_stack(phi).ravel(), (rows, element_nodes.ravel())),
+                                              shape=(len(samples), len(nodes)))
+        valid &= ~outside
+        zz[valid] = (weights @ values.astype(float))[valid]
+
+    zz = zz.reshape(sample_x.shape + mesh_z.shape[1:])
 
     if noisy:
         print('done.')
@@ -4214,7 +4846,184 @@ def connectivity(p, t):
     return e, te, e2t, bnd
 
 
-def find_connected_nodes(n, triangles):
+class MeshTopology(object):
+    """
+    Node-to-element and node-to-node adjacency for an unstructured grid, stored as compressed sparse row (CSR) tables
+    so the neighbours of any number of nodes can be looked up without scanning the whole triangulation.
+
+    Build this once for a grid and pass it to `find_connected_nodes', `find_connected_elements', `find_bad_node',
+    `get_attached_unique_nodes' and `expand_connected_nodes' when calling those repeatedly. A PyFVCOM.grid.Domain
+    caches one for its grid.
+
+    Methods
+    -------
+    elements - the elements connected to one or more nodes
+    neighbours - the nodes connected to one or more nodes
+    expand - mask the nodes within a given number of edges of one or more nodes
+    boundary_neighbours - the nodes connected to a node along the grid boundary
+    is_bad - check whether nodes are connected to a single element only
+
+    Attributes
+    ----------
+    node_elements - sparse [node, element] matrix of the elements connected to each node.
+    node_nodes - sparse [node, node] matrix of the edges in the grid. Values are the number of elements sharing each
+    edge, so boundary edges are 1.
+    element_counts - the number of elements connected to each node.
+    boundary - True for nodes on the grid boundary.
+
+    """
+
+    def __init__(self, triangles, nodes=None):
+        """
+        Parameters
+        ----------
+        triangles : np.ndarray
+            Triangulation table for the grid (zero-indexed). Shape is [nele, 3].
+        nodes : int, optional
+            The number of nodes in the grid. Defaults to one more than the largest node ID in `triangles'.
+
+        """
+
+        triangles = np.asarray(triangles)
+        if nodes is None:
+            nodes = int(triangles.max()) + 1 if triangles.size else 0
+        elements = len(triangles)
+
+        self.node_elements = scipy.sparse.csr_matrix((np.ones(triangles.size, dtype=np.int32),
+                                                      (triangles.ravel(), np.repeat(np.arange(elements), 3))),
+                                                     shape=(nodes, elements))
+        # Each element contributes each of its edges in both directions so the values are the number of elements
+        # which share each edge.
+        self.node_nodes = scipy.sparse.csr_matrix((np.ones(triangles.size * 2, dtype=np.int32),
+                                                   (triangles[:, [0, 1, 2, 1, 2, 0]].ravel(),
+                                                    triangles[:, [1, 2, 0, 0, 1, 2]].ravel())),
+                                                  shape=(nodes, nodes))
+        self.element_counts = np.diff(self.node_elements.indptr)
+        owners = np.repeat(np.arange(nodes), np.diff(self.node_nodes.indptr))
+        self.boundary = np.bincount(owners[self.node_nodes.data == 1], minlength=nodes) > 0
+
+    @staticmethod
+    def _rows(table, nodes):
+        """ Return the column indices and values of the rows in `table' for the given nodes. """
+        nodes = np.ravel(nodes).astype(int)
+        starts = table.indptr[nodes]
+        lengths = table.indptr[nodes + 1] - starts
+        positions = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+
+        return table.indices[positions], table.data[positions]
+
+    def elements(self, nodes):
+        """
+        Find the elements connected to one or more nodes.
+
+        Parameters
+        ----------
+        nodes : int, list-like
+            Node ID(s).
+
+        Returns
+        -------
+        elements : np.ndarray
+            The unique IDs of the elements connected to any of `nodes', sorted.
+
+        """
+
+        return np.unique(self._rows(self.node_elements, nodes)[0])
+
+    def neighbours(self, nodes):
+        """
+        Find the nodes connected to one or more nodes.
+
+        Parameters
+        ----------
+        nodes : int, list-like
+            Node ID(s).
+
+        Returns
+        -------
+        neighbours : np.ndarray
+            The unique IDs of the nodes which share an edge with any of `nodes', excluding `nodes' themselves, sorted.
+
+        """
+
+        return np.setdiff1d(self._rows(self.node_nodes, nodes)[0], nodes)
+
+    def expand(self, nodes, levels=1):
+        """
+        Mask the nodes within `levels' edges of one or more nodes.
+
+        Parameters
+        ----------
+        nodes : int, list-like
+            Node ID(s) from which to expand.
+        levels : int, optional
+            The number of rings of connected nodes to add. Set to 0 to mask `nodes' only. Defaults to 1.
+
+        Returns
+        -------
+        mask : np.ndarray
+            Boolean array for every node in the grid which is True for `nodes' and the nodes within `levels' edges of
+            them.
+
+        """
+
+        mask = np.zeros(self.node_nodes.shape[0], dtype=bool)
+        frontier = np.unique(np.ravel(nodes).astype(int))
+        mask[frontier] = True
+        for _ in range(levels):
+            connected = self._rows(self.node_nodes, frontier)[0]
+            frontier = np.unique(connected[~mask[connected]])
+            if not frontier.size:
+                break
+            mask[frontier] = True
+
+        return mask
+
+    def boundary_neighbours(self, node):
+        """
+        Find the nodes connected to `node' along the grid boundary.
+
+        Parameters
+        ----------
+        node : int
+            Node ID.
+
+        Returns
+        -------
+        connected_nodes : np.ndarray
+            IDs of the nodes which share a boundary edge with `node', sorted. If `node' is connected to a single
+            element only, it is included too (as in `get_attached_unique_nodes'). If `node' is not on the boundary,
+            `connected_nodes' is empty.
+
+        """
+
+        connected, shared = self._rows(self.node_nodes, node)
+        connected = connected[shared == 1]
+        if self.element_counts[node] == 1:
+            connected = np.append(connected, node)
+
+        return np.sort(connected)
+
+    def is_bad(self, nodes):
+        """
+        Check whether nodes are connected to a single element only (see `find_bad_node').
+
+        Parameters
+        ----------
+        nodes : int, list-like
+            Node ID(s).
+
+        Returns
+        -------
+        bad : bool, np.ndarray
+            True for nodes connected to a single element only.
+
+        """
+
+        return self.element_counts[nodes] == 1
+
+
+def find_connected_nodes(n, triangles, topology=None):
     """
     Return the IDs of the nodes surrounding node number `n'.
 
@@ -4225,6 +5034,9 @@ def find_connected_nodes(n, triangles):
     triangles : np.ndarray
         Triangulation matrix to find the connected nodes. Shape is [nele,
         3].
+    topology : PyFVCOM.grid.MeshTopology, optional
+        Adjacency tables for `triangles'. Give these when calling this
+        repeatedly for the same grid to avoid searching `triangles' each time.
 
     Returns
     -------
@@ -4258,13 +5070,16 @@ def find_connected_nodes(n, triangles):
 
     """
 
+    if topology is not None:
+        return topology.neighbours(n)
+
     eidx = np.max((np.abs(triangles - n) == 0), axis=1)
     surroundingidx = np.unique(triangles[eidx][triangles[eidx] != n])
 
     return surroundingidx
 
 
-def find_connected_elements(n, triangles):
+def find_connected_elements(n, triangles, topology=None):
     """
     Return the IDs of the elements connected to node number `n'.
 
@@ -4277,6 +5092,9 @@ def find_connected_elements(n, triangles):
     triangles : np.ndarray
         Triangulation matrix to find the connected elements. Shape is [nele,
         3].
+    topology : PyFVCOM.grid.MeshTopology, optional
+        Adjacency tables for `triangles'. Give these when calling this
+        repeatedly for the same grid to avoid searching `triangles' each time.
 
     Returns
     -------
@@ -4289,21 +5107,16 @@ def find_connected_elements(n, triangles):
 
     """
 
-    try:
-        surroundingidx = []
-        for ni in n:
-            idx = np.argwhere(triangles == ni)[:, 0]
-            surroundingidx.append(idx)
-        surroundingidx = np.asarray([item for sublist in surroundingidx for item in sublist])
-        surroundingidx = np.unique(surroundingidx)
-    except TypeError:
-        surroundingidx = np.argwhere(triangles == n)[:, 0]
+    if topology is not None:
+        return topology.elements(n)
+
+    surroundingidx = np.flatnonzero(np.any(np.isin(triangles, n), axis=1))
 
     return surroundingidx
 
 
 def expand_connected_nodes(grid_nodes, tri, 
-                            initial_nodes, nn_level):
+                            initial_nodes, nn_level, topology=None):
     """
     Use nodes array to make model mask of neighbouring points. The mask is a 
     combination of initial nodes and neighbours.
@@ -4322,6 +5135,8 @@ def expand_connected_nodes(grid_nodes, tri,
         Set to 0 returns a mask of the initial nodes. Set to 1 and above 
         returns a mask that includes the connected nodes at the specified 
         level of connection.
+    topology : PyFVCOM.grid.MeshTopology, optional
+        Adjacency tables for `tri'. If omitted, they are built from `tri'.
 
     Returns
     -------
@@ -4330,21 +5145,11 @@ def expand_connected_nodes(grid_nodes, tri,
         connected node and False indictes unconnected nodes.
     """
 
-    if nn_level >= 1:
-        expand_nodes = initial_nodes * 1
-        for i in range(len(initial_nodes)):
-            con_node = find_connected_nodes(initial_nodes[i], tri)
-            expand_nodes = np.append(expand_nodes, con_node)
+    if topology is None:
+        topology = MeshTopology(tri, len(grid_nodes))
 
-        expand_nodes = np.unique(expand_nodes)
-        # recursivly calls itself with more nodes and less loop levels
-        node_mask = expand_connected_nodes(grid_nodes, tri, expand_nodes, 
-                                            nn_level - 1)
+    node_mask = topology.expand(initial_nodes, nn_level)
 
-    else:
-        node_mask = np.zeros((len(grid_nodes)), dtype=bool)
-        for i in range(len(initial_nodes)):
-            node_mask[initial_nodes[i]] = True
     return node_mask
 
 
@@ -4414,7 +5219,7 @@ def get_area_heron(s1, s2, s3):
     return abs(area)
 
 
-def find_bad_node(nv, node_id):
+def find_bad_node(nv, node_id, topology=None):
     """
     Check nodes on the boundary of a grid for nodes connected to a single
     element only. These elements will always have zero velocities,
@@ -4430,6 +5235,9 @@ def find_bad_node(nv, node_id):
         Connectivity table for the grid.
     node_id : int
         Node ID to check.
+    topology : PyFVCOM.grid.MeshTopology, optional
+        Adjacency tables for `nv'. Give these when checking many nodes to
+        avoid searching `nv' each time.
 
     Returns
     -------
@@ -4449,8 +5257,11 @@ def find_bad_node(nv, node_id):
 
     """
 
+    if topology is not None:
+        return bool(topology.is_bad(node_id))
+
     was = False
-    if len(np.argwhere(nv == node_id)) == 1:
+    if np.count_nonzero(nv == node_id) == 1:
         was = True
 
     return was
@@ -4593,17 +5404,18 @@ def get_boundary_polygons(triangle, noisy=False, nodes=None, double_start_end=Fa
 
     nodes_lt_4 = np.asarray(uc[uc[:, 1] < 4, 0], dtype=int)
     boundary_polygon_list = []
+    topology = MeshTopology(triangle)
 
     # Pretty certain we can use `while np.any(nodes_lt_4)` below instead.
     while len(nodes_lt_4) > 0:
 
         start_node = nodes_lt_4[0]
 
-        boundary_node_list = [start_node, get_attached_unique_nodes(start_node, triangle)[-1]]
+        boundary_node_list = [start_node, get_attached_unique_nodes(start_node, triangle, topology=topology)[-1]]
 
         full_loop = True
         while full_loop:
-            next_nodes = get_attached_unique_nodes(boundary_node_list[-1], triangle)
+            next_nodes = get_attached_unique_nodes(boundary_node_list[-1], triangle, topology=topology)
             node_ind = 0
             len_bl = len(boundary_node_list)
             if noisy:
@@ -4647,7 +5459,7 @@ def get_boundary_polygons(triangle, noisy=False, nodes=None, double_start_end=Fa
         return [boundary_polygon_list, islands_list]
 
 
-def get_attached_unique_nodes(this_node, trinodes):
+def get_attached_unique_nodes(this_node, trinodes, topology=None):
     """
     Find the nodes on the boundary connected to `this_node'.
 
@@ -4657,6 +5469,9 @@ def get_attached_unique_nodes(this_node, trinodes):
         Node ID.
     trinodes : np.ndarray
         Triangulation table for an unstructured grid.
+    topology : PyFVCOM.grid.MeshTopology, optional
+        Adjacency tables for `trinodes'. Give these when calling this repeatedly for the same grid to avoid
+        searching `trinodes' each time.
 
     Returns
     -------
@@ -4666,6 +5481,9 @@ def get_attached_unique_nodes(this_node, trinodes):
 
     """
 
+    if topology is not None:
+        return topology.boundary_neighbours(this_node)
+
     all_trinodes = trinodes[(trinodes[:, 0] == this_node) | (trinodes[:, 1] == this_node) | (trinodes[:, 2] == this_node), :]
     u, c = np.unique(all_trinodes, return_counts=True)
 
@@ -4701,45 +5519,50 @@ def grid_metrics(tri, noisy=False):
 
     Notes
     -----
-    This is more or less a direct translation from FORTRAN (FVCOM's tge.F).
+    This replicates most of FVCOM's tge.F. Rather than looping over each element and its neighbours (as tge.F does),
+    each element edge is encoded as a single integer from its (sorted) node IDs and the edges are sorted so that
+    matching edges are adjacent; elements sharing an edge are neighbours and edges which only occur once are on the
+    model boundary. This scales as O(n log n) with the number of elements.
 
     """
 
+    tri = np.asarray(tri)
+    nele = tri.shape[0]
     m = len(np.unique(tri.ravel()))
 
-    # Allocate all our arrays. Use masked by default arrays so we only use valid indices.
-    isonb = np.zeros(m).astype(bool)
-    ntve = np.zeros(m, dtype=int)
-    nbe = np.ma.array(np.zeros(tri.shape, dtype=int), mask=True)
-    nbve = np.ma.array(np.zeros((m, 10), dtype=int), mask=True)
-    # Number of elements connected to each node (ntve) and the IDs of the elements connected to each node (nbve).
+    # Number of elements connected to each node (ntve) and the IDs of the elements connected to each node (nbve). The
+    # elements for each node are in ascending order. We need at least 10 columns in nbve for compatibility with
+    # FVCOM, but make sure we have enough for particularly well connected nodes.
     if noisy:
         print('Counting neighbouring nodes and elements')
-    for i, (n1, n2, n3) in enumerate(tri):
-        nbve[tri[i, 0], ntve[n1]] = i
-        nbve[tri[i, 1], ntve[n2]] = i
-        nbve[tri[i, 2], ntve[n3]] = i
-        # Only increment the counters afterwards as Python indexes from 0.
-        ntve[n1] += 1
-        ntve[n2] += 1
-        ntve[n3] += 1
+    node_ids = tri.ravel()
+    element_ids = np.repeat(np.arange(nele), tri.shape[1])
+    ntve = np.bincount(node_ids, minlength=m)
+    order = np.argsort(node_ids, kind='stable')
+    sorted_nodes = node_ids[order]
+    first_position = np.cumsum(ntve) - ntve
+    rank = np.arange(len(sorted_nodes)) - first_position[sorted_nodes]
+    nbve = np.ma.array(np.zeros((m, max(10, ntve.max(initial=0))), dtype=int), mask=True)
+    nbve[sorted_nodes, rank] = element_ids[order]
 
     if noisy:
         print('Getting neighbouring elements for each element')
-    # Get the element IDs connected to each element.
-    for i, (n1, n2, n3) in enumerate(tri):
-        for j1 in range(ntve[n1]):
-            for j2 in range(ntve[n2]):
-                if nbve[n1, j1] == nbve[n2, j2] and nbve[n1, j1] != i:
-                    nbe[i, 2] = nbve[n1, j1]
-        for j2 in range(ntve[n2]):
-            for j3 in range(ntve[n3]):
-                if nbve[n2, j2] == nbve[n3, j3] and nbve[n2, j2] != i:
-                    nbe[i, 0] = nbve[n2, j2]
-        for j1 in range(ntve[n1]):
-            for j3 in range(ntve[n3]):
-                if nbve[n1, j1] == nbve[n3, j3] and nbve[n1, j1] != i:
-                    nbe[i, 1] = nbve[n3, j3]
+    # Each element edge is opposite one of its nodes: nbe[:, 0] is the neighbour across the edge formed by nodes 1
+    # and 2, nbe[:, 1] across the edge formed by nodes 0 and 2 and nbe[:, 2] across the edge formed by nodes 0 and 1.
+    edge_nodes = np.concatenate((tri[:, [1, 2]], tri[:, [0, 2]], tri[:, [0, 1]]))
+    edge_nodes = np.sort(edge_nodes, axis=1).astype(np.int64)
+    edge_keys = edge_nodes[:, 0] * (int(tri.max()) + 1) + edge_nodes[:, 1]
+    edge_elements = np.tile(np.arange(nele), 3)
+    edge_sides = np.repeat(np.arange(3), nele)
+
+    order = np.argsort(edge_keys, kind='stable')
+    sorted_keys = edge_keys[order]
+    shared = np.flatnonzero(sorted_keys[1:] == sorted_keys[:-1])
+    first, second = order[shared], order[shared + 1]
+
+    nbe = np.ma.array(np.zeros(tri.shape, dtype=int), mask=True)
+    nbe[edge_elements[first], edge_sides[first]] = edge_elements[second]
+    nbe[edge_elements[second], edge_sides[second]] = edge_elements[first]
 
     if noisy:
         print('Getting boundary element IDs')
@@ -4747,17 +5570,11 @@ def grid_metrics(tri, noisy=False):
 
     if noisy:
         print('Getting boundary node IDs')
-
-    # Get the boundary node IDs.
-    boundary_element_node_ids = np.unique(tri[isbce, :]).ravel()
-    boundary_nodes = []
-    for i in boundary_element_node_ids:
-        current_nodes = get_attached_unique_nodes(i, tri)
-        if np.any(current_nodes):
-            boundary_nodes += current_nodes.tolist()
-    boundary_nodes = np.unique(boundary_nodes)
-    # Make a boolean of that.
-    isonb[boundary_nodes] = True
+    # Edges which only occur once are on the boundary, as are their nodes.
+    unique_keys, key_counts = np.unique(edge_keys, return_counts=True)
+    boundary_edges = np.isin(edge_keys, unique_keys[key_counts == 1])
+    isonb = np.zeros(m, dtype=bool)
+    isonb[np.unique(edge_nodes[boundary_edges])] = True
 
     return ntve, nbve, nbe, isbce, isonb
 
@@ -4778,8 +5595,12 @@ def control_volumes(x, y, tri, node_control=True, element_control=True, noisy=Fa
         Set to False to disable calculation of element control volumes. Defaults to True.
     noisy : bool
         Set to True to enable verbose output.
-
-    Additional kwargs are passed to `PyFVCOM.grid.node_control_area`.
+    poolsize : int, str, optional
+        Ignored. The calculation is vectorised so no longer needs a pool of processes. Retained for backwards
+        compatibility.
+    return_points : bool, optional
+        Set to True to also return the coordinates of the points which form each node control area (see
+        `PyFVCOM.grid.node_control_area`). Only used when `node_control' is True.
 
     Returns
     -------
@@ -4788,80 +5609,55 @@ def control_volumes(x, y, tri, node_control=True, element_control=True, noisy=Fa
     art2 : np.ndarray, optional
         Sum area of all cells around each node. Omitted if element_control is False.
     art1_points : np.ndarray, optional
-        If return_points is set to True (an argument to `PyFVCOM.grid.node_control_area`), then those are returned as
-        the second or third argument (with element_control = False, with element_control = True respectively).
+        If return_points is set to True, then those are returned as the second or third argument (with
+        element_control = False, with element_control = True respectively). This is an object array of (n, 2)
+        arrays of the control area polygon points for each node (None for nodes which are not part of any element).
 
     Notes
     -----
-    This is a python reimplementation of the FVCOM function CELL_AREA in cell_area.F. Whilst the reimplementation is
-    coded with efficiency in mind (the calculations occur in parallel), this is still slow for large grids. Please be
-    patient!
+    This is a python reimplementation of the FVCOM function CELL_AREA in cell_area.F. Rather than finding the
+    elements connected to each node in turn, the areas are calculated for every element in one go and accumulated
+    onto the nodes, so this scales linearly with the size of the grid.
 
     """
 
     if not node_control and not element_control:
         raise ValueError("Set either `node_control' or `element_control' to `True'")
 
-    if poolsize is None:
-        pool = multiprocessing.Pool()
-    elif poolsize == 'serial':
-        pool = False
-    else:
-        pool = multiprocessing.Pool(poolsize)
+    return_points = kwargs.get('return_points', False)
 
+    x = np.asarray(x)
+    y = np.asarray(y)
+    tri = np.asarray(tri)
     m = len(x)  # number of nodes
 
     # Calculate art1 (control volume for fluxes of node-based values). I do this differently from how it's done in
     # FVCOM as I can't wrap my head around the seemingly needlessly complicated approach they've taken. Here,
-    # my approach is:
-    #   1. For each node, find all the elements connected to it (find_connected_elements).
-    #   2. Identify the nodes in all those elements.
-    #   3. Find the position of the halfway point along each vertex between our current node and all the other nodes
-    #   connected to it.
-    #   4. Using those positions and the positions of the centre of each element, create a polygon (ordered clockwise).
+    # my approach is, for each vertex of each element:
+    #   1. Find the position of the halfway point along the two edges of the element which share that vertex.
+    #   2. Calculate the areas of the two triangles formed by the vertex, each of those halfway points and the
+    #   element centre.
+    #   3. Sum those areas onto the vertex (node).
+    # The polygons are then formed from the halfway points and element centres around each node (ordered clockwise).
     if node_control:
         if noisy:
             print('Compute control volume for fluxes at nodes (art1)')
-        xc = nodes2elems(x, tri)
-        yc = nodes2elems(y, tri)
-
-        if not pool:
-            art1 = []
-            for this_node in range(m):
-                art1.append(node_control_area(this_node, x, y, xc, yc, tri, **kwargs))
-            art1 = np.asarray(art1)
-        else:
-            results = pool.map(partial(node_control_area, x=x, y=y, xc=xc, yc=yc, tri=tri, **kwargs), range(m))
-            # Unpack the results in case we've been asked for the points too.
-            if 'return_points' in kwargs:
-                art1 = np.asarray([i[0] for i in results])
-                art1_points = np.asarray([i[1] for i in results])
-            else:
-                art1 = np.asarray(results)
+        art1, art1_points = _node_control_areas(x, y, tri, return_points=return_points)
 
     # Compute area of control volume art2(i) = sum(all tris surrounding node i)
     if element_control:
         if noisy:
             print('Compute control volume for fluxes over elements (art2)')
         art = get_area(np.asarray((x[tri[:, 0]], y[tri[:, 0]])).T, np.asarray((x[tri[:, 1]], y[tri[:, 1]])).T, np.asarray((x[tri[:, 2]], y[tri[:, 2]])).T)
-        if not pool:
-            art2 = []
-            for this_node in range(m):
-                art2.append(element_control_area(this_node, triangles=tri, art=art))
-            art2 = np.asarray(art2)
-        else:
-            art2 = np.asarray(pool.map(partial(element_control_area, triangles=tri, art=art), range(m)))
-
-    if pool:
-        pool.close()
+        art2 = np.bincount(tri.ravel(), weights=np.repeat(art, tri.shape[-1]), minlength=m)
 
     if node_control and element_control:
-        if 'return_points' in kwargs:
+        if return_points:
             return art1, art2, art1_points
         else:
             return art1, art2
     elif node_control and not element_control:
-        if 'return_points' in kwargs:
+        if return_points:
             return art1, art1_points
         else:
             return art1
@@ -4869,6 +5665,89 @@ def control_volumes(x, y, tri, node_control=True, element_control=True, noisy=Fa
         return art2
 
 
+def _node_control_areas(x, y, tri, return_points=False):
+    """
+    Vectorised equivalent of `node_control_area' for all the nodes in the grid at once.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        Node positions
+    tri : np.ndarray
+        Unstructured grid triangulation table.
+    return_points : bool
+        Return the coordinates of the points which form the node control areas.
+
+    Returns
+    -------
+    art1 : np.ndarray
+        Node control volume areas in x or y length units squared.
+    art1_points : np.ndarray, None
+        Object array of the (x, y) positions of the points which form each node control area (None for nodes which
+        aren't in any element). None if `return_points' is False.
+
+    """
+
+    m = len(x)
+    xc = nodes2elems(x, tri)
+    yc = nodes2elems(y, tri)
+
+    # For each vertex of each element, get the other two nodes of the element in ascending order.
+    node = tri
+    others = np.sort(np.stack((tri[:, [1, 2]], tri[:, [0, 2]], tri[:, [0, 1]]), axis=1), axis=-1)
+    # Halfway points along the two edges sharing each vertex, shaped (nelem, 3, 2).
+    mid_x = x[node][..., np.newaxis] - ((x[node][..., np.newaxis] - x[others]) / 2)
+    mid_y = y[node][..., np.newaxis] - ((y[node][..., np.newaxis] - y[others]) / 2)
+    centre_x = np.broadcast_to(xc[:, np.newaxis, np.newaxis], mid_x.shape)
+    centre_y = np.broadcast_to(yc[:, np.newaxis, np.newaxis], mid_y.shape)
+    vertex_x = np.broadcast_to(x[node][..., np.newaxis], mid_x.shape)
+    vertex_y = np.broadcast_to(y[node][..., np.newaxis], mid_y.shape)
+
+    areas = get_area(np.column_stack((vertex_x.ravel(), vertex_y.ravel())),
+                     np.column_stack((mid_x.ravel(), mid_y.ravel())),
+                     np.column_stack((centre_x.ravel(), centre_y.ravel())))
+    art1 = np.bincount(np.repeat(node.ravel(), 2), weights=areas, minlength=m)
+
+    if not return_points:
+        return art1, None
+
+    # Each vertex contributes [first halfway point, element centre, second halfway point] to its node's polygon.
+    point_node = np.repeat(node.ravel(), 3)
+    point_x = np.stack((mid_x[..., 0], xc[:, np.newaxis].repeat(3, axis=1), mid_x[..., 1]), axis=-1).ravel()
+    point_y = np.stack((mid_y[..., 0], yc[:, np.newaxis].repeat(3, axis=1), mid_y[..., 1]), axis=-1).ravel()
+    angle = np.arctan2(point_y - y[point_node], point_x - x[point_node])
+
+    # Sort clockwise from north around each node and drop the duplicate halfway points shared by adjacent elements.
+    order = np.lexsort((point_y, point_x, angle, point_node))
+    point_node, point_x, point_y = point_node[order], point_x[order], point_y[order]
+    keep = np.ones(point_node.shape, dtype=bool)
+    keep[1:] = (point_node[1:] != point_node[:-1]) | (point_x[1:] != point_x[:-1]) | (point_y[1:] != point_y[:-1])
+    point_node, point_x, point_y = point_node[keep], point_x[keep], point_y[keep]
+
+    points = np.split(np.column_stack((point_x, point_y)), np.flatnonzero(np.diff(point_node)) + 1)
+    art1_points = np.empty(m, dtype=object)
+    for this_node, these_points in zip(np.unique(point_node), points):
+        art1_points[this_node] = these_points
+
+    # Nodes on the boundary of the grid also need the node itself in the polygon and have to be ordered around the
+    # centre of that polygon instead as the node is on its edge. Boundary nodes are those on edges which only belong
+    # to a single element.
+    edges = np.sort(np.concatenate((tri[:, [0, 1]], tri[:, [1, 2]], tri[:, [2, 0]])), axis=1)
+    unique_edges, counts = np.unique(edges, axis=0, return_counts=True)
+    for this_node in np.unique(unique_edges[counts == 1]):
+        if art1[this_node] == 0:
+            continue
+        control_area_points = art1_points[this_node]
+        centre = np.asarray(shapely.geometry.Polygon(control_area_points).centroid.xy)
+        control_area_points = np.row_stack((control_area_points, (x[this_node], y[this_node])))
+        art1_points[this_node] = clockwise(np.unique(control_area_points, axis=0), relative_to=centre)
+
+    # Match node_control_area for nodes with no area.
+    art1_points[art1 == 0] = None
+
+    return art1, art1_points
+
+
 def node_control_area(n, x, y, xc, yc, tri, return_points=False):
     """
     Worker function to calculate the control volume for fluxes of node-based values for a given node.
@@ -5091,7 +5970,117 @@ def unstructured_grid_depths(h, zeta, sigma, nan_invalid=False):
     return depths
 
 
-def elems2nodes(elems, tri, nvert=None):
+def elems2nodes_operator(tri, nvert=None, weights=None):
+    """
+    Build the sparse operator which sums element values onto the nodes of which each element is a part. The
+    weighted average used by `elems2nodes' is the product of this operator with the element values divided by the
+    row sums of the operator.
+
+    Parameters
+    ----------
+    tri : np.ndarray
+        Array of shape (nelem, 3) comprising the list of connectivity
+        for each element.
+    nvert : int, optional
+        Number of nodes (vertices) in the unstructured grid.
+    weights : np.ndarray, optional
+        Weight for each element (e.g. the element areas). Defaults to
+        equal weights.
+
+    Returns
+    -------
+    operator : scipy.sparse.csr_matrix
+        Sparse matrix of shape (nvert, nelem).
+
+    """
+
+    tri = np.asarray(tri)
+    if not nvert:
+        nvert = np.max(tri) + 1
+    nelem = tri.shape[0]
+
+    elements = np.repeat(np.arange(nelem), tri.shape[-1])
+    if weights is None:
+        values = np.ones(elements.shape)
+    else:
+        values = np.asarray(weights, dtype=float)[elements]
+
+    return scipy.sparse.csr_matrix((values, (tri.ravel(), elements)), shape=(nvert, nelem))
+
+
+def nodes2elems_operator(tri, nvert=None, weights=None):
+    """
+    Build the sparse operator which sums node values onto the elements they form. The weighted average used by
+    `nodes2elems' is the product of this operator with the node values divided by the row sums of the operator.
+
+    Parameters
+    ----------
+    tri : np.ndarray
+        Array of shape (nelem, 3) comprising the list of connectivity
+        for each element.
+    nvert : int, optional
+        Number of nodes (vertices) in the unstructured grid.
+    weights : np.ndarray, optional
+        Weight for each node (e.g. the node control volume areas).
+        Defaults to equal weights.
+
+    Returns
+    -------
+    operator : scipy.sparse.csr_matrix
+        Sparse matrix of shape (nelem, nvert).
+
+    """
+
+    tri = np.asarray(tri)
+    if not nvert:
+        nvert = np.max(tri) + 1
+    nelem = tri.shape[0]
+
+    elements = np.repeat(np.arange(nelem), tri.shape[-1])
+    if weights is None:
+        values = np.ones(elements.shape)
+    else:
+        values = np.asarray(weights, dtype=float)[tri.ravel()]
+
+    return scipy.sparse.csr_matrix((values, (elements, tri.ravel())), shape=(nelem, nvert))
+
+
+def _apply_operator(operator, field):
+    """
+    Apply one of the sparse operators from `elems2nodes_operator' or `nodes2elems_operator' to the last dimension of
+    `field', normalising by the sum of the weights which contributed to each output value. All the leading
+    dimensions (e.g. time and depth) are handled in a single sparse matrix product.
+
+    Masked values are excluded from the average; outputs with no valid contributions are masked. Outputs to which no
+    values contribute at all (e.g. nodes which are not part of any element) are NaN.
+
+    """
+
+    field = np.asanyarray(field)
+    if np.shape(field)[-1] != operator.shape[1]:
+        raise ValueError('The last dimension of the supplied field ({}) does not match the size of the grid ({}).'.format(
+            np.shape(field)[-1], operator.shape[1]))
+
+    shape = field.shape[:-1] + (operator.shape[0],)
+    flat = field.reshape(-1, field.shape[-1]).T
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if np.ma.is_masked(field):
+            valid = ~np.ma.getmaskarray(flat)
+            total = operator @ np.ma.filled(flat, 0)
+            weight = operator @ valid.astype(float)
+            out = np.ma.masked_where(weight == 0, total / weight)
+        else:
+            total = operator @ np.asarray(flat)
+            weight = np.asarray(operator.sum(axis=1))
+            out = total / weight
+            if np.ma.isMaskedArray(field):
+                out = np.ma.array(out)
+
+    return out.T.reshape(shape)
+
+
+def elems2nodes(elems, tri, nvert=None, weights=None, operator=None):
     """
     Calculate a nodal value based on the average value for the elements
     of which it is a part. This necessarily involves an average, so the
@@ -5101,12 +6090,20 @@ def elems2nodes(elems, tri, nvert=None):
     ----------
     elems : np.ndarray
         Array of unstructured grid element values to move to the element
-        nodes.
+        nodes. The last dimension must be the element dimension; any
+        leading dimensions (e.g. time and depth) are converted in one go.
     tri : np.ndarray
         Array of shape (nelem, 3) comprising the list of connectivity
         for each element.
     nvert : int, optional
         Number of nodes (vertices) in the unstructured grid.
+    weights : np.ndarray, optional
+        Weight each element by these values (e.g. the element areas, which
+        gives the control volume average). Defaults to equal weights.
+    operator : scipy.sparse.csr_matrix, optional
+        A precomputed operator from `elems2nodes_operator'. If given, `tri',
+        `nvert' and `weights' are ignored. Use this to avoid rebuilding the
+        operator when converting many fields on the same grid.
 
     Returns
     -------
@@ -5115,43 +6112,13 @@ def elems2nodes(elems, tri, nvert=None):
 
     """
 
-    if not nvert:
-        nvert = np.max(tri) + 1
-    count = np.zeros(nvert, dtype=int)
-
-    # Deal with 1D and 2D element arrays separately
-    if np.ndim(elems) == 1:
-        nodes = np.zeros(nvert)
-        for i, indices in enumerate(tri):
-            n0, n1, n2 = indices
-            nodes[n0] = nodes[n0] + elems[i]
-            nodes[n1] = nodes[n1] + elems[i]
-            nodes[n2] = nodes[n2] + elems[i]
-            count[n0] = count[n0] + 1
-            count[n1] = count[n1] + 1
-            count[n2] = count[n2] + 1
-
-    elif np.ndim(elems) > 1:
-        # Horrible hack alert to get the output array shape for multiple
-        # dimensions.
-        nodes = np.zeros((list(np.shape(elems)[:-1]) + [nvert]))
-        for i, indices in enumerate(tri):
-            n0, n1, n2 = indices
-            nodes[..., n0] = nodes[..., n0] + elems[..., i]
-            nodes[..., n1] = nodes[..., n1] + elems[..., i]
-            nodes[..., n2] = nodes[..., n2] + elems[..., i]
-            count[n0] = count[n0] + 1
-            count[n1] = count[n1] + 1
-            count[n2] = count[n2] + 1
-
-    # Now calculate the average for each node based on the number of
-    # elements of which it is a part.
-    nodes /= count
-
-    return nodes
-
-
-def nodes2elems(nodes, tri):
+    if operator is None:
+        operator = elems2nodes_operator(tri, nvert=nvert, weights=weights)
+
+    return _apply_operator(operator, elems)
+
+
+def nodes2elems(nodes, tri, weights=None, operator=None):
     """
     Calculate an element-centre value based on the average value for the
     nodes from which it is formed. This involves an average, so the
@@ -5161,24 +6128,28 @@ def nodes2elems(nodes, tri):
     ----------
     nodes : np.ndarray
         Array of unstructured grid node values to move to the element
-        centres.
+        centres. The last dimension must be the node dimension.
     tri : np.ndarray
         Array of shape (nelem, 3) comprising the list of connectivity
         for each element.
+    weights : np.ndarray, optional
+        Weight each node by these values (e.g. the node control volume
+        areas). Defaults to equal weights.
+    operator : scipy.sparse.csr_matrix, optional
+        A precomputed operator from `nodes2elems_operator'. If given, `tri'
+        and `weights' are ignored.
 
     Returns
     -------
     elems : np.ndarray
-        Array of values at the grid nodes.
+        Array of values at the element centres.
 
     """
 
-    if np.ndim(nodes) == 1:
-        elems = nodes[tri].mean(axis=-1)
-    else:
-        elems = nodes[..., tri].mean(axis=-1)
+    if operator is None:
+        operator = nodes2elems_operator(tri, nvert=np.shape(nodes)[-1], weights=weights)
 
-    return elems
+    return _apply_operator(operator, nodes)
 
 
 def vincenty_distance(point1, point2, miles=False):
@@ -5189,16 +6160,21 @@ def vincenty_distance(point1, point2, miles=False):
     Parameters
     ----------
     point1 : list, tuple, np.ndarray
-        Decimal degree longitude and latitude for the start.
+        Decimal degree latitude and longitude for the start. Give arrays
+        of latitudes and longitudes (i.e. shaped (2, n)) to calculate
+        many distances at once.
     point2 : list, tuple, np.ndarray
-        Decimal degree longitude and latitude for the end.
+        Decimal degree latitude and longitude for the end. Must broadcast
+        against `point1'.
     miles : bool
         Set to True to return the distance in miles. Defaults to False (kilometres).
 
     Returns
     -------
-    distance : float
-        Distance between point1 and point2 in kilometres.
+    distance : float, np.ndarray
+        Distance between point1 and point2 in kilometres. For single points,
+        None is returned if the calculation fails to converge; for arrays,
+        those distances are NaN.
 
     Notes
     -----
@@ -5215,41 +6191,56 @@ def vincenty_distance(point1, point2, miles=False):
     max_iterations = 200
     convergence_threshold = 1e-12  # .000,000,000,001
 
-    # Short-circuit coincident points
-    if point1[0] == point2[0] and point1[1] == point2[1]:
-        return 0.0
-
-    u1 = math.atan((1 - f) * math.tan(math.radians(point1[0])))
-    u2 = math.atan((1 - f) * math.tan(math.radians(point2[0])))
-    lambda_initial = math.radians(point2[1] - point1[1])
-    lambda_current = copy.copy(lambda_initial)
-
-    sin_u1 = math.sin(u1)
-    cos_u1 = math.cos(u1)
-    sin_u2 = math.sin(u2)
-    cos_u2 = math.cos(u2)
-
-    for iteration in range(max_iterations):
-        sin_lambda = math.sin(lambda_current)
-        cos_lambda = math.cos(lambda_current)
-        sin_sigma = math.sqrt((cos_u2 * sin_lambda) ** 2 + (cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lambda) ** 2)
-        if sin_sigma == 0:
-            return 0.0  # coincident points
-        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lambda
-        sigma = math.atan2(sin_sigma, cos_sigma)
-        sin_alpha = cos_u1 * cos_u2 * sin_lambda / sin_sigma
-        cos_sq_alpha = 1 - sin_alpha ** 2
-        try:
-            cos2sigma_m = cos_sigma - 2 * sin_u1 * sin_u2 / cos_sq_alpha
-        except ZeroDivisionError:
-            cos2sigma_m = 0
-        C = f / 16 * cos_sq_alpha * (4 + f * (4 - 3 * cos_sq_alpha))
-        lambda_prev = copy.copy(lambda_current)
-        lambda_current = lambda_initial + (1 - C) * f * sin_alpha * (sigma + C * sin_sigma * (cos2sigma_m + C * cos_sigma * (-1 + 2 * cos2sigma_m**2)))
-        if abs(lambda_current - lambda_prev) < convergence_threshold:
-            break  # successful convergence
-    else:
-        return None  # failure to converge
+    point1 = np.asarray(point1, dtype=float)
+    point2 = np.asarray(point2, dtype=float)
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(point1[0], point1[1], point2[0], point2[1])
+    shape = lat1.shape
+    # Work on flat arrays and reshape at the end so single points and arrays are handled identically.
+    lat1, lon1, lat2, lon2 = [np.ravel(i) for i in (lat1, lon1, lat2, lon2)]
+
+    u1 = np.arctan((1 - f) * np.tan(np.radians(lat1)))
+    u2 = np.arctan((1 - f) * np.tan(np.radians(lat2)))
+    lambda_initial = np.radians(lon2 - lon1)
+    lambda_current = lambda_initial.copy()
+
+    sin_u1 = np.sin(u1)
+    cos_u1 = np.cos(u1)
+    sin_u2 = np.sin(u2)
+    cos_u2 = np.cos(u2)
+
+    # Iterate all the points together, keeping the terms for each point from the iteration in which it converged.
+    coincident = (lat1 == lat2) & (lon1 == lon2)
+    done = coincident.copy()
+    sin_sigma_final, cos_sigma_final, sigma_final, cos_sq_alpha_final, cos2sigma_m_final = \
+        [np.zeros(lambda_initial.shape) for _ in range(5)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for iteration in range(max_iterations):
+            sin_lambda = np.sin(lambda_current)
+            cos_lambda = np.cos(lambda_current)
+            sin_sigma = np.sqrt((cos_u2 * sin_lambda) ** 2 + (cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lambda) ** 2)
+            coincident |= ~done & (sin_sigma == 0)
+            done |= coincident
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lambda
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = cos_u1 * cos_u2 * sin_lambda / sin_sigma
+            cos_sq_alpha = 1 - sin_alpha ** 2
+            cos2sigma_m = np.where(cos_sq_alpha == 0, 0, cos_sigma - 2 * sin_u1 * sin_u2 / cos_sq_alpha)
+            C = f / 16 * cos_sq_alpha * (4 + f * (4 - 3 * cos_sq_alpha))
+            lambda_prev = lambda_current
+            lambda_current = lambda_initial + (1 - C) * f * sin_alpha * (sigma + C * sin_sigma * (cos2sigma_m + C * cos_sigma * (-1 + 2 * cos2sigma_m**2)))
+
+            converged = ~done & (np.abs(lambda_current - lambda_prev) < convergence_threshold)
+            for final, current in ((sin_sigma_final, sin_sigma), (cos_sigma_final, cos_sigma),
+                                   (sigma_final, sigma), (cos_sq_alpha_final, cos_sq_alpha),
+                                   (cos2sigma_m_final, cos2sigma_m)):
+                final[converged] = current[converged]
+            done |= converged
+            lambda_current = np.where(done, lambda_prev, lambda_current)
+            if np.all(done):
+                break
+
+    sin_sigma, cos_sigma, sigma = sin_sigma_final, cos_sigma_final, sigma_final
+    cos_sq_alpha, cos2sigma_m = cos_sq_alpha_final, cos2sigma_m_final
 
     u_sq = cos_sq_alpha * (a ** 2 - b ** 2) / (b ** 2)
     A = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
@@ -5263,7 +6254,15 @@ def vincenty_distance(point1, point2, miles=False):
     if miles:
         s *= miles_per_kilometre  # kilometres to miles
 
-    return round(s, 6)
+    s[coincident] = 0
+    s[~done] = np.nan  # failure to converge
+
+    if not shape:
+        if np.isnan(s[0]):
+            return None
+        return round(float(s[0]), 6)
+
+    return np.round(s, 6).reshape(shape)
 
 
 def haversine_distance(point1, point2, miles=False):
@@ -5276,9 +6275,12 @@ def haversine_distance(point1, point2, miles=False):
     Parameters
     ----------
     point1 : list, tuple, np.ndarray
-        Decimal degree longitude and latitude for the start.
+        Decimal degree longitude and latitude for the start. Give arrays
+        of longitudes and latitudes (i.e. shaped (2, n)) to calculate many
+        distances at once.
     point2 : list, tuple, np.ndarray
-        Decimal degree longitude and latitude for the end.
+        Decimal degree longitude and latitude for the end. Must broadcast
+        against `point1'.
     miles : bool, optional
         Set to True to return the distance in miles. Defaults to False (kilometres).
 
@@ -5290,8 +6292,8 @@ def haversine_distance(point1, point2, miles=False):
     """
 
     # Convert all decimal degree inputs to radians.
-    point1 = np.deg2rad(point1)
-    point2 = np.deg2rad(point2)
+    point1 = np.deg2rad(np.asarray(point1, dtype=float))
+    point2 = np.deg2rad(np.asarray(point2, dtype=float))
 
     R = 6371                           # Earth's mean radius in kilometres
     delta_lat = point2[1] - point1[1]  # difference in latitude
@@ -5402,21 +6404,15 @@ def reduce_triangulation(tri, nodes, return_elements=False):
 
     """
 
-    # The node IDs must be sorted otherwise you can end up changing a given ID multiple times, which makes for quite
-    # the mess, I can assure you.
-    nodes = np.sort(nodes)
-
-    reduced_tri = tri[np.all(np.isin(tri, nodes), axis=1), :]
+    # Sort the node IDs so the new index of each node is its position in the sorted list.
+    nodes = np.sort(np.ravel(nodes))
 
-    # Remap nodes to a new index. Use a copy of the reduced triangulation for the lookup so we avoid potentially
-    # remapping a node twice.
-    original_tri = reduced_tri.copy()
-    new_index = np.arange(0, len(nodes))
-    for this_old, this_new in zip(nodes, new_index):
-        reduced_tri[original_tri == this_old] = this_new
+    tri = np.asarray(tri)
+    keep = np.all(np.isin(tri, nodes), axis=1)
+    reduced_tri = np.searchsorted(nodes, tri[keep, :]).astype(tri.dtype)
 
     if return_elements:
-        ele_ind = np.where(np.all(np.isin(tri, nodes), axis=1))[0]
+        ele_ind = np.where(keep)[0]
         reduced_tri = [reduced_tri, ele_ind]
 
     return reduced_tri
@@ -6050,29 +7046,79 @@ def get_barycentric_coords(x, y,x_tri, y_tri):
 
     return phi
 
-def _get_ele_nodes(positions, x, y, triangles):
-    tri = Triangulation(x, y, triangles)
-    finder = tri.get_trifinder()
-    eles = finder(positions[:,0], positions[:,1])
-    return triangles[eles,:]                
+def _barycentric_weights(positions, x, y, triangles, finder=None):
+    """
+    Find the element containing each position and the position's barycentric coordinates within it.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        The positions to locate [n, 2].
+    x, y : np.ndarray
+        The grid node positions.
+    triangles : np.ndarray
+        The grid triangulation table (zero-indexed).
+    finder : matplotlib.tri.TriFinder, optional
+        A TriFinder for the grid (e.g. from PyFVCOM.grid.Domain._trifinder). If omitted, one is built.
+
+    Returns
+    -------
+    elements : np.ndarray
+        The element containing each position (-1 for positions outside the grid).
+    weights : np.ndarray
+        The barycentric coordinates of each position relative to its element's nodes [n, 3] (NaN outside the grid).
 
-def _interpolate_within_element(var, phi):
-    return var[0] * phi[0] +  var[1] * phi[1] + var[2] * phi[2]
+    """
 
-def interpolate_node_barycentric(positions, data, x, y, triangles):
+    positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+    if finder is None:
+        finder = Triangulation(x, y, triangles).get_trifinder()
+
+    elements = np.asarray(finder(positions[:, 0], positions[:, 1]))
+    inside = elements != -1
+    element_nodes = triangles[elements[inside]]
+    weights = np.full((len(positions), 3), np.nan)
+    weights[inside] = np.column_stack(get_barycentric_coords(positions[inside, 0], positions[inside, 1],
+                                                             x[element_nodes].T, y[element_nodes].T))
+
+    return elements, weights
+
+
+def interpolate_node_barycentric(positions, data, x, y, triangles, finder=None):
     """
     Interpolate linearly from node values to positions using barycentric coordinates.
     This is to mimic the functions in PyLAG
 
+    Parameters
+    ----------
+    positions : np.ndarray
+        The positions to which to interpolate [n, 2].
+    data : np.ndarray
+        The node data, with nodes as the first dimension.
+    x, y : np.ndarray
+        The grid node positions.
+    triangles : np.ndarray
+        The grid triangulation table (zero-indexed).
+    finder : matplotlib.tri.TriFinder, optional
+        A TriFinder for the grid to reuse. If omitted, one is built.
+
+    Returns
+    -------
+    interped_data : np.ndarray
+        The data interpolated to each position (NaN for positions outside the grid). Any trailing dimensions of
+        `data' follow the positions.
+
     """
-    position_ele_nodes = _get_ele_nodes(positions, x, y, triangles)
 
-    interped_data = []
-    for this_pos, this_nodes in zip(positions, position_ele_nodes):
-        this_phi = get_barycentric_coords(this_pos[0], this_pos[1], x[this_nodes], y[this_nodes])
-        interped_data.append(_interpolate_within_element(data[this_nodes], this_phi))
+    elements, phi = _barycentric_weights(positions, x, y, triangles, finder=finder)
+
+    data = np.asarray(data)
+    # Outside the grid, the element (-1) is a dummy; the NaN weights make the result NaN anyway.
+    element_data = data[triangles[elements]].astype(float)
+    phi = phi.reshape(phi.shape + (1,) * (element_data.ndim - 2))
+
+    return np.sum(element_data * phi, axis=1)
 
-    return np.asarray(interped_data)
 
 def generalised_barycentric(x, y,x_poly, y_poly):
     """ Get barycentric coordinates.
@@ -6364,25 +7410,36 @@ def interpolate_regular(fvcom_obj, fvcom_name, coarse_name, coarse, interval=1,
         if verbose:
             print('Interpolating sigma data...', end=' ')
 
-        nt = coarse.dims.time  # rename!
-        interp_args = [(x, y, fvcom_obj.sigma.layers_z,
-                coarse, coarse_name, fvcom_obj._debug, t) for t in np.arange(nt)]
-        if hasattr(coarse, 'ds'):
-            coarse.ds.close()
-            delattr(coarse, 'ds')
-        pool = multiprocessing.Pool()
-        results = pool.map(_brute_force_interpolator, interp_args)
-
-        # Now we have those data interpolated in space (horizontal and 
-        # vertical), interpolate to match in time.
-        interp_args = [(coarse.time.time, j, fvcom_obj.time.time)
-                for i in np.asarray(results).T for j in i]
-        results = pool.map(_interpolate_in_time, interp_args)
-        pool.close()
-        # Reshape and transpose to be the correct size for writing to 
-        # netCDF (time, depth, node).
-        interpolated_coarse_data = np.asarray(results).reshape(
-                  nz, nx, -1).transpose(2, 0, 1)
+        # The coarse grid and the boundary positions don't change, so compute the interpolation weights once (and
+        # reuse them for subsequent variables) and apply them to each time in turn.
+        coarse_layer_depth = None
+        if np.ndim(coarse.grid.siglay_z) != 4:
+            coarse_layer_depth = coarse.grid.siglay_z
+        regridders = getattr(fvcom_obj, '_regular_regridders', {})
+        regridder = regridders.get(mode)
+        if regridder is None or not regridder.matches(coarse.grid.lon, coarse.grid.lat, x, y,
+                                                      fvcom_obj.sigma.layers_z, coarse_layer_depth):
+            regridder = RegularRegridder(coarse.grid.lon, coarse.grid.lat, x, y, fvcom_obj.sigma.layers_z,
+                                         coarse_layer_depth=coarse_layer_depth)
+            regridders[mode] = regridder
+            fvcom_obj._regular_regridders = regridders
+
+        coarse_data = getattr(coarse.data, coarse_name)
+        results = np.empty((coarse.dims.time, nx, nz))
+        for t in range(coarse.dims.time):
+            if fvcom_obj._debug:
+                print(f'Interpolating time {t} of {coarse.dims.time}')
+            layer_depth = None
+            if coarse_layer_depth is None:
+                layer_depth = coarse.grid.siglay_z[..., t]
+            results[t] = regridder.interpolate(coarse_data[t, ...], layer_depth)
+
+        # Now we have those data interpolated in space (horizontal and vertical), interpolate to match in time and
+        # transpose to be the correct shape for writing to netCDF (time, depth, node).
+        lower, upper, weight = _interpolation_stencil(fvcom_obj.time.time, coarse.time.time)
+        interpolated_coarse_data = _apply_stencil(results, lower[:, np.newaxis, np.newaxis],
+                                                  upper[:, np.newaxis, np.newaxis],
+                                                  weight[:, np.newaxis, np.newaxis]).transpose(0, 2, 1)
     else:
         if verbose:
             print('Interpolating z-level data...', end=' ')
@@ -6427,15 +7484,256 @@ def avg_nest_force_vel(fvcom_obj):
     fvcom_obj.data.ua = zbar(fvcom_obj.data.u, layer_thickness)
     fvcom_obj.data.va = zbar(fvcom_obj.data.v, layer_thickness)
 
+def _interpolation_stencil(x, xp):
+    """
+    Find the neighbours and weights which reproduce np.interp(x, xp, fp) as fp[lower] * (1 - weight) + fp[upper] *
+    weight for any `fp'.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        The positions at which to interpolate.
+    xp : np.ndarray
+        The (increasing) positions of the data.
+
+    Returns
+    -------
+    lower, upper : np.ndarray
+        Indices into `xp' of the neighbours of each `x'.
+    weight : np.ndarray
+        The weight of the upper neighbour. Positions outside `xp' take the nearest end value (as np.interp).
+
+    """
+
+    x = np.asarray(x, dtype=float)
+    xp = np.asarray(xp, dtype=float)
+    if len(xp) == 1:
+        zeros = np.zeros(x.shape, dtype=int)
+        return zeros, zeros, np.zeros(x.shape)
+
+    lower = np.clip(np.searchsorted(xp, x, side='right') - 1, 0, len(xp) - 2)
+    upper = lower + 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = np.clip((x - xp[lower]) / (xp[upper] - xp[lower]), 0, 1)
+    weight[~np.isfinite(weight)] = 0
+
+    return lower, upper, weight
+
+
+def _apply_stencil(data, lower, upper, weight, axis=0):
+    """ Apply an interpolation stencil from `_interpolation_stencil' along `axis' of `data'. """
+
+    lower_values = np.take_along_axis(data, lower, axis=axis)
+    upper_values = np.take_along_axis(data, upper, axis=axis)
+    # Don't let NaNs in a neighbour with no weight leak into the result.
+    return np.where(weight == 0, lower_values,
+                    np.where(weight == 1, upper_values, lower_values * (1 - weight) + upper_values * weight))
+
+
+class RegularRegridder(object):
+    """
+    Reusable interpolation from a regular (lon, lat) grid with (optionally time-varying) vertical layers onto a set
+    of positions with their own layer depths (e.g. open boundary nodes).
+
+    The horizontal (linear, on the Delaunay triangulation of the regular grid) weights are computed once as a
+    sparse matrix and the vertical interpolation stencils are computed once for static coarse layer depths, so
+    each time step is a sparse matrix product and a gather rather than a new triangulation per level.
+
+    Methods
+    -------
+    horizontal - interpolate fields on the regular grid to the positions
+    vertical_stencil - find the vertical interpolation stencil for the given coarse layer depths
+    interpolate - interpolate a single time of layered coarse data onto the positions and their layers
+    matches - check whether this regridder was built for the given grids
+
+    """
+
+    def __init__(self, lon, lat, x, y, layer_depth, coarse_layer_depth=None):
+        """
+        Parameters
+        ----------
+        lon, lat : np.ndarray
+            The regular grid coordinate vectors.
+        x, y : np.ndarray
+            The positions onto which to interpolate (in the same coordinates as `lon' and `lat').
+        layer_depth : np.ndarray
+            The layer depths at the positions (positions, layers).
+        coarse_layer_depth : np.ndarray, optional
+            Static regular grid layer depths (layers, lat, lon). If given, the vertical stencils are computed now and
+            reused for every call to `interpolate'.
+
+        """
+
+        self.lon = np.asarray(lon)
+        self.lat = np.asarray(lat)
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.layer_depth = np.asarray(layer_depth)
+
+        coarse_lon, coarse_lat = np.meshgrid(self.lon, self.lat)
+        self._coarse_points = np.column_stack((coarse_lon.ravel(), coarse_lat.ravel()))
+        points = np.column_stack((self.x, self.y))
+
+        self.weights, self._outside = linear_interpolation_weights(self._coarse_points, points)
+
+        self._fill_trees = {}
+        self._stencil = None
+        self._coarse_layer_depth = coarse_layer_depth
+        if coarse_layer_depth is not None:
+            self._stencil = self.vertical_stencil(coarse_layer_depth)
+
+    def matches(self, lon, lat, x, y, layer_depth, coarse_layer_depth=None):
+        """ Return True if this regridder was built for the given grids. """
+        pairs = ((self.lon, lon), (self.lat, lat), (self.x, x), (self.y, y), (self.layer_depth, layer_depth),
+                 (self._coarse_layer_depth, coarse_layer_depth))
+        return all(np.array_equal(a, b) for a, b in pairs)
+
+    def horizontal(self, fields, fill=True, neighbours=8):
+        """
+        Interpolate fields on the regular grid to the positions.
+
+        Parameters
+        ----------
+        fields : np.ndarray
+            The regular grid data (lat, lon) or (layers, lat, lon). Masked values are treated as missing.
+        fill : bool, optional
+            Set to False to leave positions which interpolate to NaN (outside the grid or next to missing data) as
+            NaN. By default, they are filled with the inverse distance weighted mean of the nearest valid grid data.
+        neighbours : int, optional
+            The number of nearest valid grid points used to fill missing positions. Defaults to 8.
+
+        Returns
+        -------
+        interpolated : np.ndarray
+            The interpolated data (positions) or (positions, layers).
+
+        """
+
+        fields = np.ma.filled(np.ma.asarray(fields, dtype=float), np.nan)
+        single = fields.ndim == 2
+        fields = fields.reshape(-1, len(self._coarse_points)).T
+        interpolated = np.asarray(self.weights @ fields)
+        interpolated[self._outside] = np.nan
+
+        if fill:
+            for layer in np.flatnonzero(np.isnan(interpolated).any(axis=0)):
+                bad = np.isnan(interpolated[:, layer])
+                valid = ~np.isnan(fields[:, layer])
+                if not np.any(valid):
+                    continue
+                valid_values = fields[valid, layer]
+                nearest = min(neighbours, len(valid_values))
+                distance, index = self._fill_tree(layer, valid).query(np.column_stack((self.x[bad], self.y[bad])),
+                                                                      k=nearest)
+                distance, index = distance.reshape(-1, nearest), index.reshape(-1, nearest)
+                with np.errstate(divide='ignore'):
+                    weight = 1 / distance
+                # Coincident points take the value at that point.
+                coincident = np.isinf(weight)
+                weight[coincident.any(axis=1)] = coincident[coincident.any(axis=1)]
+                interpolated[bad, layer] = (weight * valid_values[index]).sum(axis=1) / weight.sum(axis=1)
+
+        if single:
+            interpolated = interpolated[:, 0]
+
+        return interpolated
+
+    def _fill_tree(self, layer, valid):
+        """ Return a KD-tree of the valid grid points for a layer, reusing the last one if the mask is unchanged. """
+        if layer in self._fill_trees:
+            last_valid, tree = self._fill_trees[layer]
+            if np.array_equal(last_valid, valid):
+                return tree
+        tree = scipy.spatial.cKDTree(self._coarse_points[valid])
+        self._fill_trees[layer] = (valid, tree)
+
+        return tree
+
+    def vertical_stencil(self, coarse_layer_depth):
+        """
+        Find the stencil which interpolates the horizontally interpolated coarse profiles onto the position layers.
+        At each position, the coarse water column (ignoring layers with no depth, i.e. below the sea bed) is
+        squeezed into the range of the position layer depths before interpolating.
+
+        Parameters
+        ----------
+        coarse_layer_depth : np.ndarray
+            The regular grid layer depths (layers, lat, lon).
+
+        Returns
+        -------
+        stencil : tuple
+            The (lower, upper, weight) arrays (positions, position layers) to pass to `_apply_stencil'. Positions
+            with no valid coarse depths have NaN weights.
+
+        """
+
+        coarse_depth = self.horizontal(coarse_layer_depth, fill=False)
+        shape = self.layer_depth.shape
+        lower = np.zeros(shape, dtype=int)
+        upper = np.zeros(shape, dtype=int)
+        weight = np.full(shape, np.nan)
+        for position in range(len(self.x)):
+            valid = np.flatnonzero(~np.isnan(coarse_depth[position]))
+            if not len(valid):
+                continue
+            depths = self.layer_depth[position]
+            squashed = fix_range(coarse_depth[position, valid], depths.min(), depths.max())
+            below, above, weight[position] = _interpolation_stencil(depths, squashed)
+            lower[position], upper[position] = valid[below], valid[above]
+
+        return lower, upper, weight
+
+    def interpolate(self, data, coarse_layer_depth=None):
+        """
+        Interpolate a single time of layered regular grid data onto the positions and their layers.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            The regular grid data (layers, lat, lon).
+        coarse_layer_depth : np.ndarray, optional
+            The regular grid layer depths (layers, lat, lon) for this time. Required if the regridder was not given
+            static layer depths.
+
+        Returns
+        -------
+        interpolated : np.ndarray
+            The interpolated data (positions, position layers). Any remaining gaps are filled by linear
+            interpolation along each layer from the valid positions.
+
+        """
+
+        if coarse_layer_depth is not None:
+            stencil = self.vertical_stencil(coarse_layer_depth)
+        elif self._stencil is not None:
+            stencil = self._stencil
+        else:
+            raise ValueError('No coarse layer depths supplied for the vertical interpolation.')
+
+        lower, upper, weight = stencil
+        profiles = self.horizontal(data)
+        interpolated = _apply_stencil(profiles, lower, upper, np.nan_to_num(weight), axis=1)
+        interpolated[np.isnan(weight)] = np.nan
+
+        # Make sure we remove any NaNs from the vertical profiles by replacing with the interpolated data from the
+        # non-NaN data in the vicinity.
+        for layer in np.flatnonzero(np.isnan(interpolated).any(axis=0)):
+            horizontal_slice = interpolated[:, layer]
+            good_indices = ~np.isnan(horizontal_slice)
+            interpolator = LinearNDInterpolator((self.x[good_indices], self.y[good_indices]),
+                                                horizontal_slice[good_indices])
+            interpolated[:, layer] = interpolator((self.x, self.y))
+
+        return interpolated
+
+
 def _brute_force_interpolator(args):
     """
     Interpolate a given time of coarse data into the current open boundary node positions and times.
 
-    The name stems from the fact we simply iterate through all the points (horizontal and vertical) in the
-    current boundary rather than using LinearNDInterpolator. This is because the creation of a
-    LinearNDInterpolator object for a 4D set of points is hugely expensive (even compared with this brute force
-    approach). Plus, this is easy to parallelise. It may be more sensible for use RegularGridInterpolators for
-    each position in a loop since the vertical and time are regularly spaced.
+    This makes a new RegularRegridder for every call, so when interpolating many times, make a RegularRegridder
+    once and call its `interpolate' method for each time instead (as interpolate_regular does).
 
     Parameters
     ----------
@@ -6461,104 +7759,20 @@ def _brute_force_interpolator(args):
     The interpolated boundary data at `x', `y', `fvcom_layer_depth' for coarse.data.coarse_name at time index `t'.
 
     """
-    # MATLAB interp_coarse_to_obc.m reimplementation in Python with some tweaks. The only difference is I renamed
-    # the variables as the MATLAB ones were horrible.
-    #
-    # This gets slower the more variables you interpolate (i.e. each successive variable being interpolated
-    # increases the time it takes to interpolate). This is probably a memory overhead from using
-    # multiprocessing.Pool.map().
-    x, y, fvcom_layer_depth, coarse, coarse_name, verbose, t = args
-
-    num_fvcom_z = fvcom_layer_depth.shape[-1]
-    num_fvcom_points = len(x)
 
-    num_coarse_z = coarse.grid.siglay_z.shape[0]  # rename!
+    x, y, fvcom_layer_depth, coarse, coarse_name, verbose, t = args
 
     if verbose:
         print(f'Interpolating time {t} of {coarse.dims.time}')
-    # Get this time's data from the coarse model.
-    coarse_data_volume = np.squeeze(getattr(coarse.data, coarse_name)[t, ...]).reshape(num_coarse_z, -1).T
 
-    interp_fvcom_data = np.full((num_fvcom_points, num_coarse_z), np.nan)
-    interp_fvcom_depth = np.full((num_fvcom_points, num_coarse_z), np.nan)
     if np.ndim(coarse.grid.siglay_z) == 4:
-        coarse_layer_depth = np.squeeze(coarse.grid.siglay_z[..., t].reshape((num_coarse_z, -1))).T
+        coarse_layer_depth = coarse.grid.siglay_z[..., t]
     else:
-        coarse_layer_depth = np.squeeze(coarse.grid.siglay_z.reshape((num_coarse_z, -1))).T
+        coarse_layer_depth = coarse.grid.siglay_z
 
-    # Go through each coarse model vertical level, interpolate the coarse model depth and data to each position
-    # in the current open boundary. Make sure we remove all NaNs.
-    for z_index in np.arange(num_coarse_z):
-        if verbose:
-            print(f'Interpolating layer {z_index} of {num_coarse_z}')
-        coarse_data_layer = coarse_data_volume[:, z_index]
-        coarse_depth_layer = coarse_layer_depth[:, z_index]
-
-        coarse_lon, coarse_lat = np.meshgrid(coarse.grid.lon, coarse.grid.lat)
-        coarse_lon, coarse_lat = coarse_lon.ravel(), coarse_lat.ravel()
-
-        interpolator = LinearNDInterpolator((coarse_lon, coarse_lat), coarse_data_layer)
-        interp_fvcom_data_layer = interpolator((x, y))
-        # Update values in the triangulation so we don't have to remake it (which can be expensive).
-        interpolator.values = coarse_depth_layer[:, np.newaxis].astype(np.float64)
-        interp_fvcom_depth_layer = interpolator((x, y))
-
-        # If we're interpolating NEMO data (and we are when we're using this method), the bottom layer will
-        # always return NaNs, so this message will always be triggered, which is a bit annoying. It'd be nice to
-        # use the tmask option when loading the NEMOReader to omit these values properly (rather than just
-        # setting them to NaN) so we could stop spitting out these messages for each interpolation. Maybe another
-        # day, eh?
-        if np.any(np.isnan(interp_fvcom_data_layer)) or np.any(np.isnan(interp_fvcom_depth_layer)):
-            bad_indices = np.argwhere(np.isnan(interp_fvcom_data_layer))
-            if len(bad_indices) == 1:
-                singular_plural = ''
-            else:
-                singular_plural = 's'
-            warn(f'{len(bad_indices)} FVCOM boundary node{singular_plural} returned NaN after interpolation. Using '
-                 f'inverse distance interpolation instead.')
-            for bad_index in bad_indices:
-                weight = 1 / np.hypot(coarse_lon - x[bad_index], coarse_lat - y[bad_index])
-                weight = weight / weight.max()
-                interp_fvcom_data_layer[bad_index] = (coarse_data_layer * weight).sum() / weight.sum()
-                interp_fvcom_depth_layer[bad_index] = (coarse_depth_layer * weight).sum() / weight.sum()
-
-        interp_fvcom_data[:, z_index] = interp_fvcom_data_layer
-        interp_fvcom_depth[:, z_index] = interp_fvcom_depth_layer
-
-    # Now for each point in the current open boundary points (x, y), interpolate the interpolated (in the
-    # horizontal) coarse model data onto the FVCOM vertical grid.
-    interp_fvcom_boundary = np.full((num_fvcom_points, num_fvcom_z), np.nan)
-    for p_index in np.arange(num_fvcom_points):
-        if verbose:
-            print(f'Interpolating point {p_index} of {num_fvcom_points}')
-        fvcom_point_depths = fvcom_layer_depth[p_index, :]
-        coarse_point_depths = interp_fvcom_depth[p_index, :]
-
-        # Drop the NaN values from the coarse depths and data (where we're at the bottom of the water column).
-        nan_depth = np.isnan(coarse_point_depths)
-        coarse_point_depths = coarse_point_depths[~nan_depth]
-        interp_vertical_profile = interp_fvcom_data[p_index, ~nan_depth]
-
-        # Squeeze the coarse model water column into the FVCOM one.
-        norm_coarse_point_depths = fix_range(coarse_point_depths,
-                                             fvcom_point_depths.min(),
-                                             fvcom_point_depths.max())
-
-        if not np.any(np.isnan(coarse_point_depths)):
-            interp_fvcom_boundary[p_index, :] = np.interp(fvcom_point_depths,
-                                                          norm_coarse_point_depths,
-                                                          interp_vertical_profile)
-
-    # Make sure we remove any NaNs from the vertical profiles by replacing with the interpolated data from the
-    # non-NaN data in the vicinity.
-    for p_index in np.arange(num_fvcom_z):
-        horizontal_slice = interp_fvcom_boundary[:, p_index]
-        if np.any(np.isnan(horizontal_slice)):
-            good_indices = ~np.isnan(horizontal_slice)
-            interpolator = LinearNDInterpolator((x[good_indices], y[good_indices]), horizontal_slice[good_indices])
-            interp_fvcom_boundary[:, p_index] = interpolator((x, y))
+    regridder = RegularRegridder(coarse.grid.lon, coarse.grid.lat, x, y, fvcom_layer_depth)
 
-    return interp_fvcom_boundary
+    return regridder.interpolate(getattr(coarse.data, coarse_name)[t, ...], coarse_layer_depth)
 
 def _interpolate_in_time(args):
     """
@@ -3,6 +3,9 @@
 from __future__ import print_function
 
 import copy
+import hashlib
+import multiprocessing
+import time
 from datetime import datetime
 from pathlib import Path
 from warnings import warn
@@ -12,6 +15,7 @@ import cartopy.crs as ccrs
 import cartopy.feature as cfeature
 import cartopy.io.shapereader as shpreader
 from shapely.ops import cascaded_union
+import matplotlib.path as mpath
 import matplotlib.widgets
 import mpl_toolkits.axes_grid1
 import numpy as np
@@ -22,13 +26,15 @@ from matplotlib import rcParams
 from matplotlib import cm as mplcm
 from matplotlib.animation import FuncAnimation
 from matplotlib.dates import DateFormatter, date2num
+from matplotlib.tri import Triangulation
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 from shapely.geometry import Polygon, Point, LineString
 
 from PyFVCOM.coordinate import lonlat_from_utm, utm_from_lonlat
 from PyFVCOM.current import vector2scalar
 from PyFVCOM.grid import get_boundary_polygons
-from PyFVCOM.grid import getcrossectiontriangles, unstructured_grid_depths, Domain, nodes2elems, mp_interp_func
+from PyFVCOM.grid import getcrossectiontriangles, unstructured_grid_depths, Domain, nodes2elems
+from PyFVCOM.grid import linear_interpolation_weights
 from PyFVCOM.ocean import depth2pressure, dens_jackett
 from PyFVCOM.read import FileReader
 from PyFVCOM.utilities.general import PassiveStore, warn
@@ -442,6 +448,61 @@ class Time(object):
             self.surface_plot.set_array(time_series)
 
 
+# Land masks for the regular grids used for streamlines and quivers (see Plotter._make_regular_grid), keyed on the
+# grid, extent and spacing. Only the most recent few are kept.
+_regular_grid_masks = collections.OrderedDict()
+
+# Interpolation operators from the model elements to the regular grids used for streamlines (see
+# Plotter.plot_streamlines), keyed on the element and regular grid positions. Only the most recent few are kept.
+_regridding_operators = collections.OrderedDict()
+
+
+def _array_digest(array):
+    """ A short fingerprint of an array's contents for use in cache keys. """
+    array = np.ascontiguousarray(np.ma.getdata(array))
+    return array.shape, hashlib.sha1(array.tobytes()).hexdigest()
+
+
+def _outside_mesh(x, y, triangles, sample_x, sample_y):
+    """
+    Find which sample positions are outside a triangular mesh in a single vectorised pass.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        The mesh node positions.
+    triangles : np.ndarray
+        The mesh triangulation table (zero-indexed).
+    sample_x, sample_y : np.ndarray
+        The positions to check (any shape).
+
+    Returns
+    -------
+    outside : np.ndarray
+        True for positions which are not in any element (the same shape as `sample_x').
+
+    Notes
+    -----
+    Uses the matplotlib trapezoid map trifinder. If that fails (it needs a valid, non-overlapping triangulation),
+    we fall back to testing the positions against the model boundary polygons: inside the largest polygon (the open
+    sea) and outside all the others (islands).
+
+    """
+
+    samples = np.column_stack((np.ravel(sample_x), np.ravel(sample_y)))
+    try:
+        trifinder = Triangulation(np.asarray(x), np.asarray(y), triangles).get_trifinder()
+        outside = trifinder(samples[:, 0], samples[:, 1]) == -1
+    except (RuntimeError, ValueError):
+        boundaries = [mpath.Path(np.column_stack((x[i], y[i]))) for i in get_boundary_polygons(triangles)]
+        inside = np.asarray([boundary.contains_points(samples) for boundary in boundaries])
+        # The polygon enclosing the most samples is the model boundary, the rest are islands.
+        main = np.argmax(inside.sum(axis=1))
+        outside = ~inside[main] | np.any(np.delete(inside, main, axis=0), axis=0)
+
+    return outside.reshape(np.shape(sample_x))
+
+
 class Plotter(object):
     """ Create plot objects based on output from the FVCOM.
 
@@ -996,7 +1057,7 @@ class Plotter(object):
             # just update the array with set_array. If it doesn't match, the only way to mask the data properly is to
             # make a brand new plot.
             if 'mask' in kwargs:
-                if len(self.tripcolor_plot.get_array()) == ~kwargs['mask'].sum():
+                if len(self.tripcolor_plot.get_array()) == (~kwargs['mask']).sum():
                     if self._debug:
                         print('updating')
                     # Mask is probably the same as the previous one (based on number of positions). Mask sense needs
@@ -1288,19 +1349,38 @@ class Plotter(object):
                 plot_x, plot_y = self._regular_x[0, :], self._regular_y[:, 0]
             fvcom_x, fvcom_y = self.lonc[self._mask_for_unstructured], self.latc[self._mask_for_unstructured]
 
-        # Interpolate whatever positions we have (spherical/cartesian).
-        ua_r = mp_interp_func((fvcom_x, fvcom_y, u[self._mask_for_unstructured], self._regular_x, self._regular_y))
-        va_r = mp_interp_func((fvcom_x, fvcom_y, v[self._mask_for_unstructured], self._regular_x, self._regular_y))
+        # Interpolate whatever positions we have (spherical/cartesian). The interpolation weights only depend on the
+        # positions, so make them once and reuse them for every field and every subsequent plot on the same grid.
+        regular_x, regular_y = np.ma.getdata(self._regular_x), np.ma.getdata(self._regular_y)
+        key = (_array_digest(fvcom_x), _array_digest(fvcom_y), _array_digest(regular_x), _array_digest(regular_y))
+        if key in _regridding_operators:
+            _regridding_operators.move_to_end(key)
+            weights, outside = _regridding_operators[key]
+        else:
+            weights, outside = linear_interpolation_weights(np.column_stack((fvcom_x, fvcom_y)),
+                                                            np.column_stack((regular_x.ravel(), regular_y.ravel())))
+            _regridding_operators[key] = weights, outside
+            while len(_regridding_operators) > 8:
+                _regridding_operators.popitem(last=False)
 
+        fields = [u, v]
         # Check for a colour map in kwargs and if we have one, make a magnitude array for the plot. Check we haven't
         # been given a color array in kwargs too.
+        interpolate_colour = self.cmap is not None and 'color' in kwargs
+        if interpolate_colour:
+            fields.append(np.squeeze(kwargs.pop('color')))
+        # Interpolate all the fields in one go. Masked (e.g. dry) values become NaNs.
+        fields = np.column_stack([np.ma.filled(np.ma.asarray(i, dtype=float)[self._mask_for_unstructured], np.nan)
+                                  for i in fields])
+        regridded = weights @ fields
+        regridded[outside] = np.nan
+        regridded = regridded.T.reshape((-1,) + regular_x.shape)
+        ua_r, va_r = regridded[0], regridded[1]
+
         speed_r = None
         if self.cmap is not None:
-            if 'color' in kwargs:
-                speed_r = mp_interp_func((fvcom_x, fvcom_y,
-                                          np.squeeze(kwargs['color'])[self._mask_for_unstructured],
-                                          self._regular_x, self._regular_y))
-                kwargs.pop('color', None)
+            if interpolate_colour:
+                speed_r = regridded[2]
             else:
                 speed_r = np.hypot(ua_r, va_r)
 
@@ -1380,8 +1460,8 @@ class Plotter(object):
         Make a regular grid at intervals of `dx', `dy' for the current plot domain. Supports both spherical and
         cartesian grids.
 
-        Locations which are either outside the model domain (defined as the largest polygon by area) or on islands
-        are stored in the self._mask_for_regular array.
+        Locations which are either outside the model domain or on islands (i.e. not in any model element) are stored
+        in the self._mask_for_regular array. The mask is cached for other plots of the same grid, extent and spacing.
 
         Locations in the FVCOM grid which are outside the plotting extent are masked in the
         self._mask_for_unstructured array.
@@ -1452,46 +1532,24 @@ class Plotter(object):
 
         self._mask_for_regular = np.full(self._regular_x.shape, False)
         if mask_land:
-            # Make a mask for the regular grid. This uses the model domain to identify points which are outside the
-            # grid. Those are set to False whereas those in the domain are True. We assume the longest polygon is the
-            # model boundary and all other polygons are islands within it.
-            model_boundaries = get_boundary_polygons(self.triangles)
-            model_polygons = [Polygon(np.asarray((self.lon[i], self.lat[i])).T) for i in model_boundaries]
-            polygon_areas = [i.area for i in model_polygons]
-            main_polygon_index = polygon_areas.index(max(polygon_areas))
-            # Find locations outside the main model domain.
-            ocean_indices, land_indices = [], []
-            for index, sample in enumerate(zip(np.array((self._regular_x.ravel(), self._regular_y.ravel())).T)):
-                point = Point(sample[0])
-                if self._debug:
-                    print(f'Checking outside domain point {index} of {len(self._regular_x.ravel())}', flush=True)
-                if point.intersects(model_polygons[main_polygon_index]):
-                    ocean_indices.append(index)
-                else:
-                    land_indices.append(index)
-
-            # Mask off indices outside the main model domain.
-            ocean_row, ocean_column = np.unravel_index(ocean_indices, self._regular_x.shape)
-            land_row, land_column = np.unravel_index(land_indices, self._regular_x.shape)
-            self._mask_for_regular[land_row, land_column] = True
-
-            # To remove the sampling stations on islands, identify points which intersect the remaining polygons,
-            # and then remove them from the sampling site list.
-            land_indices = []
-            # Exclude the main polygon from the list of polygons.
-            # TODO: This is ripe for parallelisation, especially as it's pretty slow in serial.
-            for pi, polygon in enumerate([i for count, i in enumerate(model_polygons) if count != main_polygon_index]):
-                for oi, (row, column, index) in enumerate(zip(ocean_row, ocean_column, ocean_indices)):
-                    point = Point((self._regular_x[row, column], self._regular_y[row, column]))
-                    if self._debug:
-                        print(f'Polygon {pi + 1} of {len(model_polygons) - 1}: '
-                              f'ocean point {oi} of {len(ocean_indices)}', flush=True)
-                    if point.intersects(polygon):
-                        land_indices.append(index)
-
-            # Mask off island indices.
-            land_row, land_column = np.unravel_index(land_indices, self._regular_x.shape)
-            self._mask_for_regular[land_row, land_column] = True
+            # Mask the regular grid positions which are outside the model domain (on land or islands). These are
+            # the positions which aren't in any model element. The mask is the expensive part, so keep it for
+            # other plots of the same grid, extent and spacing.
+            if self.cartesian:
+                node_x, node_y = self.x, self.y
+            else:
+                node_x, node_y = self.lon, self.lat
+            key = (self.cartesian, dx, dy, west, east, south, north,
+                   _array_digest(self.triangles), _array_digest(node_x), _array_digest(node_y))
+            if key in _regular_grid_masks:
+                _regular_grid_masks.move_to_end(key)
+                self._mask_for_regular = _regular_grid_masks[key]
+            else:
+                self._mask_for_regular = _outside_mesh(node_x, node_y, self.triangles,
+                                                       self._regular_x, self._regular_y)
+                _regular_grid_masks[key] = self._mask_for_regular
+                while len(_regular_grid_masks) > 8:
+                    _regular_grid_masks.popitem(last=False)
 
             self._regular_x = np.ma.masked_array(self._regular_x, mask=self._mask_for_regular)
             self._regular_y = np.ma.masked_array(self._regular_y, mask=self._mask_for_regular)
@@ -1938,7 +1996,9 @@ class MPIWorker(object):
             self.have_mpi = False
 
         self.comm = comm
-        if self.have_mpi:
+        # We need a communicator as well as mpi4py to run in parallel.
+        self._parallel = self.have_mpi and self.comm is not None
+        if self._parallel:
             self.rank = self.comm.Get_rank()
         else:
             self.rank = 0
@@ -1948,6 +2008,7 @@ class MPIWorker(object):
         self.field = None
         self.label = None
         self.clims = None
+        self.plotter = None
 
     def __loader(self, fvcom_file, variable):
         """
@@ -2058,7 +2119,7 @@ class MPIWorker(object):
 
         # Find out what the range of data is so we can set the colour limits automatically, if necessary.
         if self.clims is None:
-            if self.have_mpi:
+            if self._parallel:
                 global_min = self.comm.reduce(np.nanmin(self.field), op=self.MPI.MIN)
                 global_max = self.comm.reduce(np.nanmax(self.field), op=self.MPI.MAX)
             else:
@@ -2066,8 +2127,10 @@ class MPIWorker(object):
                 global_min = np.nanmin(self.field)
                 global_max = np.nanmax(self.field)
             self.clims = [global_min, global_max]
-            if self.have_mpi:
-                self.clims = self.comm.bcast(clims, root=0)
+            if self._parallel:
+                self.clims = self.comm.bcast(self.clims, root=0)
+        if clims is None:
+            clims = self.clims
 
         if self.label is None:
             try:
@@ -2094,7 +2157,7 @@ class MPIWorker(object):
 
     def plot_field(self, fvcom_file, time_indices, variable, figures_directory, label=None, set_title=False,
                    dimensions=None, clims=None, norm=None, mask=False, figure_index=None, figure_stem=None,
-                   *args, **kwargs):
+                   *args, plotter=None, **kwargs):
         """
         Plot a given horizontal surface for `variable' for the time indices in `time_indices'.
 
@@ -2123,19 +2186,31 @@ class MPIWorker(object):
             multiple files.
         figure_stem : str
             Give a file name prefix for the saved figures. Defaults to f'{variable}_streamline'.
+        plotter : PyFVCOM.plot.Plotter, optional
+            An existing Plotter (e.g. self.plotter from a previous call for the same grid) to reuse, which saves
+            making a new figure, colour bar and projection. Each frame then only updates the plotted data.
 
         Additional args and kwargs are passed to PyFVCOM.plot.Plotter.
 
+        Provides
+        --------
+        self.plotter : PyFVCOM.plot.Plotter
+            The Plotter used for the figures.
+
         """
         self.label = label
         self._figure_prep(fvcom_file, variable, dimensions, time_indices, clims, label, **kwargs)
-        if self._noisy and self.rank == self.root:
-            list2print = kwargs
-            print(f'Creating Plotter object with kwargs. {list2print}', flush=True)
-
-        local_plot = Plotter(self.fvcom, cb_label=self.label, *args, **kwargs)
-        if local_plot.add_coast:
-            print('We have coast!')
+        if clims is None:
+            clims = self.clims
+
+        if plotter is None:
+            if self._noisy and self.rank == self.root:
+                list2print = kwargs
+                print(f'Creating Plotter object with kwargs. {list2print}', flush=True)
+            plotter = Plotter(self.fvcom, cb_label=self.label, *args, **kwargs)
+            if plotter.add_coast and self._noisy:
+                print('We have coast!')
+        local_plot = self.plotter = plotter
 
         if norm is not None:
             # Check for zero and negative values if we're LogNorm'ing the data and replace with the colour limit
@@ -2169,7 +2244,7 @@ class MPIWorker(object):
 
     def plot_streamlines(self, fvcom_file, time_indices, variable, figures_directory, dx=None, dy=None, label=None,
                          set_title=False, dimensions=None, clims=None, mask=False, figure_index=None, figure_stem=None,
-                         stkwargs=None, mask_land=True, *args, **kwargs):
+                         stkwargs=None, mask_land=True, *args, plotter=None, **kwargs):
         """
         Plot a given horizontal surface for `variable' for the time indices in `time_indices'.
 
@@ -2203,9 +2278,17 @@ class MPIWorker(object):
             Set to False to disable the (slow) masking of regular locations outside the model domain. Defaults to True.
         stkwargs : dict, optional
             Additional streamplot keyword arguments to pass.
+        plotter : PyFVCOM.plot.Plotter, optional
+            An existing Plotter (e.g. self.plotter from a previous call for the same grid) to reuse, which saves
+            making a new figure and projection and recomputing the regular grid for the streamlines.
 
         Additional args and kwargs are passed to PyFVCOM.plot.Plotter.
 
+        Provides
+        --------
+        self.plotter : PyFVCOM.plot.Plotter
+            The Plotter used for the figures.
+
         """
 
         if stkwargs is None:
@@ -2215,8 +2298,12 @@ class MPIWorker(object):
             dy = dx
 
         self._figure_prep(fvcom_file, variable, dimensions, time_indices, clims, label, **kwargs)
+        if clims is None:
+            clims = self.clims
 
-        local_plot = Plotter(self.fvcom, cb_label=self.label, *args, **kwargs)
+        if plotter is None:
+            plotter = Plotter(self.fvcom, cb_label=self.label, *args, **kwargs)
+        local_plot = self.plotter = plotter
 
         # Get the vector field of interest based on the variable name.
         if 'depth_averaged' in variable:
@@ -2257,6 +2344,150 @@ class MPIWorker(object):
                                       dpi=120)
 
 
+class FrameRenderer(object):
+    """
+    Render frames with MPIWorker.plot_field or MPIWorker.plot_streamlines in parallel with a local process pool (no
+    MPI required).
+
+    The time indices are split into batches which are handed to the worker processes as they become free. Each
+    worker process keeps its MPIWorker and Plotter between batches, so the figure, colour bar and map projection are
+    made once per process and subsequent frames only update the plotted data.
+
+    Example
+    -------
+    >>> from PyFVCOM.plot import FrameRenderer
+    >>> renderer = FrameRenderer(pool_size=8, verbose=True)
+    >>> renderer.plot_field('casename_0001.nc', range(720), 'temp', 'figures', dimensions={'siglay': [0]},
+    ...                     clims=[8, 16], set_title=True, mapper='cartopy')
+
+    """
+
+    def __init__(self, pool_size=None, frames_per_task=None, verbose=False):
+        """
+        Parameters
+        ----------
+        pool_size : int, optional
+            The number of worker processes. Defaults to the number of CPUs.
+        frames_per_task : int, optional
+            The number of frames in each batch given to a worker. Each batch loads its own data (including the
+            grid), so larger batches mean fewer reads but coarser load balancing. Defaults to a single batch per
+            worker.
+        verbose : bool, optional
+            Set to True to report progress and the rendering rate. Defaults to False.
+
+        Provides
+        --------
+        frames_per_second : float
+            The rendering rate for the most recent call (including loading the data).
+
+        """
+
+        self.pool_size = pool_size
+        if self.pool_size is None:
+            self.pool_size = multiprocessing.cpu_count()
+        self.frames_per_task = frames_per_task
+        self._noisy = verbose
+        self.frames_per_second = None
+
+    def plot_field(self, fvcom_file, time_indices, variable, figures_directory, clims=None, **kwargs):
+        """
+        Plot a given horizontal surface for `variable' for the time indices in `time_indices'.
+
+        Parameters are as for MPIWorker.plot_field. If `clims' is omitted, the data are read an extra time to find
+        the colour limits for all the frames.
+
+        Returns
+        -------
+        frames_per_second : float
+            The rendering rate.
+
+        """
+
+        return self._render('plot_field', fvcom_file, time_indices, variable, figures_directory, clims, kwargs)
+
+    def plot_streamlines(self, fvcom_file, time_indices, variable, figures_directory, clims=None, **kwargs):
+        """
+        Plot streamlines of the vector field associated with `variable' for the time indices in `time_indices'.
+
+        Parameters are as for MPIWorker.plot_streamlines. If `clims' is omitted, the data are read an extra time to
+        find the colour limits for all the frames.
+
+        Returns
+        -------
+        frames_per_second : float
+            The rendering rate.
+
+        """
+
+        return self._render('plot_streamlines', fvcom_file, time_indices, variable, figures_directory, clims, kwargs)
+
+    def _render(self, method, fvcom_file, time_indices, variable, figures_directory, clims, kwargs):
+        """ Split the time indices into batches and render them in the pool. """
+
+        time_indices = list(time_indices)
+        frames_per_task = self.frames_per_task
+        if frames_per_task is None:
+            frames_per_task = int(np.ceil(len(time_indices) / self.pool_size))
+        frames_per_task = max(frames_per_task, 1)
+        batches = [time_indices[i:i + frames_per_task] for i in range(0, len(time_indices), frames_per_task)]
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(self.pool_size, initializer=_init_frame_renderer) as pool:
+            if clims is None:
+                if self._noisy:
+                    print(f'Finding the colour limits for {variable}', flush=True)
+                limits = pool.map(_frame_limits, [(fvcom_file, batch, variable, kwargs.get('dimensions'))
+                                                  for batch in batches])
+                clims = [np.nanmin([i[0] for i in limits]), np.nanmax([i[1] for i in limits])]
+
+            tasks = [(method, fvcom_file, batch, variable, figures_directory, clims, kwargs) for batch in batches]
+            rendered = 0
+            for frames in pool.imap_unordered(_render_frames, tasks):
+                rendered += frames
+                if self._noisy:
+                    elapsed = time.perf_counter() - start
+                    print(f'{rendered} of {len(time_indices)} frames ({rendered / elapsed:.2f} frames/s)', flush=True)
+
+        self.frames_per_second = len(time_indices) / (time.perf_counter() - start)
+        if self._noisy:
+            print(f'Rendered {len(time_indices)} frames at {self.frames_per_second:.2f} frames/s', flush=True)
+
+        return self.frames_per_second
+
+
+# The MPIWorker (and its Plotter) for each FrameRenderer worker process.
+_frame_renderer = {}
+
+
+def _init_frame_renderer():
+    """ Set up a FrameRenderer worker process. We only ever save figures, so use a non-interactive backend. """
+    plt.switch_backend('agg')
+    _frame_renderer.clear()
+
+
+def _frame_limits(args):
+    """ Find the minimum and maximum of the data for a batch of frames. """
+    fvcom_file, time_indices, variable, dimensions = args
+    worker = MPIWorker()
+    worker._figure_prep(fvcom_file, variable, copy.deepcopy(dimensions), time_indices, None, None)
+
+    return np.nanmin(worker.field), np.nanmax(worker.field)
+
+
+def _render_frames(args):
+    """ Render a batch of frames, reusing this process's Plotter from any previous batch. """
+    method, fvcom_file, time_indices, variable, figures_directory, clims, kwargs = args
+    if 'worker' not in _frame_renderer:
+        _frame_renderer['worker'] = MPIWorker()
+    worker = _frame_renderer['worker']
+    worker.clims = clims
+    kwargs = copy.deepcopy(kwargs)
+    getattr(worker, method)(fvcom_file, time_indices, variable, figures_directory, clims=clims,
+                            plotter=worker.plotter, **kwargs)
+
+    return len(time_indices)
+
+
 class Player(FuncAnimation):
     """ Animation class for FVCOM outputs. Shamelessly lifted from https://stackoverflow.com/a/46327978 """
 
@@ -21,8 +21,9 @@ from warnings import warn
 
 import numpy as np
 import scipy.optimize
+import scipy.sparse
 from PyFVCOM.coordinate import utm_from_lonlat, lonlat_from_utm
-from PyFVCOM.grid import Domain, grid_metrics, read_fvcom_obc, nodes2elems
+from PyFVCOM.grid import Domain, grid_metrics, grid_cache, read_fvcom_obc, nodes2elems
 from PyFVCOM.grid import find_connected_elements, mp_interp_func
 from PyFVCOM.grid import find_bad_node, element_side_lengths, reduce_triangulation
 from PyFVCOM.grid import write_fvcom_mesh, write_obc_file, connectivity, haversine_distance, subset_domain
@@ -251,7 +252,7 @@ class Model(Domain):
 
                 # Add boundary elements
                 elements = find_connected_elements(
-                        nodes, self.grid.triangles)
+                        nodes, self.grid.triangles, topology=self._topology())
                 self.open_boundaries[-1].elements = elements
                 # Update the dimensions.
                 self.dims.open_boundary_elements += len(elements)
@@ -417,7 +418,8 @@ class Model(Domain):
             atts = {'long_name': 'bottom roughness minimum', 'units': 'None', 'type': 'data'}
             z0.add_variable('cbcmin', None, ['nele'], attributes=atts, ncopts=ncopts)
 
-    def interp_sst_assimilation(self, sst_dir, offset=0, serial=False, pool_size=None, var_name='analysed_sst', var_offset=-273.15, noisy=False):
+    def interp_sst_assimilation(self, sst_dir, offset=0, serial=False, pool_size=None, var_name='analysed_sst', var_offset=-273.15, noisy=False,
+                                output_file=None, ncopts={'zlib': True, 'complevel': 7}, **kwargs):
         """
         Interpolate SST data from remote sensing data onto the supplied model
         grid.
@@ -440,12 +442,21 @@ class Model(Domain):
         var_offset : float, optional
             Offset value to convert units of variable of input file. 
             Defaults to -273.15.
+        output_file : str, pathlib.Path, optional
+            Write each day straight to this SST data assimilation file (as `write_sstgrd' would) as soon as it has
+            been interpolated rather than keeping the whole time series in memory. The days are written in the order
+            of the dates in the SST file names.
+        ncopts : dict
+            Dictionary of options to use when creating the netCDF variables in `output_file'. Defaults to compression
+            on.
+
+        Remaining arguments are passed to WriteForcing when `output_file' is given.
 
         Returns
         -------
         Adds a new `sst' object with:
         sst : np.ndarray
-            Interpolated SST time series for the supplied domain.
+            Interpolated SST time series for the supplied domain. Omitted if `output_file' is given.
         time : np.ndarray
             List of python datetimes for the corresponding SST data.
 
@@ -458,10 +469,14 @@ class Model(Domain):
         >>> model.interp_sst_assimilation(sst_dir, pool_size=20)
         >>> # Save to netCDF
         >>> model.write_sstgrd('casename_sstgrd.nc')
+        >>> # Or, for long time series, interpolate and write in one go.
+        >>> model.interp_sst_assimilation(sst_dir, pool_size=20, output_file='casename_sstgrd.nc')
 
         Notes
         -----
         - Based on https://github.com/pwcazenave/fvcom-toolbox/tree/master/fvcom_prepro/interp_sst_assimilation.m.
+        - The interpolation weights from the SST grid to the model nodes are calculated once and reused for every
+        file on the same SST grid.
 
         """
 
@@ -482,35 +497,73 @@ class Model(Domain):
         # Read SST data files and interpolate each to the FVCOM mesh
         lonlat = np.array((self.grid.lon, self.grid.lat))
 
-        if serial:
-            results = []
-            for sst_file in sst_files:
-                results.append(self._inter_sst_worker(lonlat, sst_file, 
-                        noisy, var_name=var_name, var_offset=var_offset))
-        else:
-            if not pool_size:
-                pool = multiprocessing.Pool()
+        # The SST grid is the same for every file in a product, so make the interpolation weights once from the first
+        # file and share them with all the workers.
+        weights = None
+        if sst_files:
+            with Dataset(sst_files[0], 'r') as sst_file_nc:
+                sst_lon = sst_file_nc.variables['lon'][:]
+                sst_lat = sst_file_nc.variables['lat'][:]
+            weights = (sst_lon, sst_lat, _bilinear_weights(sst_lon, sst_lat, lonlat.T))
+
+        part_func = partial(self._inter_sst_worker, lonlat, noisy=noisy, var_name=var_name, var_offset=var_offset,
+                            weights=weights)
+
+        # Force the data to be at midday instead of whatever's in the input netCDFs. This is because FVCOM seems to
+        # want times at midday.
+        def _midday(time):
+            return datetime(*[getattr(time[0], i) for i in ('year', 'month', 'day')], 12)
+
+        pool = None
+        try:
+            if serial:
+                results = map(part_func, sst_files)
             else:
-                pool = multiprocessing.Pool(pool_size)
-            part_func = partial(self._inter_sst_worker, lonlat, 
-                    noisy=noisy, var_name=var_name, var_offset=var_offset)
-            results = pool.map(part_func, sst_files)
-            pool.close()
+                if not pool_size:
+                    pool = multiprocessing.Pool()
+                else:
+                    pool = multiprocessing.Pool(pool_size)
+                # Keep the input order so we can stream the results to disk.
+                results = pool.imap(part_func, sst_files)
+
+            if output_file is not None:
+                written = []
+                # Guess the year for the file from the dates we're expecting.
+                with self._sstgrd_file(output_file, [i.year for i in dates], ncopts=ncopts, **kwargs) as sstgrd:
+                    for time, sst in results:
+                        date = _midday(time)
+                        # Files for the same day are written in the order in which we found them, as they are when
+                        # we keep everything in memory.
+                        if written and date < written[-1]:
+                            raise ValueError('SST files are not in time order ({} follows {}).'.format(date,
+                                                                                                     written[-1]))
+                        sstgrd.write_fvcom_time([date])
+                        sstgrd.append('sst', np.reshape(sst, (1, -1)))
+                        written.append(date)
+                results = []
+            else:
+                results = list(results)
+        finally:
+            if pool is not None:
+                # We've either collected all the results or failed part way through, so stop any outstanding work.
+                pool.terminate()
+
+        if noisy:
+            print()
+
+        if output_file is not None:
+            self.sst.time = np.asarray(written)
+            return
 
         # Sort data and prepare date lists
         dates = np.empty(len(results)).astype(datetime)
         sst = np.empty((len(results), self.dims.node))
         for i, result in enumerate(results):
-            # Force the data to be at midday instead of whatever's in the input netCDFs. This is because FVCOM seems
-            # to want times at midday.
-            dates[i] = datetime(*[getattr(result[0][0], i) for i in ('year', 'month', 'day')], 12)
+            dates[i] = _midday(result[0])
             sst[i, :] = result[1]
 
-        if noisy:
-            print()
-
-        # Sort by time.
-        idx = np.argsort(dates)
+        # Sort by time (keeping the order of any files for the same day).
+        idx = np.argsort(dates, kind='stable')
         dates = dates[idx]
         sst = sst[idx, :]
 
@@ -519,8 +572,14 @@ class Model(Domain):
         self.sst.time = dates
 
     @staticmethod
-    def _inter_sst_worker(fvcom_lonlat, sst_file, noisy=False, var_name='analysed_sst', var_offset=-273.15):
-        """ Multiprocessing worker function for the SST interpolation. """
+    def _inter_sst_worker(fvcom_lonlat, sst_file, noisy=False, var_name='analysed_sst', var_offset=-273.15,
+                          weights=None):
+        """
+        Multiprocessing worker function for the SST interpolation.
+
+        Give `weights' as (lon, lat, weights) from _bilinear_weights to reuse them if the file is on the same grid.
+
+        """
         if noisy:
             print('.', end='', flush=True)
 
@@ -544,12 +603,21 @@ class Model(Domain):
             sst_lat = sst_file_nc.variables['lat'][:]
             time_out_dt = num2date(sst_file_nc.variables['time'][:], units=sst_file_nc.variables['time'].units)
 
-        ft = RegularGridInterpolator((sst_lon, sst_lat), sst_eo.T, method='linear', fill_value=None)
-        interp_sst = ft(fvcom_lonlat.T)
+        if weights is not None and np.array_equal(weights[0], sst_lon) and np.array_equal(weights[1], sst_lat):
+            weights = weights[2]
+        else:
+            weights = _bilinear_weights(sst_lon, sst_lat, fvcom_lonlat.T)
+
+        # Grid points in the rows, any times in the columns.
+        def _columns(field):
+            field = np.ma.filled(np.ma.asarray(field, dtype=float), np.nan)
+            return np.moveaxis(field, (-2, -1), (0, 1)).reshape(len(sst_lat) * len(sst_lon), -1)
 
-        fm = RegularGridInterpolator((sst_lon, sst_lat), mask.T, method='linear', fill_value=None)
-        interp_mask = fm(fvcom_lonlat.T)
-        interp_sst[interp_mask != 0] = np.nan
+        interp_sst = weights @ _columns(sst_eo)
+        interp_mask = weights @ _columns(mask)
+        interp_sst[np.broadcast_to(interp_mask != 0, interp_sst.shape)] = np.nan
+        if sst_eo.ndim == 2:
+            interp_sst = interp_sst[:, 0]
 
         return time_out_dt, interp_sst
 
@@ -568,28 +636,57 @@ class Model(Domain):
 
         """
 
-        globals = {'year': str(np.argmax(np.bincount([i.year for i in self.sst.time]))),  # gets the most common year value
+        with self._sstgrd_file(output_file, [i.year for i in self.sst.time], ncopts=ncopts, format=format,
+                               **kwargs) as sstgrd:
+            sstgrd.write_fvcom_time(self.sst.time)
+            sstgrd.append('sst', self.sst.sst)
+
+    def _sstgrd_file(self, output_file, years, ncopts={'zlib': True, 'complevel': 7}, format='NETCDF4', **kwargs):
+        """
+        Create a sea surface temperature data assimilation file with the grid positions and an empty `sst' variable
+        to which to append the data.
+
+        Parameters
+        ----------
+        output_file : str, pathlib.Path
+            File to which to write SST data.
+        years : list
+            The years of the data. The most common one is used for the `year' global attribute.
+        ncopts : dict
+            Dictionary of options to use when creating the netCDF variables. Defaults to compression on.
+
+        Remaining arguments are passed to WriteForcing.
+
+        Returns
+        -------
+        sstgrd : PyFVCOM.preproc.WriteForcing
+            The open file.
+
+        """
+
+        globals = {'year': str(np.argmax(np.bincount(years))),  # gets the most common year value
                    'title': 'FVCOM SST 1km merged product File',
                    'institution': 'Plymouth Marine Laboratory',
                    'source': 'FVCOM grid (unstructured) surface forcing',
-                   'history': 'File created using {} from PyFVCOM'.format(inspect.stack()[0][3]),
+                   'history': 'File created using {} from PyFVCOM'.format(inspect.stack()[1][3]),
                    'references': 'http://fvcom.smast.umassd.edu, http://codfish.smast.umassd.edu, http://pml.ac.uk/modelling',
                    'Conventions': 'CF-1.0',
                    'CoordinateProjection': 'init=WGS84'}
         dims = {'nele': self.dims.nele, 'node': self.dims.node, 'time': 0, 'DateStrLen': 26, 'three': 3}
 
-        with WriteForcing(str(output_file), dims, global_attributes=globals, clobber=True, format=format, **kwargs) as sstgrd:
-            # Add the variables.
-            atts = {'long_name': 'nodel longitude', 'units': 'degrees_east'}
-            sstgrd.add_variable('lon', self.grid.lon, ['node'], attributes=atts, ncopts=ncopts)
-            atts = {'long_name': 'nodel latitude', 'units': 'degrees_north'}
-            sstgrd.add_variable('lat', self.grid.lat, ['node'], attributes=atts, ncopts=ncopts)
-            sstgrd.write_fvcom_time(self.sst.time)
-            atts = {'long_name': 'sea surface Temperature',
-                    'units': 'Celsius Degree',
-                    'grid': 'fvcom_grid',
-                    'type': 'data'}
-            sstgrd.add_variable('sst', self.sst.sst, ['time', 'node'], attributes=atts, ncopts=ncopts)
+        sstgrd = WriteForcing(str(output_file), dims, global_attributes=globals, clobber=True, format=format, **kwargs)
+        # Add the variables.
+        atts = {'long_name': 'nodel longitude', 'units': 'degrees_east'}
+        sstgrd.add_variable('lon', self.grid.lon, ['node'], attributes=atts, ncopts=ncopts)
+        atts = {'long_name': 'nodel latitude', 'units': 'degrees_north'}
+        sstgrd.add_variable('lat', self.grid.lat, ['node'], attributes=atts, ncopts=ncopts)
+        atts = {'long_name': 'sea surface Temperature',
+                'units': 'Celsius Degree',
+                'grid': 'fvcom_grid',
+                'type': 'data'}
+        sstgrd.add_variable('sst', None, ['time', 'node'], attributes=atts, ncopts=ncopts)
+
+        return sstgrd
 
     def interp_ady(self, ady_dir, serial=False, pool_size=None, noisy=False):
 
@@ -1425,9 +1522,40 @@ class Model(Domain):
         noisy : bool, optional
             Set to True to enable verbose output. Defaults to False.
 
+        Provides
+        --------
+        self.grid.ntve : np.ndarray
+            The number of neighbouring elements of each grid node.
+        self.grid.nbve : np.ndarray
+            The IDs of the neighbouring elements of each grid node.
+        self.grid.nbe : np.ndarray
+            The three element IDs which share an edge with each element.
+        self.grid.isbce : np.ndarray
+            Flag for whether each element is on the grid boundary.
+        self.grid.isonb : np.ndarray
+            Flag for whether each node is on the grid boundary.
+
+        Notes
+        -----
+        The results are stored in (and retrieved from) `PyFVCOM.grid.grid_cache', if enabled.
+
         """
 
-        grid_metrics(self.grid.tri, noisy=noisy)
+        key = None
+        if grid_cache.enabled:
+            key = grid_cache.key(self.grid.triangles, self.grid.x, self.grid.y)
+
+        cached = grid_cache.get(key, 'grid_metrics')
+        if cached is None:
+            ntve, nbve, nbe, isbce, isonb = grid_metrics(self.grid.triangles, noisy=noisy)
+            grid_cache.put(key, 'grid_metrics', ntve=ntve, nbve=nbve.data, nbve_mask=np.ma.getmaskarray(nbve),
+                           nbe=nbe.data, nbe_mask=np.ma.getmaskarray(nbe), isbce=isbce, isonb=isonb)
+        else:
+            ntve, isbce, isonb = cached['ntve'], cached['isbce'], cached['isonb']
+            nbve = np.ma.array(cached['nbve'], mask=cached['nbve_mask'])
+            nbe = np.ma.array(cached['nbe'], mask=cached['nbe_mask'])
+
+        self.grid.ntve, self.grid.nbve, self.grid.nbe, self.grid.isbce, self.grid.isonb = ntve, nbve, nbe, isbce, isonb
 
     def write_tides(self, output_file, ncopts={'zlib': True, 'complevel': 7}, format='NETCDF4', **kwargs):
         """
@@ -1546,7 +1674,7 @@ class Model(Domain):
         for ri, position in enumerate(positions):
             # We can't use closest_node here as the candidates we need to search within are the coastline nodes only
             # (closest_node works on the currently loaded model grid only).
-            dist = np.asarray([haversine_distance(pt_1, position) for pt_1 in grid_pts])
+            dist = haversine_distance(grid_pts.T, position)
             breached_distance = dist < threshold
             if np.any(breached_distance):
                 # I don't know why sometimes we have to [0] the distance and other times we don't. This feels prone
@@ -1713,8 +1841,9 @@ class Model(Domain):
                     print('Node list length {}'.format(len(self.river.node)))
 
         # Move rivers in bad nodes
+        topology = self._topology()
         for i, node in enumerate(self.river.node):
-            bad = find_bad_node(self.grid.triangles, node)
+            bad = find_bad_node(self.grid.triangles, node, topology=topology)
             if bad:
                 self.river.node[i] = self._find_near_free_node(node)
 
@@ -1785,7 +1914,7 @@ class Model(Domain):
 
         riv_estuary = expand_connected_nodes(
                 self.grid.nodes, self.grid.triangles, 
-                self.river.node, nn_level)
+                self.river.node, nn_level, topology=self._topology())
         return riv_estuary
 
 
@@ -1811,14 +1940,24 @@ class Model(Domain):
 
     def _find_near_free_node(self, start_node):
         """
-        TODO: Finish docstring.
+        Find the closest coastline node to `start_node' which is neither bad (see `PyFVCOM.grid.find_bad_node') nor
+        already used by a river. Bad nodes found along the way are added to self.river.bad_nodes.
+
+        Parameters
+        ----------
+        start_node : int
+            The node ID from which to start searching along the coastline.
 
-        :param start_node:
-        :return:
+        Returns
+        -------
+        node : int
+            The free node ID (`start_node' itself if that is free).
 
         """
 
-        if find_bad_node(self.grid.triangles, start_node) and ~np.any(np.isin(self.river.bad_nodes, start_node)):
+        topology = self._topology()
+
+        if topology.is_bad(start_node) and ~np.any(np.isin(self.river.bad_nodes, start_node)):
             self.river.bad_nodes.append(start_node)
         elif not np.any(np.isin(self.river.node, start_node)):
             return start_node  # start node is already free for use
@@ -1834,28 +1973,23 @@ class Model(Domain):
                 warn('Warning having difficulty find available node for river '
                       + 'lon: {:.2f} lat: {:.2f}'.format(
                       self.grid.lon[start_node], self.grid.lat[start_node]))
-            start_next = []
-            for this_node in start_nodes:
-                attached_nodes = self.grid.coastline[np.isin(self.grid.coastline,
-                        self.grid.triangles[np.any(np.isin(self.grid.triangles, this_node), axis=1), :].flatten())]
-                attached_nodes = np.delete(attached_nodes, np.where(np.isin(attached_nodes, nodes_checked)))
-                for this_candidate in attached_nodes:
-                    if not np.any(np.isin(self.river.bad_nodes, this_candidate)) and not np.any(np.isin(self.river.node, this_candidate)):
-                        if find_bad_node(self.grid.triangles, this_candidate):
-                            self.river.bad_nodes.append(this_candidate)
-                        else:
-                            possible_nodes.append(this_candidate)
-                start_next.append(attached_nodes)
-            start_next = [i for sub_list in start_next for i in sub_list]
+            # Check all the coastline nodes connected to the current set of nodes at once.
+            attached_nodes = self.grid.coastline[np.isin(self.grid.coastline, topology.neighbours(start_nodes))]
+            attached_nodes = attached_nodes[~np.isin(attached_nodes, nodes_checked)]
+            candidates = attached_nodes[~np.isin(attached_nodes, self.river.bad_nodes) &
+                                        ~np.isin(attached_nodes, self.river.node)]
+            bad = topology.is_bad(candidates)
+            self.river.bad_nodes += candidates[bad].tolist()
+            possible_nodes += candidates[~bad].tolist()
 
             nodes_checked = np.hstack([nodes_checked, start_nodes])
-            start_nodes = np.unique(np.asarray(start_next).flatten())
+            start_nodes = np.unique(attached_nodes)
 
         # If more than one possible node choose the closest
         if len(possible_nodes) > 1:
             start_node_ll = [self.grid.lon[start_node], self.grid.lat[start_node]]
             possible_nodes_ll = [self.grid.lon[np.asarray(possible_nodes)], self.grid.lat[np.asarray(possible_nodes)]]
-            dist = np.asarray([haversine_distance(pt_1, start_node_ll) for pt_1 in possible_nodes_ll])
+            dist = haversine_distance(possible_nodes_ll, start_node_ll)
             return possible_nodes[dist.argmin()]
         else:
             return possible_nodes[0]
@@ -3087,7 +3221,8 @@ class Model(Domain):
             self.dims.nele = len(self.grid.lonc)
 
     def write_nested_forcing(self, ncfile, type=3, adjust_tides=None, 
-                ersem_metadata=None, format='NETCDF4', verbose=False, **kwargs):
+                ersem_metadata=None, format='NETCDF4', verbose=False, 
+                block_size=None, **kwargs):
         """
         Write out the given nested forcing into the specified netCDF file.
 
@@ -3114,6 +3249,12 @@ class Model(Domain):
         verbose : bool, optional
             Set to True to enable verbose output. Defaults to False 
             (no verbose output).
+        block_size : int, optional
+            Assemble and write the time-varying data this many time steps at 
+            a time so the memory required is bounded by one block rather than 
+            the whole time series. The netCDF variables are chunked in time 
+            to match (unless chunksizes is given in ncopts). Defaults to all 
+            the times at once.
 
         Remaining kwargs are passed to WriteForcing with the exception of 
         ncopts which is passed to WriteForcing.add_variable.
@@ -3142,80 +3283,81 @@ class Model(Domain):
         time_number = len(self.time.datetime)
         nodes_number = len(nodes)
         elements_number = len(elements)
+        if block_size is None:
+            block_size = time_number
+        block_size = max(1, min(block_size, time_number))
+
+        # The shape (excluding time) and grid position of each time-varying 
+        # variable. Hold in dict to simplify the loops below.
+        out_dict = {'ua': [(elements_number,), 'elements'], 
+                'va': [(elements_number,), 'elements'],
+                'u': [(self.dims.layers, elements_number), 'elements'], 
+                'v': [(self.dims.layers, elements_number), 'elements'],
+                'zeta': [(nodes_number,), 'nodes'],
+                'temp': [(self.dims.layers, nodes_number), 'nodes'], 
+                'salinity': [(self.dims.layers, nodes_number), 'nodes'],
+                'hyw': [(self.dims.levels, nodes_number), 'nodes']}
+
+        # Make boolean arrays for the match up between each nest level and 
+        # flat indices.
+        nest_indices = [[{'nodes': np.isin(nodes, nest.nodes),
+                          'elements': np.isin(elements, nest.elements)}
+                         for nest in boundary.nest]
+                        for boundary in self.open_boundaries]
+
+        def _assemble(var, start, end):
+            """ Collect the nested data for `var' for the given times. """
+            shape, position = out_dict[var]
+            # We never set hyw to anything other than zeros.
+            block = np.full((end - start,) + shape, 0 if var == 'hyw' 
+                    else np.nan)
+            for i, boundary in enumerate(self.open_boundaries):
+                for ii, nest in enumerate(boundary.nest):
+                    this_index = nest_indices[i][ii][position]
+
+                    # Skip out if we don't have any indices for this index. 
+                    # This happens on the first nest level for elements.
+                    if not np.any(this_index):
+                        continue
 
-        # Prepare the data.
-        zeta = np.empty((time_number, nodes_number)) * np.nan
-        ua = np.empty((time_number, elements_number)) * np.nan
-        va = np.empty((time_number, elements_number)) * np.nan
-        u = np.empty((time_number, self.dims.layers, elements_number)) * np.nan
-        v = np.empty((time_number, self.dims.layers, elements_number)) * np.nan
-        temperature = (np.empty((time_number, self.dims.layers, nodes_number)) 
-                * np.nan)
-        salinity = (np.empty((time_number, self.dims.layers, nodes_number)) 
-                * np.nan)
-        hyw = np.zeros((time_number, self.dims.levels, nodes_number))  
-        # we never set this to anything other than zeros
-        if type == 3:
-            weight_nodes = np.tile(weight_nodes, [time_number, 1])
-            weight_elements = np.tile(weight_elements, [time_number, 1])
+                    try:
+                        boundary_data = getattr(nest.data, var)[start:end]
+                    except AttributeError:
+                        continue
 
-        # Hold in dict to simplify the next for loop
-        out_dict = {'ua': [ua, 'elements'], 'va': [va, 'elements'], 
-                'u': [u, 'elements'], 'v': [v, 'elements'],
-                'zeta': [zeta, 'nodes'], 
-                'temp': [temperature, 'nodes'], 'salinity': [salinity, 'nodes'],
-                'hyw': [hyw, 'nodes']}
+                    if adjust_tides is not None and var in adjust_tides:
+                        boundary_data = boundary_data + getattr(
+                                nest.tide, var)[start:end]
+
+                    if verbose:
+                        print('Process {} for writing '.format(var)
+                                + 'boundary {} of {} '.format(
+                                i + 1, len(self.open_boundaries))
+                                + 'in nest {} of {}'.format(
+                                ii + 1, len(boundary.nest)))
 
-        for i, boundary in enumerate(self.open_boundaries):
-            for ii, nest in enumerate(boundary.nest):
+                    if verbose:
+                        print(block.shape, position, 
+                                block[..., this_index].shape, 
+                                boundary_data.shape)
 
-                # Make boolean arrays for the match up between the current 
-                # nest level and flat indices.
-                temp_indices = {'nodes': np.isin(nodes, nest.nodes),
-                                'elements': np.isin(elements, nest.elements)}
+                    block[..., this_index] = boundary_data
 
-                for var in out_dict:
-                    if var == 'time':
-                        pass
-                    elif var in out_dict.keys():
-                        this_index = temp_indices[out_dict[var][1]]
-
-                        # Skip out if we don't have any indices for this index. 
-                        # This happens on the first nest level for elements.
-                        if not np.any(this_index):
-                            continue
-
-                        try:
-                            boundary_data = getattr(nest.data, var)
-                        except AttributeError:
-                            continue
-
-                        if adjust_tides is not None and var in adjust_tides:
-                            boundary_data = boundary_data + getattr(
-                                    nest.tide, var)
-
-                        if verbose:
-                            print('Process {} for writing '.format(var)
-                                    + 'boundary {} of {} '.format(
-                                    i + 1, len(self.open_boundaries))
-                                    + 'in nest {} of {}'.format(
-                                    ii + 1, len(boundary.nest)))
-
-                        if verbose:
-                            print(out_dict[var][0].shape, out_dict[var][1], 
-                                    out_dict[var][0][..., this_index].shape, 
-                                    boundary_data.shape)
-
-                        out_dict[var][0][..., this_index] = boundary_data
-                    else:
-                        raise ValueError('Unknown nest boundary '
-                                + 'variable {}'.format(var))
+            return block
 
         ncopts = {}
         if 'ncopts' in kwargs:
             ncopts = kwargs['ncopts']
             kwargs.pop('ncopts')
 
+        # Chunk the time-varying variables by block so each block is written 
+        # in one go.
+        def _time_ncopts(shape):
+            if block_size == time_number or 'chunksizes' in ncopts or \
+                    not format.startswith('NETCDF4'):
+                return ncopts
+            return dict(ncopts, chunksizes=(block_size,) + shape)
+
         # Define the global attributes
         globals = {'type': 'FVCOM nestING TIME SERIES FILE',
                     'title': 'FVCOM nestING TYPE '
@@ -3373,8 +3515,9 @@ class Model(Domain):
                         'units': 'no units',
                         'grid': 'fvcom_grid',
                         'type': 'data'}
-                nest_ncfile.add_variable('weight_node', weight_nodes, 
-                        ['time', 'node'], attributes=atts, ncopts=ncopts)
+                nest_ncfile.add_variable('weight_node', None, 
+                        ['time', 'node'], attributes=atts, 
+                        ncopts=_time_ncopts((nodes_number,)))
 
                 if self._debug:
                     print('Adding weight_cell to netCDF')
@@ -3382,8 +3525,9 @@ class Model(Domain):
                         'units': 'no units',
                         'grid': 'fvcom_grid',
                         'type': 'data'}
-                nest_ncfile.add_variable('weight_cell', weight_elements, 
-                        ['time', 'nele'], attributes=atts, ncopts=ncopts)
+                nest_ncfile.add_variable('weight_cell', None, 
+                        ['time', 'nele'], attributes=atts, 
+                        ncopts=_time_ncopts((elements_number,)))
 
             # Now all the data.
             if self._debug:
@@ -3396,8 +3540,8 @@ class Model(Domain):
                     'coordinates': 'time lat lon',
                     'type': 'data',
                     'location': 'node'}
-            nest_ncfile.add_variable('zeta', out_dict['zeta'][0], 
-                    ['time', 'node'], attributes=atts, ncopts=ncopts)
+            nest_ncfile.add_variable('zeta', None, ['time', 'node'], 
+                    attributes=atts, ncopts=_time_ncopts(out_dict['zeta'][0]))
 
             if self._debug:
                 print('Adding ua to netCDF')
@@ -3405,8 +3549,8 @@ class Model(Domain):
                     'units': 'meters  s-1',
                     'grid': 'fvcom_grid',
                     'type': 'data'}
-            nest_ncfile.add_variable('ua', out_dict['ua'][0], 
-                    ['time', 'nele'], attributes=atts, ncopts=ncopts)
+            nest_ncfile.add_variable('ua', None, ['time', 'nele'], 
+                    attributes=atts, ncopts=_time_ncopts(out_dict['ua'][0]))
 
             if self._debug:
                 print('Adding va to netCDF')
@@ -3414,8 +3558,8 @@ class Model(Domain):
                     'units': 'meters  s-1',
                     'grid': 'fvcom_grid',
                     'type': 'data'}
-            nest_ncfile.add_variable('va', out_dict['va'][0], 
-                    ['time', 'nele'], attributes=atts, ncopts=ncopts)
+            nest_ncfile.add_variable('va', None, ['time', 'nele'], 
+                    attributes=atts, ncopts=_time_ncopts(out_dict['va'][0]))
 
             if self._debug:
                 print('Adding u to netCDF')
@@ -3426,8 +3570,8 @@ class Model(Domain):
                     'coordinates': 'time siglay latc lonc',
                     'type': 'data',
                     'location': 'face'}
-            nest_ncfile.add_variable('u', out_dict['u'][0], 
-                    ['time', 'siglay', 'nele'], attributes=atts, ncopts=ncopts)
+            nest_ncfile.add_variable('u', None, ['time', 'siglay', 'nele'], 
+                    attributes=atts, ncopts=_time_ncopts(out_dict['u'][0]))
 
             if self._debug:
                 print('Adding v to netCDF')
@@ -3438,8 +3582,8 @@ class Model(Domain):
                     'coordinates': 'time siglay latc lonc',
                     'type': 'data',
                     'location': 'face'}
-            nest_ncfile.add_variable('v', out_dict['v'][0], 
-                    ['time', 'siglay', 'nele'], attributes=atts, ncopts=ncopts)
+            nest_ncfile.add_variable('v', None, ['time', 'siglay', 'nele'], 
+                    attributes=atts, ncopts=_time_ncopts(out_dict['v'][0]))
 
             if self._debug:
                 print('Adding temp to netCDF')
@@ -3450,8 +3594,8 @@ class Model(Domain):
                     'coordinates': 'time siglay lat lon',
                     'type': 'data',
                     'location': 'node'}
-            nest_ncfile.add_variable('temp', out_dict['temp'][0], 
-                    ['time', 'siglay', 'node'], attributes=atts, ncopts=ncopts)
+            nest_ncfile.add_variable('temp', None, ['time', 'siglay', 'node'], 
+                    attributes=atts, ncopts=_time_ncopts(out_dict['temp'][0]))
 
             if self._debug:
                 print('Adding salinity to netCDF')
@@ -3462,8 +3606,8 @@ class Model(Domain):
                     'coordinates': 'time siglay lat lon',
                     'type': 'data',
                     'location': 'node'}
-            nest_ncfile.add_variable('salinity', out_dict['salinity'][0], 
-                    ['time', 'siglay', 'node'], attributes=atts, ncopts=ncopts)
+            nest_ncfile.add_variable('salinity', None, ['time', 'siglay', 'node'], 
+                    attributes=atts, ncopts=_time_ncopts(out_dict['salinity'][0]))
 
             if self._debug:
                 print('Adding hyw to netCDF')
@@ -3472,8 +3616,8 @@ class Model(Domain):
                     'grid': 'fvcom_grid',
                     'type': 'data',
                     'coordinates': 'time siglev lat lon'}
-            nest_ncfile.add_variable('hyw', out_dict['hyw'][0], 
-                    ['time', 'siglev', 'node'], attributes=atts, ncopts=ncopts)
+            nest_ncfile.add_variable('hyw', None, ['time', 'siglev', 'node'], 
+                    attributes=atts, ncopts=_time_ncopts(out_dict['hyw'][0]))
 
             if ersem_metadata is not None:
                 for name in ersem_metadata:
@@ -3487,20 +3631,39 @@ class Model(Domain):
                             for i in attribute_object if i in keep_me}
                     # Add the FVCOM grid type.
                     atts['grid'] = 'obc_grid'
-                    # Collapse the data from all the open boundaries as we've 
-                    # done for temperature and salinity.
-                    dump = np.full((time_number, self.dims.layers, 
-                            nodes_number), np.nan)
-                    for boundary in self.open_boundaries:
-                        for nest in boundary.nest:
-                            if name == 'time':
-                                pass
-                            temp_nodes_index = np.isin(nodes, nest.nodes)
-                            dump[..., temp_nodes_index] = getattr(
-                                    nest.data, name)
-                    nest_ncfile.add_variable(name, dump, 
+                    nest_ncfile.add_variable(name, None, 
                             ['time', 'siglay', 'node'], attributes=atts, 
-                            ncopts=ncopts)
+                            ncopts=_time_ncopts((self.dims.layers, 
+                                nodes_number)))
+
+            # Now fill in the time-varying data a block at a time.
+            for start in range(0, time_number, block_size):
+                end = min(start + block_size, time_number)
+                if verbose:
+                    print('Writing times {} to {} of {}'.format(start + 1, 
+                            end, time_number))
+
+                if type == 3:
+                    nest_ncfile.append('weight_node', np.tile(weight_nodes, 
+                            [end - start, 1]))
+                    nest_ncfile.append('weight_cell', np.tile(
+                            weight_elements, [end - start, 1]))
+
+                for var in out_dict:
+                    nest_ncfile.append(var, _assemble(var, start, end))
+
+                if ersem_metadata is not None:
+                    for name in ersem_metadata:
+                        # Collapse the data from all the open boundaries as 
+                        # we've done for temperature and salinity.
+                        dump = np.full((end - start, self.dims.layers, 
+                                nodes_number), np.nan)
+                        for boundary in self.open_boundaries:
+                            for nest in boundary.nest:
+                                temp_nodes_index = np.isin(nodes, nest.nodes)
+                                dump[..., temp_nodes_index] = getattr(
+                                        nest.data, name)[start:end]
+                        nest_ncfile.append(name, dump)
 
     def add_obc_types(self, types):
         """
@@ -4874,6 +5037,8 @@ class WriteForcing(object):
         """
 
         self.nc = Dataset(str(filename), 'w', **kwargs)
+        # How far along the unlimited (time) dimension we've written each variable.
+        self._written = {}
 
         for dimension in dimensions:
             self.nc.createDimension(dimension, dimensions[dimension])
@@ -4890,8 +5055,9 @@ class WriteForcing(object):
         ----------
         name : str
             Variable name to add.
-        data : np.ndararay, list, float, str
-            Data to add to the netCDF file object.
+        data : np.ndararay, list, float, str, None
+            Data to add to the netCDF file object. If None, the variable is
+            created empty to be filled in later (e.g. in blocks of time).
         dimensions : list, tuple
             List of dimension names to apply to the new variable.
         attributes : dict, optional
@@ -4908,19 +5074,66 @@ class WriteForcing(object):
             for attribute in attributes:
                 setattr(var, attribute, attributes[attribute])
 
-        var[:] = data
+        if data is not None:
+            var[:] = data
+            if self._unlimited(var):
+                self._written[name] = len(data) if np.ndim(data) else 1
 
         setattr(self, name, var)
 
+    def append(self, name, data):
+        """
+        Append a block of `data' to the `name' variable along its unlimited (time) dimension.
+
+        Parameters
+        ----------
+        name : str
+            Variable name to which to append. The variable must already exist (see `add_variable', to which you can
+            give None for the data) and its first dimension must be unlimited.
+        data : np.ndarray, list
+            The data to append, with time as the first dimension.
+
+        Notes
+        -----
+        Each variable keeps track of how much has been written to it, so variables can be appended to in any order.
+        This means forcing data can be generated and written a block at a time without ever holding the whole time
+        series in memory. For example:
+
+        >>> with WriteForcing('forcing.nc', {'node': 100, 'time': 0, 'DateStrLen': 26}) as forcing:
+        >>>     forcing.add_variable('zeta', None, ['time', 'node'])
+        >>>     for times, zeta in blocks:
+        >>>         forcing.write_fvcom_time(times)
+        >>>         forcing.append('zeta', zeta)
+
+        """
+
+        var = self.nc.variables[name]
+        if not self._unlimited(var):
+            raise ValueError(f"Variable `{name}' does not have an unlimited first dimension to which to append.")
+
+        start = self._written.get(name, 0)
+        end = start + len(data)
+        var[start:end] = data
+        self._written[name] = end
+
+    def _unlimited(self, var):
+        """ Check whether the netCDF variable `var' has an unlimited first dimension. """
+        return bool(var.dimensions) and self.nc.dimensions[var.dimensions[0]].isunlimited()
+
     def write_fvcom_time(self, time, **kwargs):
         """
         Write the four standard FVCOM time variables (time, Times, Itime, Itime2) for the given time series.
 
+        Call this repeatedly with successive blocks of times to append each block to the time variables (see
+        `WriteForcing.append').
+
         Parameters
         ----------
         time : np.ndarray, list, tuple
             Times as datetime objects.
 
+        Remaining keyword arguments are passed to WriteForcing.add_variable when the time variables are created.
+
         """
 
         mjd = date2num(time, units='days since 1858-11-17 00:00:00')
@@ -4928,6 +5141,12 @@ class WriteForcing(object):
         Itime2 = (mjd - Itime) * 24 * 60 * 60 * 1000  # milliseconds since midnight
         Times = [t.strftime('%Y-%m-%dT%H:%M:%S.%f') for t in time]
 
+        if 'time' in self.nc.variables:
+            # Subsequent blocks of times are appended to what we've already got.
+            for name, data in (('time', mjd), ('Itime', Itime), ('Itime2', Itime2), ('Times', Times)):
+                self.append(name, data)
+            return
+
         # time
         atts = {'units': 'days since 1858-11-17 00:00:00',
                 'format': 'modified julian day (MJD)',
@@ -5762,98 +5981,25 @@ class NEMOReader(RegularReader):
         # a copy of the original grid so we can mask the data we load (self._regular_to_unstructured_mask).
         original_x, original_y = np.meshgrid(self.grid.lon, self.grid.lat)
 
-        # Make the triangulation for the entire domain and we'll drop bits as we mask land and check for a shapely
-        # polygon.
-        self.grid.triangles = Delaunay(np.asarray((original_x.ravel(), original_y.ravel())).T).vertices
-
         # Use the data array for masking. Just use the first time step to speed things up. Find the first 4D variable
         # to get the mask. This is suboptimal because who knows what variable we'll end up using.
         analysis_variable = [i for i in self.ds.variables if len(self.ds.variables[i].dimensions) == 4][0]
-        self._land_mask = ~np.squeeze(self.ds.variables[analysis_variable][0].mask)
-        xx = original_x.copy()[self._land_mask]
-        yy = original_y.copy()[self._land_mask]
-        self.grid.lon = xx
-        self.grid.lat = yy
+        self._land_mask = ~np.squeeze(np.ma.getmaskarray(self.ds.variables[analysis_variable][0]))
 
-        self.grid.triangles = reduce_triangulation(self.grid.triangles, np.argwhere(self._land_mask.ravel()))
-
-        # Check if we've been asked to subset with a polygon.
+        polygon = None
         if 'wesn' in self._dims and isinstance(self._dims['wesn'], Polygon):
-            sub_nodes, sub_elems, sub_tri = subset_domain(self.grid.lon, self.grid.lat, self.grid.triangles,
-                                                          polygon=self._dims['wesn'])
-            self.grid.lon = self.grid.lon[sub_nodes]
-            self.grid.lat = self.grid.lat[sub_nodes]
-            self.grid.triangles = sub_tri
-
-        # Remove nodes which aren't in the triangulation.
-        node_ids = np.arange(len(self.grid.lon))
-        isolated_nodes = np.setdiff1d(node_ids, np.unique(self.grid.triangles))
-        connected_nodes = np.setdiff1d(node_ids, isolated_nodes)
-        for attr in ('lon', 'lat'):
-            setattr(self.grid, attr, np.delete(getattr(self.grid, attr), isolated_nodes))
-        self.grid.triangles = reduce_triangulation(self.grid.triangles, connected_nodes)
-
-        # Clean up the triangulation to remove nodes we'd flag as invalid in FVCOM for a model run (elements with two
-        # land boundaries). We do this so subsequent calls to pf.grid.get_boundary_polygons work properly (i.e. we
-        # don't get multiple polygons for the main model domain). We have to do this lots of times until we end up
-        # with no dodgy nodes.
-        still_bad = 0
-        while still_bad >= 0:
-            # Limit the search to coastline nodes to massively speed things up!
-            _, _, _, bnd = connectivity(np.asarray((self.grid.lon, self.grid.lat)).T, self.grid.triangles)
-            all_nodes = np.arange(len(self.grid.lon))
-            coast_nodes = all_nodes[bnd]
-            interior_nodes = all_nodes[~bnd]
-            args = [(self.grid.triangles, i) for i in coast_nodes]
-            pool = multiprocessing.Pool()
-            bad_nodes = np.asarray(pool.map(self._bad_node_worker, args))
-            pool.close()
-            if not np.any(bad_nodes):
-                still_bad = -1
-            else:
-                still_bad += 1
-
-            for attr in ('lon', 'lat'):
-                setattr(self.grid, attr, np.delete(getattr(self.grid, attr), coast_nodes[bad_nodes]))
-            # Remove those nodes from the triangulation too. This step is quite slow.
-            new_all_nodes = np.hstack((interior_nodes, coast_nodes[~bad_nodes]))
-            self.grid.triangles = reduce_triangulation(self.grid.triangles, np.sort(new_all_nodes))
-
-            # Check for nodes which join two elements at a single point:
-            # |\
-            # | \
-            # |__o
-            #    /\
-            #   /  \
-            #  /____\
-            bad_nodes = []
-            all_nodes = np.unique(self.grid.triangles)
-            for node in all_nodes:
-                node_in_elements = np.argwhere(np.any(np.isin(self.grid.triangles, node), axis=1))
-                if len(node_in_elements) == 2:
-                    if len(np.unique(self.grid.triangles[node_in_elements])) == 5:
-                        bad_nodes.append(node)
-            if any(bad_nodes):
-                good_nodes = np.setdiff1d(all_nodes, bad_nodes)
-                for attr in ('lon', 'lat'):
-                    setattr(self.grid, attr, np.delete(getattr(self.grid, attr), bad_nodes))
-                self.grid.triangles = reduce_triangulation(self.grid.triangles, good_nodes)
+            polygon = self._dims['wesn']
 
-            if self._noisy:
-                if still_bad > 0:
-                    print(f'Make grid FVCOM compatible (iteration {still_bad})', flush=True)
-                else:
-                    print('Grid now FVCOM compatible.', flush=True)
-
-        # Find the indices of the remaining positions in the original coordinate arrays so we can extract the same
-        # positions when loading data.
-        original_xy = np.asarray((original_x.ravel(), original_y.ravel())).T.tolist()
-        new_xy = np.asarray((self.grid.lon, self.grid.lat)).T.tolist()
-        # It feels like I should be using np.isin here, but I can't get it to work. Slow loops it is.
-        original_indices = [original_xy.index(i) for i in new_xy]
+        original_indices, triangles = self._unstructured_triangulation(original_x, original_y, self._land_mask,
+                                                                        polygon=polygon, noisy=self._noisy)
+
+        # Keep track of the positions we've kept from the original grid so we can extract the same positions when
+        # loading data.
+        self.grid.lon = original_x.ravel()[original_indices]
+        self.grid.lat = original_y.ravel()[original_indices]
+        self.grid.triangles = triangles
         self._regular_to_unstructured_mask = np.full(original_x.ravel().shape, False)
-        for i in original_indices:
-            self._regular_to_unstructured_mask[i] = True
+        self._regular_to_unstructured_mask[original_indices] = True
 
         self.grid.nv = self.grid.triangles.T + 1  # for pf.plot.Plotter compatibility.
         self.grid.x, self.grid.y, _ = utm_from_lonlat(self.grid.lon, self.grid.lat, zone=self._zone)
@@ -5882,8 +6028,97 @@ class NEMOReader(RegularReader):
                 setattr(self.data, var, _tmp[..., self._regular_to_unstructured_mask])
 
     @staticmethod
-    def _bad_node_worker(args):
-        return find_bad_node(*args)
+    def _unstructured_triangulation(x, y, mask, polygon=None, noisy=False):
+        """
+        Triangulate the valid positions of a regular grid into an FVCOM compatible unstructured grid.
+
+        Parameters
+        ----------
+        x, y : np.ndarray
+            The regular grid positions (2D).
+        mask : np.ndarray
+            True for the valid (sea) positions in the regular grid.
+        polygon : shapely.geometry.Polygon, optional
+            Only keep the part of the grid inside this polygon.
+        noisy : bool, optional
+            Set to True to enable verbose output. Defaults to False.
+
+        Returns
+        -------
+        original_indices : np.ndarray
+            The indices of the unstructured grid nodes in the flattened regular grid (in increasing order).
+        triangles : np.ndarray
+            The unstructured grid triangulation (zero-indexed).
+
+        Notes
+        -----
+        The result only depends on the regular grid, the mask and the polygon, so it is stored in (and retrieved
+        from) `PyFVCOM.grid.grid_cache', if enabled.
+
+        """
+
+        key = None
+        if grid_cache.enabled:
+            key = grid_cache.key(mask, x, y, extra=None if polygon is None else polygon.wkt)
+            cached = grid_cache.get(key, 'nemo_unstructured')
+            if cached is not None:
+                return cached['original_indices'], cached['triangles']
+
+        # Make the triangulation for the entire domain and drop the land. Each step below keeps track of the indices
+        # of the surviving nodes in the original grid.
+        triangles = Delaunay(np.asarray((x.ravel(), y.ravel())).T).simplices
+        original_indices = np.flatnonzero(mask.ravel())
+        triangles = reduce_triangulation(triangles, original_indices)
+
+        # Check if we've been asked to subset with a polygon.
+        if polygon is not None:
+            sub_nodes, _, triangles = subset_domain(x.ravel()[original_indices], y.ravel()[original_indices],
+                                                    triangles, polygon=polygon)
+            original_indices = original_indices[sub_nodes]
+
+        # Clean up the triangulation to remove nodes we'd flag as invalid in FVCOM for a model run. We do this so
+        # subsequent calls to pf.grid.get_boundary_polygons work properly (i.e. we don't get multiple polygons for the
+        # main model domain). Removing nodes can make new bad ones, so keep going until we've got none. The bad
+        # nodes are:
+        #   - those which aren't in any element;
+        #   - those which are in a single element (elements with two land boundaries);
+        #   - those which join two elements at a single point:
+        # |\
+        # | \
+        # |__o
+        #    /\
+        #   /  \
+        #  /____\
+        iteration = 0
+        while True:
+            counts = np.bincount(triangles.ravel(), minlength=len(original_indices))
+            bad = counts <= 1
+            if not np.any(bad):
+                # Find the two elements for each node in exactly two elements and check if they share only that node.
+                order = np.argsort(triangles.ravel(), kind='stable')
+                first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+                candidates = np.flatnonzero(counts == 2)
+                pairs = order[first[candidates][:, np.newaxis] + np.arange(2)] // 3
+                shared = triangles[pairs[:, 0], :, np.newaxis] == triangles[pairs[:, 1], np.newaxis, :]
+                bad[candidates[shared.sum(axis=(1, 2)) == 1]] = True
+                if not np.any(bad):
+                    break
+
+            good = np.flatnonzero(~bad)
+            triangles = reduce_triangulation(triangles, good)
+            original_indices = original_indices[good]
+
+            iteration += 1
+            if noisy:
+                print(f'Make grid FVCOM compatible (iteration {iteration})', flush=True)
+
+        if noisy:
+            print('Grid now FVCOM compatible.', flush=True)
+
+        if key is not None:
+            grid_cache.put(key, 'nemo_unstructured', original_indices=original_indices, triangles=triangles)
+
+        return original_indices, triangles
 
     def load_data(self, var):
         """
@@ -6704,6 +6939,52 @@ class Restart(FileReader):
         self.regular = read_regular(*args, noisy=self._noisy, **kwargs)
 
 
+def _bilinear_weights(x, y, positions):
+    """
+    Make a sparse matrix of the bilinear interpolation weights from a regular grid to arbitrary positions.
+
+    This matches scipy.interpolate.RegularGridInterpolator(method='linear') but can be reused for any number of
+    fields on the same grid.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        The (strictly increasing) regular grid positions.
+    positions : np.ndarray
+        The positions onto which to interpolate [n, 2].
+
+    Returns
+    -------
+    weights : scipy.sparse.csr_matrix
+        The interpolation weights [n, len(y) * len(x)]. Apply them to data shaped [len(y), len(x)] and raveled.
+
+    """
+
+    x = np.asarray(np.ma.getdata(x), dtype=float)
+    y = np.asarray(np.ma.getdata(y), dtype=float)
+    positions = np.asarray(positions, dtype=float)
+
+    for dimension, (grid, values) in enumerate(((x, positions[:, 0]), (y, positions[:, 1]))):
+        if np.any(np.diff(grid) <= 0):
+            raise ValueError('The regular grid positions must be strictly ascending.')
+        if np.any(values < grid[0]) or np.any(values > grid[-1]):
+            raise ValueError(f'One of the requested positions is out of bounds in dimension {dimension}.')
+
+    def _cells(grid, values):
+        index = np.clip(np.searchsorted(grid, values) - 1, 0, len(grid) - 2)
+        return index, (values - grid[index]) / (grid[index + 1] - grid[index])
+
+    xi, xw = _cells(x, positions[:, 0])
+    yi, yw = _cells(y, positions[:, 1])
+
+    rows = np.repeat(np.arange(len(positions)), 4)
+    columns = np.column_stack((yi * len(x) + xi, yi * len(x) + xi + 1,
+                               (yi + 1) * len(x) + xi, (yi + 1) * len(x) + xi + 1)).ravel()
+    weights = np.column_stack(((1 - xw) * (1 - yw), xw * (1 - yw), (1 - xw) * yw, xw * yw)).ravel()
+
+    return scipy.sparse.csr_matrix((weights, (rows, columns)), shape=(len(positions), len(x) * len(y)))
+
+
 def _interp_to_fvcom_layer(in_x, in_y, in_triangles, in_data, out_x, out_y):
     interped_data = interpolate_node_barycentric(np.asarray([out_x, out_y]).T, in_data, in_x, in_y, in_triangles)
     return interped_data
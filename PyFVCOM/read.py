@@ -7,15 +7,17 @@ from __future__ import print_function, division
 import copy
 import inspect
 import sys
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from dateutil.relativedelta import relativedelta
 from shapely.geometry import Polygon, Point
 
 import matplotlib.path as mpath
 import numpy as np
 #import pandas as pd
-from netCDF4 import Dataset, MFDataset, num2date, date2num
+from netCDF4 import Dataset, MFDataset, num2date, date2num, stringtochar
 
 from PyFVCOM.grid import Domain, control_volumes, get_area_heron,get_boundary_polygons
 from PyFVCOM.grid import unstructured_grid_volume, elems2nodes, GridReaderNetCDF
@@ -389,6 +391,503 @@ class _MakeDimensions(object):
         return (a for a in self.__dict__.keys() if not a.startswith('_'))
 
 
+class _LazyVariable(object):
+    """
+    Array-like proxy for a netCDF variable which only reads the parts of the variable which are actually indexed.
+
+    Data are read in blocks of `chunk_size' time steps and the most recently used blocks are kept in a bounded cache
+    so repeated access to the same times (e.g. iterating over nodes at a fixed time) does not go back to disk. Any
+    dimension subsetting given to FileReader is respected, so indices are relative to the subset, not the netCDF file.
+
+    Index the object as you would a numpy array (e.g. fvcom.data.temp[10, :, nodes]) to get a numpy masked array.
+    Use np.asarray(fvcom.data.temp) or fvcom.data.temp[:] to load the whole (subset) variable.
+
+    """
+
+    def __init__(self, filename, name, dims=None, chunk_size=24, cache_size=4, dataset=None):
+        """
+        Parameters
+        ----------
+        filename : str
+            The FVCOM netCDF file from which to read.
+        name : str
+            The variable name.
+        dims : dict, optional
+            Dictionary of dimension names and the indices to extract along each (as for FileReader). Omitted
+            dimensions are used in their entirety.
+        chunk_size : int, optional
+            Number of time steps to read from the netCDF at once. Defaults to 24. Ignored for variables without a
+            time dimension.
+        cache_size : int, optional
+            Maximum number of chunks to keep in memory. Defaults to 4. Set to 0 to disable caching.
+        dataset : netCDF4.Dataset, optional
+            An existing open handle for `filename'. If omitted, the file is opened on first read.
+
+        """
+
+        self._filename = str(filename)
+        self._name = name
+        self._ds = dataset
+        self._chunk_size = max(int(chunk_size), 1)
+        self._cache_size = int(cache_size)
+        self._cache = OrderedDict()
+
+        variable = self._dataset.variables[name]
+        self.dimensions = variable.dimensions
+        self.dtype = variable.dtype
+        if dims is None:
+            dims = {}
+
+        # The netCDF indices for each dimension (None means the whole dimension).
+        self._indices = []
+        for dimension, size in zip(variable.dimensions, variable.shape):
+            indices = None
+            if dimension in dims:
+                indices = np.arange(size)[dims[dimension]]
+                # Single indices should still yield a dimension of length one.
+                indices = np.atleast_1d(indices)
+            self._indices.append(indices)
+        self.shape = tuple(size if indices is None else len(indices)
+                           for size, indices in zip(variable.shape, self._indices))
+
+        self._time_axis = None
+        if 'time' in self.dimensions:
+            self._time_axis = self.dimensions.index('time')
+
+    def __getstate__(self):
+        # Dataset objects can't be pickled, so drop the handle (and the cache) and reopen on the next read.
+        state = self.__dict__.copy()
+        state['_ds'] = None
+        state['_cache'] = OrderedDict()
+        return state
+
+    def __repr__(self):
+        return f'<lazy {self._name} {self.dimensions} shape={self.shape} from {self._filename}>'
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None):
+        return np.asarray(self[...], dtype=dtype)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def _dataset(self):
+        if self._ds is None or not self._ds.isopen():
+            self._ds = Dataset(self._filename, 'r')
+        return self._ds
+
+    def clear_cache(self):
+        """ Empty the cache of chunks read so far. """
+        self._cache.clear()
+
+    def close(self):
+        """ Close the netCDF file handle. It is reopened on the next read. """
+        if self._ds is not None and self._ds.isopen():
+            self._ds.close()
+        self._ds = None
+
+    def iter_layers(self, layers_per_read=None, positions_per_read=None):
+        """
+        Iterate over the layers of a [time, layer, position] (or [time, position]) variable, reading all the times
+        for blocks of layers and positions at once. With the defaults, the whole variable is read in a single pass
+        through the file(s) rather than once per layer.
+
+        Parameters
+        ----------
+        layers_per_read : int, optional
+            The number of layers to read at once. Defaults to all the layers.
+        positions_per_read : int, optional
+            The number of positions to read at once. Defaults to all the positions.
+
+        Yields
+        ------
+        layer : int
+            The layer index (always 0 for variables without a vertical dimension).
+        positions : slice
+            The positions in this block.
+        data : np.ma.MaskedArray
+            The time series for the layer and positions [time, positions].
+
+        """
+
+        if self._time_axis != 0 or self.ndim not in (2, 3):
+            raise ValueError(f'{self._name} must be shaped [time, layer, position] or [time, position] to iterate '
+                             f'over its layers.')
+
+        ntimes, npositions = self.shape[0], self.shape[-1]
+        nlayers = self.shape[1] if self.ndim == 3 else 1
+        if layers_per_read is None:
+            layers_per_read = nlayers
+        if positions_per_read is None:
+            positions_per_read = npositions
+        layers_per_read, positions_per_read = max(int(layers_per_read), 1), max(int(positions_per_read), 1)
+
+        times = np.arange(ntimes)
+        for layer_start in range(0, nlayers, layers_per_read):
+            layers = np.arange(layer_start, min(layer_start + layers_per_read, nlayers))
+            for position_start in range(0, npositions, positions_per_read):
+                positions = np.arange(position_start, min(position_start + positions_per_read, npositions))
+                if self.ndim == 3:
+                    block = self._read_positions([times, layers, positions])
+                else:
+                    block = self._read_positions([times, positions])[:, np.newaxis, :]
+                for offset, layer in enumerate(layers):
+                    yield layer, slice(positions[0], positions[-1] + 1), block[:, offset, :]
+
+    def _expand_key(self, key):
+        # Convert the given key into a tuple with one entry per dimension.
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is None for k in key):
+            raise IndexError(f'{self._name}: new axes are not supported for lazily loaded data.')
+        ellipses = [i for i, k in enumerate(key) if k is Ellipsis]
+        if len(ellipses) > 1:
+            raise IndexError(f'{self._name}: an index can only have a single ellipsis.')
+        if ellipses:
+            missing = self.ndim - (len(key) - 1)
+            key = key[:ellipses[0]] + (slice(None),) * missing + key[ellipses[0] + 1:]
+        if len(key) > self.ndim:
+            raise IndexError(f'{self._name}: too many indices for a {self.ndim} dimensional variable.')
+
+        return key + (slice(None),) * (self.ndim - len(key))
+
+    def _key_positions(self, key):
+        """
+        Work out which positions we need to read along each dimension (relative to any subset) and how to index the
+        block of data we read to get what we've been asked for. Doing the final indexing with numpy means we
+        behave exactly like an array (including how mixed integer/array indices are broadcast).
+
+        """
+
+        key = self._expand_key(key)
+
+        positions, local_key = [], []
+        for k, length in zip(key, self.shape):
+            if isinstance(k, slice):
+                positions.append(np.arange(length)[k])
+                local_key.append(slice(None))
+            elif isinstance(k, (int, np.integer)):
+                positions.append(np.arange(length)[[k]])
+                local_key.append(0)
+            else:
+                wanted = np.arange(length)[np.asarray(k)]
+                unique, inverse = np.unique(wanted, return_inverse=True)
+                positions.append(unique)
+                local_key.append(inverse.reshape(wanted.shape))
+
+        return positions, tuple(local_key)
+
+    def _read(self, positions):
+        """
+        Read the data for the given netCDF indices along each dimension from disk.
+
+        The netCDF library prefers sorted, unique indices, so we read those (as a slice where contiguous) and then
+        put the data back into the requested order.
+
+        """
+
+        if any(len(p) == 0 for p in positions):
+            return np.ma.masked_all([len(p) for p in positions], dtype=self.dtype)
+
+        read_indices, read_shape, reorder = [], [], []
+        for p in positions:
+            unique, inverse = np.unique(p, return_inverse=True)
+            if unique[-1] - unique[0] + 1 == len(unique):
+                read_indices.append(slice(unique[0], unique[-1] + 1))
+            else:
+                read_indices.append(unique)
+            read_shape.append(len(unique))
+            reorder.append(None if np.array_equal(unique, p) else inverse)
+
+        data = np.ma.asarray(self._dataset.variables[self._name][tuple(read_indices)]).reshape(read_shape)
+        for axis, inverse in enumerate(reorder):
+            if inverse is not None:
+                data = data.take(inverse, axis=axis)
+
+        return data
+
+    def _read_chunk(self, chunk, positions):
+        # Fetch the given time chunk (with the given indices along the other dimensions), using the cache if possible.
+        cache_key = (chunk,) + tuple(p.tobytes() for axis, p in enumerate(positions) if axis != self._time_axis)
+        if cache_key in self._cache:
+            self._cache.move_to_end(cache_key)
+            return self._cache[cache_key]
+
+        time_size = self._dataset.variables[self._name].shape[self._time_axis]
+        chunk_positions = list(positions)
+        chunk_positions[self._time_axis] = np.arange(chunk * self._chunk_size,
+                                                     min((chunk + 1) * self._chunk_size, time_size))
+        data = self._read(chunk_positions)
+
+        if self._cache_size > 0:
+            self._cache[cache_key] = data
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+        return data
+
+    def __getitem__(self, key):
+        positions, local_key = self._key_positions(key)
+
+        return self._read_positions(positions)[local_key]
+
+    def _read_positions(self, positions):
+        """
+        Read the block of data for the given positions (relative to any subset) along each dimension, using the
+        cache for time-varying data.
+
+        """
+
+        # Convert to indices in the netCDF file.
+        positions = [p if indices is None else indices[p] for p, indices in zip(positions, self._indices)]
+
+        if self._time_axis is None:
+            data = self._read(positions)
+        else:
+            time_positions = positions[self._time_axis]
+            chunks = time_positions // self._chunk_size
+            data = None
+            for chunk in np.unique(chunks):
+                chunk_data = self._read_chunk(chunk, positions)
+                if data is None:
+                    # Use the type of the data we've read since scale_factor and add_offset can change it.
+                    data = np.ma.masked_all([len(p) for p in positions], dtype=chunk_data.dtype)
+                selection = [slice(None)] * self.ndim
+                selection[self._time_axis] = np.flatnonzero(chunks == chunk)
+                offsets = time_positions[chunks == chunk] - chunk * self._chunk_size
+                data[tuple(selection)] = chunk_data.take(offsets, axis=self._time_axis)
+            if data is None:
+                data = np.ma.masked_all([len(p) for p in positions], dtype=self.dtype)
+
+        return data
+
+
+class _MultiFileVariable(_LazyVariable):
+    """
+    Array-like proxy for a time-varying netCDF variable split across several files (with the same grid) which
+    presents a single time axis. The data for each time are read on demand from whichever file holds that time,
+    so nothing is concatenated in memory.
+
+    Index the object as you would a numpy array to get a numpy masked array (see _LazyVariable).
+
+    """
+
+    def __init__(self, filenames, name, file_index, time_index, dims=None, chunk_size=24, cache_size=4):
+        """
+        Parameters
+        ----------
+        filenames : list-like
+            The FVCOM netCDF files from which to read.
+        name : str
+            The variable name.
+        file_index, time_index : np.ndarray
+            For each time in the combined time axis, the index of the file in `filenames' and the time index in that
+            file.
+        dims : dict, optional
+            Dictionary of dimension names and the indices to extract along each (as for FileReader). Any time
+            dimension is ignored as the times are given by `file_index' and `time_index'.
+        chunk_size : int, optional
+            Number of time steps to read from each netCDF at once. Defaults to 24.
+        cache_size : int, optional
+            Maximum number of chunks to keep in memory for each file. Defaults to 4. The handles for the most recently
+            used `cache_size' files (at least one) are kept.
+
+        """
+
+        self._filenames = [str(i) for i in filenames]
+        self._name = name
+        self._file_index = np.asarray(file_index, dtype=int)
+        self._time_index = np.asarray(time_index, dtype=int)
+        if dims is None:
+            dims = {}
+        self._dims = {dimension: dims[dimension] for dimension in dims if dimension != 'time'}
+        self._chunk_size = max(int(chunk_size), 1)
+        self._cache_size = int(cache_size)
+        self._variables = OrderedDict()
+
+        first = self._file_variable(self._file_index[0] if len(self._file_index) else 0)
+        if first._time_axis is None:
+            raise ValueError(f'{name} does not have a time dimension.')
+        self.dimensions = first.dimensions
+        self.dtype = first.dtype
+        self._time_axis = first._time_axis
+        shape = list(first.shape)
+        shape[self._time_axis] = len(self._file_index)
+        self.shape = tuple(shape)
+
+    def __getstate__(self):
+        return self.__dict__.copy()
+
+    def __repr__(self):
+        return f'<lazy {self._name} {self.dimensions} shape={self.shape} from {len(self._filenames)} files>'
+
+    def clear_cache(self):
+        """ Empty the cache of chunks read so far. """
+        for variable in self._variables.values():
+            variable.clear_cache()
+
+    def close(self):
+        """ Close any open netCDF file handles. They are reopened on the next read. """
+        for variable in self._variables.values():
+            variable.close()
+
+    def _file_variable(self, index):
+        # Return the proxy for this variable in the given file, keeping only the most recently used ones.
+        if index in self._variables:
+            self._variables.move_to_end(index)
+            return self._variables[index]
+
+        variable = _LazyVariable(self._filenames[index], self._name, dims=self._dims, chunk_size=self._chunk_size,
+                                 cache_size=self._cache_size)
+        variable.close()
+        if hasattr(self, 'shape'):
+            expected = [size for axis, size in enumerate(self.shape) if axis != self._time_axis]
+            found = [size for axis, size in enumerate(variable.shape) if axis != self._time_axis]
+            if expected != found:
+                raise ValueError(f'{self._name} in {self._filenames[index]} has a different shape ({variable.shape}) '
+                                 f'from the other files.')
+
+        self._variables[index] = variable
+        while len(self._variables) > max(self._cache_size, 1):
+            self._variables.popitem(last=False)
+
+        return variable
+
+    def _read_positions(self, positions):
+        time_positions = positions[self._time_axis]
+        files = self._file_index[time_positions]
+
+        data = None
+        for file_index in np.unique(files):
+            selected = files == file_index
+            variable = self._file_variable(file_index)
+            file_positions = list(positions)
+            file_positions[self._time_axis] = self._time_index[time_positions[selected]]
+            try:
+                block = variable._read_positions(file_positions)
+            finally:
+                # Don't keep a handle open for every file we touch.
+                variable.close()
+            if data is None:
+                data = np.ma.masked_all([len(p) for p in positions], dtype=block.dtype)
+            selection = [slice(None)] * self.ndim
+            selection[self._time_axis] = np.flatnonzero(selected)
+            data[tuple(selection)] = block
+
+        if data is None:
+            data = np.ma.masked_all([len(p) for p in positions], dtype=self.dtype)
+
+        return data
+
+
+def _time_periods(datetimes, period):
+    """
+    Group times into calendar periods.
+
+    Parameters
+    ----------
+    datetimes : np.ndarray
+        The times (as datetime objects) in ascending order.
+    period : str
+        The period: `daily', `weekly', `monthly', `seasonal' or `yearly' (`annual' is a synonym). Weeks start at the
+        first midnight in the time series. Seasons are the meteorological seasons (DJF, MAM, JJA, SON) so December
+        counts towards the following year's winter.
+
+    Returns
+    -------
+    labels : np.ndarray
+        The index of the period for each time.
+    starts, ends : np.ndarray
+        The start and (exclusive) end of each period as datetimes.
+
+    """
+
+    midnights = np.array([datetime(i.year, i.month, i.day) for i in datetimes])
+    if period == 'daily':
+        starts = midnights
+        step = relativedelta(days=1)
+    elif period == 'weekly':
+        origin = midnights[0]
+        if origin < datetimes[0]:
+            origin += timedelta(days=1)
+        starts = np.array([origin + timedelta(days=7 * ((i - origin).days // 7)) for i in midnights])
+        step = relativedelta(days=7)
+    elif period == 'monthly':
+        starts = np.array([datetime(i.year, i.month, 1) for i in datetimes])
+        step = relativedelta(months=1)
+    elif period == 'seasonal':
+        starts = np.array([datetime(i.year, i.month, 1) - relativedelta(months=i.month % 3) for i in datetimes])
+        step = relativedelta(months=3)
+    elif period == 'yearly' or period == 'annual':
+        starts = np.array([datetime(i.year, 1, 1) for i in datetimes])
+        step = relativedelta(years=1)
+    else:
+        raise ValueError('Unsupported period {}'.format(period))
+
+    starts, labels = np.unique(starts, return_inverse=True)
+    ends = np.array([i + step for i in starts])
+
+    return labels, starts, ends
+
+
+def _stream_period_means(data, labels, periods, chunk_size=24):
+    """
+    Average time-varying data over periods by streaming through the time dimension with running sums so only
+    `chunk_size' times (and a single period's accumulator) are ever held in memory.
+
+    Parameters
+    ----------
+    data : np.ndarray, PyFVCOM.read._LazyVariable
+        The data to average, with time as the first dimension.
+    labels : np.ndarray
+        The (ascending) period index of each time in `data'.
+    periods : np.ndarray
+        The periods to average. Times in other periods are not read.
+    chunk_size : int, optional
+        The number of times to read at once. Defaults to 24.
+
+    Yields
+    ------
+    period : int
+        The period index.
+    mean : np.ndarray
+        The mean of the valid (unmasked) values in the period. Positions with no valid values are masked.
+
+    """
+
+    def _mean(total, count):
+        mean = total / np.maximum(count, 1)
+        if np.any(count == 0):
+            mean = np.ma.array(mean, mask=count == 0)
+        return mean
+
+    times = np.flatnonzero(np.isin(labels, periods))
+    chunk_size = max(int(chunk_size), 1)
+    current, total, count = None, None, None
+    for start in range(0, len(times), chunk_size):
+        chunk = times[start:start + chunk_size]
+        block = np.ma.asarray(data[chunk[0]:chunk[-1] + 1])[chunk - chunk[0]]
+        for period in np.unique(labels[chunk]):
+            if period != current:
+                if current is not None:
+                    yield current, _mean(total, count)
+                current, total, count = period, 0, 0
+            samples = block[labels[chunk] == period]
+            total = total + samples.filled(0).sum(axis=0, dtype=np.float64)
+            count = count + np.sum(~np.ma.getmaskarray(samples), axis=0)
+
+    if current is not None:
+        yield current, _mean(total, count)
+
+
 class FileReader(Domain):
     """
     Load FVCOM model output.
@@ -410,6 +909,7 @@ class FileReader(Domain):
     avg_volume_var - calculate the cumulative depth-average of the given variable in space as a time series
     time_to_index - find the time index for the given time string (%Y-%m-%d %H:%M:%S.%f) or datetime object.
     time_average - average the requested variable in time at the specified frequency
+    write_time_average - stream variables through time and write calendar period averages to netCDF
     add_river_flow - add river flow information to the current object
     to_excel - export data to an Excel file (with limitations)
     to_csv - export data to a CSV file (with limitations)
@@ -417,7 +917,7 @@ class FileReader(Domain):
     Attributes
     ----------
     In addition to the attributes from PyFVCOM.grid.Domain (dims and grid), this object has:
-    data - model data (generally time series) loaded from the netCDF file.
+    data - model data (generally time series) loaded from the netCDF file (or lazily read proxies with `lazy').
     river - river data.
     ds - the netCDF Dataset handle.
     variable_dimension_names - the list of dimensions for all the variables in the netCDF
@@ -437,7 +937,8 @@ class FileReader(Domain):
 
     """
 
-    def __init__(self, fvcom, variables=[], dims={}, zone='30', debug=False, verbose=False, subset_method='slice'):
+    def __init__(self, fvcom, variables=[], dims={}, zone='30', debug=False, verbose=False, subset_method='slice',
+                 lazy=False, chunk_size=24, cache_size=4):
         """
         Parameters
         ----------
@@ -464,6 +965,14 @@ class FileReader(Domain):
             'memory', all the data are loaded from netCDF into memory and then sliced in memory; with 'slice',
             the data are sliced directly from the netCDF file. The former uses a lot more memory but may be faster,
             the latter uses much less memory but is more sensitive to the structure of the netCDF.
+        lazy : bool, optional
+            Set to True to make each variable in self.data a proxy which only reads from the netCDF the data which
+            are indexed (e.g. fvcom.data.temp[t, :, nodes]) rather than loading the whole variable into memory. This
+            is useful for very large model outputs. Defaults to False.
+        chunk_size : int, optional
+            With `lazy', the number of time steps to read from the netCDF at once. Defaults to 24.
+        cache_size : int, optional
+            With `lazy', the maximum number of chunks of each variable to keep in memory. Defaults to 4.
 
         Example
         -------
@@ -492,6 +1001,9 @@ class FileReader(Domain):
         self._fvcom = fvcom
         self._zone = zone
         self._get_data_pattern = subset_method
+        self._lazy = lazy
+        self._chunk_size = chunk_size
+        self._cache_size = cache_size
 
         if not hasattr(self, '_bounding_box'):
             self._bounding_box = False
@@ -1241,6 +1753,13 @@ class FileReader(Domain):
                 # Should we error here or carry on having warned?
                 warn(f'{v} does not contain a time dimension.')
 
+            if getattr(self, '_lazy', False):
+                if self._debug:
+                    print('Deferring data reads until the data are indexed', flush=True)
+                setattr(self.data, v, _LazyVariable(self._fvcom, v, dims=dims, chunk_size=self._chunk_size,
+                                                    cache_size=self._cache_size, dataset=self.ds))
+                continue
+
             try:
                 if self._get_data_pattern == 'slice':
                     if self._debug:
@@ -1333,7 +1852,8 @@ class FileReader(Domain):
         Parameters
         ----------
         poolsize : int, optional
-            Specify a number of processes to use when calculating the grid control volumes. Defaults to no parallelism.
+            Ignored as the grid control volumes are now calculated in a single vectorised pass. Retained for backwards
+            compatibility.
 
         Provides
         --------
@@ -1370,68 +1890,154 @@ class FileReader(Domain):
         self.grid_volume()
         self.grid.depth = self.data.zeta + self.grid.h
 
-    def total_volume_var(self, var, poolsize=None):
+    def total_volume_var(self, var, poolsize=None, regions=None, chunk_size=None):
         """
         Integrate a given variable in space returning a time series of the integrated values.
 
         Parameters
         ----------
-        var : str
-            The name of the variable to load. Must be a depth-resolved array.
+        var : str, list-like
+            The name of the variable(s) to integrate. Must be depth-resolved arrays.
         poolsize : int, optional
-            Specify a number of processes to use when calculating the grid control volumes. Defaults to no parallelism.
+            Ignored as the grid control volumes are now calculated in a single vectorised pass. Retained for backwards
+            compatibility.
+        regions : np.ndarray, optional
+            Region masks (or weights) at the nodes, either a single array (node) or one row per region (region, node).
+            If omitted, the whole domain is integrated.
+        chunk_size : int, optional
+            The number of times to integrate at once, which bounds the memory used. Defaults to the FileReader chunk
+            size (24).
 
         Provides
         --------
         {var}_total : np.ndarray
-            Adds a new array which is a time series of the integrated value of the variable at each model time.
+            Adds a new array which is a time series of the integrated value of the variable at each model time. If
+            `regions' is given as a 2D array, the array is (time, region).
+
+        Notes
+        -----
+        Variables which have not been loaded are read in chunks of time rather than loaded in their entirety.
 
         """
 
-        self._get_cv_volumes(poolsize=poolsize)
+        if not hasattr(var, '__iter__') or isinstance(var, str):
+            var = [var]
 
-        if not hasattr(self.data, var):
-            self.load_data([var])
+        for v in var:
+            integral = self._volume_integral(v, regions=regions, chunk_size=chunk_size, poolsize=poolsize)
+            setattr(self.data, '{}_total'.format(v), integral)
 
-        if len(getattr(self.data, var).shape) != 3:
-            raise ValueError('The requested variable ({}) is not depth-resolved.'.format(var))
+    def avg_volume_var(self, var, regions=None, chunk_size=None):
+        """
+        Return the cumulative depth-average of the given variable in space, returning a time series.
+
+        Parameters
+        ----------
+        var : str, list-like
+            The name of the variable(s) to load. Must be depth-resolved arrays.
+        regions : np.ndarray, optional
+            Region masks (or weights) at the nodes, either a single array (node) or one row per region (region, node).
+            If omitted, the whole domain is used.
+        chunk_size : int, optional
+            The number of times to process at once, which bounds the memory used. Defaults to the FileReader chunk
+            size (24).
 
-        # Do as a loop because it nukes the memory otherwise
-        int_vol = np.zeros(self.dims.time)
+        Provides
+        --------
+        {var}_average : np.ndarray
+            Adds a new array which is a time series of the depth-average cumulative sum. If `regions' is given as a
+            2D array, the array is (time, region).
+
+        """
 
-        for i in range(len(self.grid.x)):
-            int_vol += np.sum(getattr(self.data, var)[..., i] *
-                              self.grid.depth_volume[..., i], axis=1)
+        if not hasattr(var, '__iter__') or isinstance(var, str):
+            var = [var]
 
-        setattr(self.data, '{}_total'.format(var), int_vol)
+        for v in var:
+            integral = self._volume_integral(v, regions=regions, chunk_size=chunk_size, depth_average=True)
+            setattr(self.data, '{}_average'.format(v), integral)
 
-    def avg_volume_var(self, var):
+    def _volume_integral(self, var, regions=None, chunk_size=None, depth_average=False, poolsize=None):
         """
-        Return the cumulative depth-average of the given variable in space, returning a time series.
+        Integrate `var' over the control volumes in chunks of time.
 
         Parameters
         ----------
         var : str
-            The name of the variable to load. Must be a depth-resolved array.
+            The depth-resolved variable to integrate.
+        regions : np.ndarray, optional
+            Region masks (or weights) at the nodes, (node) or (region, node).
+        chunk_size : int, optional
+            The number of times to integrate at once. Defaults to the FileReader chunk size (24).
+        depth_average : bool, optional
+            Set to True to sum the volume-weighted depth averages at each node rather than integrate the volume.
+        poolsize : int, optional
+            Ignored (see `control_volumes').
 
-        Provides
-        --------
-        {var}_total : np.ndarray
-            Adds a new array which is a time series of the depth-average cumulative sum.
+        Returns
+        -------
+        integral : np.ndarray
+            The time series (time) or (time, region) of the integrated values.
 
         """
 
-        if not hasattr(self, 'volume'):
-            self._get_cv_volumes()
+        if chunk_size is None:
+            chunk_size = getattr(self, '_chunk_size', 24)
+        chunk_size = max(int(chunk_size), 1)
 
-        if not hasattr(self.data, var):
-            self.load_data([var])
+        if not hasattr(self.grid, 'art1'):
+            self.grid.art1 = np.asarray(control_volumes(self.grid.x, self.grid.y, self.grid.triangles,
+                                                        element_control=False, poolsize=poolsize))
+
+        data = self._chunked_source(var, chunk_size)
+        if len(data.shape) != 3:
+            raise ValueError('The requested variable ({}) is not depth-resolved.'.format(var))
+
+        # Layer thicknesses (as a fraction of the water column), subset to the loaded layers if necessary.
+        dz = np.ma.filled(np.abs(np.diff(self.grid.siglev, axis=0)), 0)
+        if 'siglay' in self._dims and 'siglev' not in self._dims:
+            dz = dz[self._dims['siglay']]
+
+        if hasattr(self.data, 'zeta') or getattr(self, '_lazy', False) or \
+                self.ds.dimensions['time'].size == self.dims.time:
+            surface_elevation = self._chunked_source('zeta', chunk_size)
+        else:
+            # Warn if we've got different number of zeta times from the other variable times. In that situation,
+            # we'll do non-time-varying volumes.
+            warn(f"Found a different length surface elevation time series from what has already been loaded. As "
+                 f"such, we cannot load the relevant surface elevation so we are setting it to zero. If you are "
+                 f"concatenating FileReader objects, load `zeta' along with your other variables to fix this.")
+            surface_elevation = None
+
+        area = np.ma.filled(self.grid.art1, 0)
+        depth = np.ma.filled(self.grid.h, 0)
+
+        weights = None
+        if regions is not None:
+            weights = np.asarray(regions, dtype=float)
+            if weights.shape[-1] != len(depth):
+                raise ValueError('The region masks must be defined at the model nodes.')
+
+        nt = len(data)
+        integral = np.zeros((nt,) if weights is None or weights.ndim == 1 else (nt, weights.shape[0]))
+        for start in range(0, nt, chunk_size):
+            chunk = slice(start, min(start + chunk_size, nt))
+            values = np.ma.filled(np.ma.asarray(data[chunk]), 0)
+            # Sum through the water column first so we never make a (time, depth, node) volume array.
+            layer_sum = np.einsum('tkn,kn->tn', values, dz)
+            if depth_average:
+                node_values = layer_sum / dz.sum(axis=0)
+            else:
+                zeta = 0
+                if surface_elevation is not None:
+                    zeta = np.ma.filled(np.ma.asarray(surface_elevation[chunk]), 0)
+                node_values = layer_sum * area * (zeta + depth)
+            if weights is None:
+                integral[chunk] = node_values.sum(axis=1)
+            else:
+                integral[chunk] = node_values @ weights.T
 
-        int_vol = 0
-        for i in range(len(self.grid.x)):
-            int_vol += np.average(getattr(self.data, var)[:, :, i],
-                                  weights=self.grid.depth_volume[..., i], axis=1)
-        setattr(self.data, '{}_average'.format(var), int_vol)
+        return integral
 
     def time_to_index(self, *args, **kwargs):
         """
@@ -1457,11 +2063,11 @@ class FileReader(Domain):
 
         return time_idx
 
-    def time_average(self, variable, period, return_times=False):
+    def time_average(self, variable, period, return_times=False, chunk_size=None):
         """
-        Average the requested variable in time at the specified frequency. If the data for variable are not loaded,
-        they will be before averaging. Averaging starts at the first midnight in the time series and ends at the last
-        midnight in the time series (values outside those times are ignored).
+        Average the requested variable in time over calendar periods. Only complete periods (those which start at or
+        after the first time and end at or before the last time) are averaged. The data are read in chunks of time,
+        so variables which have not been loaded are averaged without loading them in their entirety.
 
         The result is added to self.data as an attribute named f'{variable}_{period}'.
 
@@ -1471,78 +2077,199 @@ class FileReader(Domain):
             A variable to average in time. Can have no spatial dimension (i.e. a time series of some data across a
             region).
         period : str
-            The period over which to average. Select from `daily', `weekly', `monthly' or `yearly' (`annual' is a
-            synonym). `Monthly' is actually 4-weekly rather than per calendar month.
+            The period over which to average. Select from `daily', `weekly', `monthly', `seasonal' or `yearly'
+            (`annual' is a synonym). Months, seasons and years follow the calendar; see `write_time_average' for
+            the details.
         return_times : bool, optional
             Set to True to return the times of the averages as datetimes. Defaults to False.
+        chunk_size : int, optional
+            The number of times to read at once. Defaults to the FileReader chunk size (24).
 
         Returns
         -------
         times : np.ndarray
-            If return_times is set to True, return an array of the datetimes which correspond to each average.
-
-        """
-
-        # TODO: the monthly and yearly averaging could be more robust by finding the unique complete months/years and
-        # TODO: averaging those rather than assuming 4 weekly months and 365 day years.
-        interval_seconds = np.unique([i.total_seconds() for i in np.diff(self.time.datetime)])
-        if len(interval_seconds) > 1:
-            raise ValueError('Cannot compute time average on irregularly sampled data.')
-        seconds_per_day = 60 * 60 * 24
-        if period == 'daily':
-            step = int(seconds_per_day / interval_seconds)
-        elif period == 'weekly':
-            step = int(seconds_per_day * 7 / interval_seconds)
-        elif period == 'monthly':
-            step = int(seconds_per_day * 7 * 4 / interval_seconds)
-        elif period == 'yearly' or period == 'annual':
-            step = int(seconds_per_day * 365 / interval_seconds)
-        else:
-            raise ValueError('Unsupported period {}'.format(period))
+            If return_times is set to True, return an array of the datetimes which correspond to each average (the
+            middle of each period).
 
-        if not hasattr(self.data, variable):
-            if self._noisy:
-                print('Loading {} for time-averaging.'.format(variable))
-            self.load_data(variable)
-
-        # We're assuming time is the first dimension here since we're working with FVCOM data by and large. If that
-        # changes, we'll have to find the index of the time dimension and then do the reshape with that dimension
-        # first before reshaping back to the original order. You might be able to understand why I'm not bothering
-        # with all that right now.
-
-        # First, find the first midnight values as all periods average from midnight on the first day.
-        midnights = [_.hour == 0 for _ in self.time.datetime]
-        first_midnight = np.argwhere(midnights)[0][0]
-        last_midnight = np.argwhere(midnights)[-1][0]
+        """
 
-        if first_midnight == last_midnight:
+        labels, starts, ends = _time_periods(self.time.datetime, period)
+        periods = np.flatnonzero((starts >= self.time.datetime[0]) & (ends <= self.time.datetime[-1]))
+        if len(periods) == 0:
             raise IndexError('Too few data to average at {} frequency.'.format(period))
 
-        # For the averaging, reshape the time dimension into chunks which match the periods and then average along
-        # that reshaped dimension. Getting the new shape is a bit fiddly. We should always have at least two
-        # dimensions here (time, space) so this should always work.
-        other_dimensions = []
-        if len(getattr(self.data, variable).shape) > 1:
-            other_dimensions = [_ for _ in getattr(self.data, variable).shape[1:]]
+        if chunk_size is None:
+            chunk_size = getattr(self, '_chunk_size', 24)
 
-        # Check that the maximum difference of the first day's data and the first averaged data is zero:
-        # (averaged[0] - getattr(self.data, variable)[first_midnight:first_midnight + step].mean(axis=0)).max() == 0
-        averaged = getattr(self.data, variable)[first_midnight:last_midnight, ...]
-        averaged = np.mean(averaged.reshape([-1, step] + other_dimensions), axis=1)
+        # We're assuming time is the first dimension here since we're working with FVCOM data by and large.
+        means = [mean for _, mean in _stream_period_means(self._chunked_source(variable, chunk_size), labels,
+                                                          periods, chunk_size)]
+        if any(np.ma.isMaskedArray(mean) for mean in means):
+            averaged = np.ma.stack(means)
+        else:
+            averaged = np.stack(means)
 
         setattr(self.data, '{}_{}'.format(variable, period), averaged)
 
         if return_times:
-            # Two options here: either return the arithmetic mean of self.time.time[first_midnight:last_midnight]
-            # with an extra delta t at the start, or (as is done here), divide by nt + 1. The end result is the same.
-            # This has the added advantage of not needing to work with self.time.time (we can work on datetimes
-            # directly).
-            folded_time = self.time.datetime[first_midnight:last_midnight].reshape(-1, step)
-            nt = folded_time.shape[1]
-            day_origin = self.time.datetime[first_midnight:last_midnight:step]
-            new_times = day_origin + (np.sum((folded_time.T - day_origin).T, axis=1) / (nt - 1))
+            return starts[periods] + (ends[periods] - starts[periods]) / 2
+
+    def write_time_average(self, ncfile, variables, period, chunk_size=None, complete=True, ncformat='NETCDF4',
+                           ncopts={'zlib': True, 'complevel': 7}):
+        """
+        Stream the given variables through time, averaging them over calendar periods, and write the averages to a
+        new netCDF file. Only `chunk_size' times of one variable and the accumulator for the current period are held
+        in memory at once, so this works for long (e.g. decadal) runs. Use a MultiFileReader to average across a
+        set of output files.
 
-            return new_times
+        Parameters
+        ----------
+        ncfile : str, pathlib.Path
+            The netCDF file to create.
+        variables : list-like, str
+            The variable(s) to average. Variables which have not been loaded are read directly from the netCDF.
+        period : str
+            The period over which to average. Select from `daily', `weekly', `monthly', `seasonal' or `yearly'
+            (`annual' is a synonym).
+        chunk_size : int, optional
+            The number of times to read at once. Defaults to the FileReader chunk size (24).
+        complete : bool, optional
+            Set to False to also average the partial periods at the start and end of the time series. Defaults to
+            True (complete periods only).
+        ncformat : str, optional
+            The netCDF file type to create. If omitted, defaults to `NETCDF4'.
+        ncopts : dict, optional
+            Dictionary of additional arguments to pass when adding new variables (see
+            `netCDF4.Dataset.createVariable'). If omitted, defaults to compression on.
+
+        Notes
+        -----
+        - Months, seasons and years follow the calendar rather than a fixed number of days. Weeks start at the first
+        midnight in the time series. Seasons are the meteorological seasons (DJF, MAM, JJA, SON) with December
+        counting towards the following year's winter.
+        - The averages are the mean of the samples in each period (i.e. regular sampling is assumed for a true time
+        mean). Masked values are excluded from the average.
+        - The time of each average is the middle of the period. The period limits are written to `time_bounds' and
+        the number of samples in each period to `samples'.
+
+        """
+
+        if isinstance(variables, str):
+            variables = [variables]
+        if chunk_size is None:
+            chunk_size = getattr(self, '_chunk_size', 24)
+
+        labels, starts, ends = _time_periods(self.time.datetime, period)
+        periods = np.arange(len(starts))
+        if complete:
+            periods = periods[(starts >= self.time.datetime[0]) & (ends <= self.time.datetime[-1])]
+        if len(periods) == 0:
+            raise IndexError('Too few data to average at {} frequency.'.format(period))
+
+        mjd_origin = 'days since 1858-11-17 00:00:00'
+        midpoints = starts[periods] + (ends[periods] - starts[periods]) / 2
+        mjd = date2num(midpoints, units=mjd_origin)
+
+        sources = {variable: self._chunked_source(variable, chunk_size) for variable in variables}
+        for variable in sources:
+            if 'time' not in self.variable_dimension_names[variable]:
+                raise ValueError(f'{variable} does not contain a time dimension.')
+
+        # The grid variables we can write sensibly (i.e. those whose shape matches the loaded grid).
+        grid_names = [i for i in ('x', 'y', 'lon', 'lat', 'xc', 'yc', 'lonc', 'latc', 'h', 'siglay', 'siglev')
+                      if hasattr(self.grid, i) and i in self.variable_dimension_names]
+
+        dimensions = set()
+        for name in grid_names + variables:
+            dimensions.update(i for i in self.variable_dimension_names[name] if i != 'time')
+
+        with Dataset(str(ncfile), 'w', format=ncformat, clobber=True) as nc:
+            module_name = f'PyFVCOM.{Path(inspect.stack()[0][1]).stem}.{self.__class__.__name__}'
+            now = datetime.now().strftime('%Y-%m-%d at %H:%M:%S')
+            nc.setncattr('history', f'File created using {module_name}.write_time_average on {now}.')
+            nc.setncattr('source', 'FVCOM_3.0')  # for ParaView compatibility
+            nc.setncattr('averaging_period', period)
+
+            nc.createDimension('time', None)
+            nc.createDimension('DateStrLen', 26)
+            nc.createDimension('three', 3)
+            nc.createDimension('nbnd', 2)
+            for dimension in sorted(dimensions):
+                if dimension not in nc.dimensions:
+                    nc.createDimension(dimension, getattr(self.dims, dimension))
+
+            # Grid.
+            for name in grid_names:
+                data = getattr(self.grid, name)
+                shape = tuple(nc.dimensions[i].size for i in self.variable_dimension_names[name])
+                if np.shape(data) == shape:
+                    nc.createVariable(name, 'f4', self.variable_dimension_names[name], **ncopts)[:] = data
+            if 'nele' in nc.dimensions and len(self.grid.triangles) == nc.dimensions['nele'].size:
+                nc.createVariable('nv', 'i4', ('three', 'nele'), **ncopts)[:] = self.grid.triangles.T + 1
+
+            # Time.
+            time = nc.createVariable('time', 'f4', ['time'], **ncopts)
+            time.setncattr('units', mjd_origin)
+            time.setncattr('format', 'modified julian day (MJD)')
+            time.setncattr('long_name', 'time')
+            time.setncattr('time_zone', 'UTC')
+            time.setncattr('bounds', 'time_bounds')
+            time[:] = mjd
+            Itime = nc.createVariable('Itime', 'i', ['time'], **ncopts)
+            Itime.setncattr('units', mjd_origin)
+            Itime.setncattr('format', 'modified julian day (MJD)')
+            Itime.setncattr('time_zone', 'UTC')
+            Itime[:] = np.floor(mjd)
+            Itime2 = nc.createVariable('Itime2', 'i', ['time'], **ncopts)
+            Itime2.setncattr('units', 'msec since 00:00:00')
+            Itime2.setncattr('time_zone', 'UTC')
+            Itime2[:] = np.round((mjd - np.floor(mjd)) * 24 * 60 * 60 * 1000)
+            Times = nc.createVariable('Times', 'c', ['time', 'DateStrLen'], **ncopts)
+            Times.setncattr('long_name', 'Calendar Date')
+            Times.setncattr('format', 'String: Calendar Time')
+            Times.setncattr('time_zone', 'UTC')
+            Times[:] = stringtochar(np.array([i.strftime('%Y-%m-%dT%H:%M:%S.%f') for i in midpoints], dtype='S26'))
+            bounds = nc.createVariable('time_bounds', 'f8', ['time', 'nbnd'], **ncopts)
+            bounds.setncattr('units', mjd_origin)
+            bounds[:] = np.column_stack((date2num(starts[periods], units=mjd_origin),
+                                         date2num(ends[periods], units=mjd_origin)))
+            samples = nc.createVariable('samples', 'i4', ['time'], **ncopts)
+            samples.setncattr('long_name', 'number of samples in the averaging period')
+            samples[:] = np.bincount(labels, minlength=len(starts))[periods]
+
+            # Data, written one period at a time.
+            for variable, source in sources.items():
+                self.atts.get_attribute(variable)
+                attributes = getattr(self.atts, variable)
+                fill_value = getattr(attributes, '_FillValue', None)
+                output = nc.createVariable(variable, 'f4', self.variable_dimension_names[variable],
+                                           fill_value=fill_value, **ncopts)
+                for attribute in attributes:
+                    if attribute != '_FillValue':
+                        output.setncattr(attribute, getattr(attributes, attribute))
+                output.setncattr('cell_methods', 'time: mean')
+                for index, (_, mean) in enumerate(_stream_period_means(source, labels, periods, chunk_size)):
+                    output[index] = mean
+
+    def _chunked_source(self, variable, chunk_size):
+        """
+        Find the data to read in chunks of time for `variable': loaded data (or a lazy proxy) if we have them,
+        otherwise a lazy proxy onto the netCDF which is not added to self.data.
+
+        """
+
+        if hasattr(self.data, variable):
+            return getattr(self.data, variable)
+
+        if getattr(self, '_lazy', False):
+            self.load_data(variable)
+            return getattr(self.data, variable)
+
+        if variable not in self.ds.variables:
+            raise NameError(f"Variable '{variable}' not present in {self._fvcom}")
+
+        return _LazyVariable(self._fvcom, variable, dims=self._dims, chunk_size=chunk_size, cache_size=0,
+                             dataset=self.ds)
 
     def add_river_flow(self, river_nc_file, river_nml_file):
         """
@@ -1999,6 +2726,10 @@ def MFileReader(fvcom, noisy=False, *args, **kwargs):
     fvcom : PyFVCOM.read.FileReader
         Concatenated data from the files in `fvcom'.
 
+    See Also
+    --------
+    PyFVCOM.read.MultiFileReader : read data on demand from many files without concatenating them in memory.
+
     """
 
     if isinstance(fvcom, str):
@@ -2017,6 +2748,156 @@ def MFileReader(fvcom, noisy=False, *args, **kwargs):
     return fvcom_out
 
 
+class MultiFileReader(FileReader):
+    """
+    Load FVCOM model output split across several files (e.g. a year of daily outputs) as a single time series.
+
+    The times in all the files are read once and sorted into a single time axis, dropping duplicate times (e.g. the
+    last time of one file repeated as the first time of the next). Each variable in self.data is a proxy which reads
+    the requested times from the relevant files on demand (as with FileReader(..., lazy=True)), so the files are
+    never concatenated in memory.
+
+    The grid and variable attributes are taken from the first file. All files must share the same grid.
+
+    Methods and attributes are as for PyFVCOM.read.FileReader.
+
+    """
+
+    def __init__(self, fvcom, variables=[], dims={}, zone='30', debug=False, verbose=False, chunk_size=24,
+                 cache_size=4):
+        """
+        Parameters
+        ----------
+        fvcom : list-like
+            Paths to the FVCOM netCDF files. The files can be in any order.
+        variables : list-like, optional
+            List of variables to extract.
+        dims : dict, optional
+            Dictionary of dimension names along which to subsample (as for FileReader). Time indices (or a time range
+            given as strings or datetime objects) refer to the combined time axis.
+        zone : str, list-like, optional
+            UTM zones (defaults to '30N') for conversion of UTM to spherical coordinates.
+        verbose : bool, optional
+            Set to True to enable verbose output. Defaults to False.
+        debug : bool, optional
+            Set to True to enable debug output. Defaults to False.
+        chunk_size : int, optional
+            The number of time steps to read from each netCDF at once. Defaults to 24.
+        cache_size : int, optional
+            The maximum number of chunks of each variable to keep in memory for each file. Defaults to 4.
+
+        Example
+        -------
+        >>> from PyFVCOM.read import MultiFileReader
+        >>> fvcom = MultiFileReader(sorted(Path('output').glob('casename_*.nc')), variables=['temp'])
+        >>> surface_temp_series = fvcom.data.temp[:, 0, 100]
+
+        """
+
+        if isinstance(fvcom, (str, Path)):
+            fvcom = [fvcom]
+        self._files = [str(i) for i in fvcom]
+        if not self._files:
+            raise ValueError('No files given.')
+
+        super().__init__(self._files[0], variables=variables, dims=dims, zone=zone, debug=debug, verbose=verbose,
+                         lazy=True, chunk_size=chunk_size, cache_size=cache_size)
+
+    def _load_time(self):
+        """
+        Read the times from all the files and make the combined time axis.
+
+        Provides
+        --------
+        self.time : PyFVCOM.utilities.general.PassiveStore
+            The combined time data (time, Itime, Itime2, Times, datetime and matlabtime).
+        self._file_index, self._time_index : np.ndarray
+            The file and the time index within that file for each time in self.time.
+
+        """
+
+        readers = [_TimeReader(file, dims={}) for file in self._files]
+        names = [i for i in readers[0] if all(hasattr(reader, i) for reader in readers)]
+
+        file_index = np.concatenate([np.full(len(reader.time), i) for i, reader in enumerate(readers)])
+        time_index = np.concatenate([np.arange(len(reader.time)) for reader in readers])
+        combined = {name: np.concatenate([np.atleast_1d(getattr(reader, name)) for reader in readers])
+                    for name in names}
+
+        # Sort in time, keeping the first file's copy of any duplicated times.
+        order = np.argsort(combined['time'], kind='stable')
+        unique = np.ones(len(order), dtype=bool)
+        unique[1:] = np.diff(combined['time'][order]) != 0
+        order = order[unique]
+
+        time = PassiveStore()
+        for name in names:
+            setattr(time, name, combined[name][order])
+
+        time._dims = copy.deepcopy(self._dims)
+        if 'time' in time._dims:
+            selection = time._dims.pop('time')
+            if not isinstance(selection, slice):
+                if all([isinstance(i, (datetime, str)) for i in selection]):
+                    selection = np.arange(*[time_to_index(time.datetime, i) for i in selection])
+                else:
+                    selection = np.asarray(selection)
+            order = order[selection]
+            for name in time:
+                setattr(time, name, getattr(time, name)[selection])
+
+        self.time = time
+        self._file_index = file_index[order]
+        self._time_index = time_index[order]
+
+    def load_data(self, var, dims=None):
+        """
+        Make proxies for the given variable(s) which read the data on demand.
+
+        Parameters
+        ----------
+        var : list-like, str
+            Variable(s) to load.
+        dims : dictionary, optional
+            Supply specific dimensions to load. If omitted, uses the global dimensions supplied to MultiFileReader
+            (if any).
+
+        """
+
+        if dims is not None:
+            # Reload the grid and time data with the new dimensions, so everything matches.
+            self._dims = copy.deepcopy(dims)
+            self._load_time()
+            self._dims = copy.deepcopy(self.time._dims)
+            self._update_time()
+            self._load_grid(self._files[0])
+        dims = copy.copy(self._dims)
+
+        if not hasattr(var, '__iter__') or isinstance(var, str):
+            var = [var]
+
+        for v in var:
+            if self._debug or self._noisy:
+                print(f'Loading: {v}', flush=True)
+
+            if v not in self.ds.variables:
+                raise NameError(f"Variable '{v}' not present in {self._fvcom}")
+
+            self.atts.get_attribute(v)
+
+            if 'time' in self.ds.variables[v].dimensions:
+                setattr(self.data, v, _MultiFileVariable(self._files, v, self._file_index, self._time_index,
+                                                         dims=dims, chunk_size=self._chunk_size,
+                                                         cache_size=self._cache_size))
+            else:
+                warn(f'{v} does not contain a time dimension.')
+                setattr(self.data, v, _LazyVariable(self._fvcom, v, dims=dims, chunk_size=self._chunk_size,
+                                                    cache_size=self._cache_size, dataset=self.ds))
+
+        self._update_dimensions(var)
+        self._update_time()
+
+
 class FileReaderFromDict(FileReader):
     """
     Convert an ncread dictionary into a (sparse) FileReader object. This does a passable job of impersonating a full
@@ -11,6 +11,8 @@ from __future__ import print_function
 import os
 import sys
 import copy
+import multiprocessing
+from multiprocessing import shared_memory
 
 import numpy as np
 import scipy
@@ -21,7 +23,7 @@ import utide
 from datetime import datetime
 
 from PyFVCOM.grid import find_nearest_point, unstructured_grid_depths
-from PyFVCOM.read import MFileReader
+from PyFVCOM.read import MFileReader, MultiFileReader
 from PyFVCOM.preproc import RegularReader
 from PyFVCOM.utilities.general import fix_range, warn
 from PyFVCOM.utilities.time import julian_day
@@ -41,6 +43,19 @@ except ImportError:
     warn('No MPI some functions will be disabled')
     use_MPI = False
 
+# The batched harmonic analysis reuses utide's constituent tables and nodal corrections, some of which are private to
+# utide, so disable it (rather than PyFVCOM.tide) if a different version of utide doesn't have them.
+try:
+    from utide._time_conversion import _normalize_time
+    from utide.constituent_selection import ut_cnstitsel
+    from utide.ellipse_params import ut_cs2cep
+    from utide.astronomy import ut_astron
+    from utide.harmonics import ishallow, nshallow, kshallow
+    from utide.harmonics import sat as _sat, const as _const, shallow as _shallow
+    use_utide_internals = True
+except ImportError:
+    use_utide_internals = False
+
 class HarmonicOutput(object):
     """
     Class to create a harmonic output file which creates variables for surface elevation and currents (both
@@ -461,6 +476,64 @@ class HarmonicOutput(object):
         """ Sync data to disk now. """
         self._nc.sync()
 
+    def write_harmonics(self, var, harmonics, predicted=None, layer=None, positions=slice(None)):
+        """
+        Write the harmonic analysis results for some or all of the positions of a variable.
+
+        Parameters
+        ----------
+        var : str
+            The analysed variable ('zeta', 'u', 'v', 'ua' or 'va').
+        harmonics : np.ndarray
+            The phases and amplitudes shaped [positions, 2, nconsts] (as returned by `harmonic_analysis').
+        predicted : np.ndarray, optional
+            The predicted time series shaped [positions, times].
+        layer : int, optional
+            The sigma layer for depth-resolved variables ('u' and 'v').
+        positions : slice, np.ndarray, optional
+            The positions in the file to which to write the results. Defaults to all positions.
+
+        """
+
+        prefix = self._prefix(var)
+        # The netCDF variables are time/constituents first, space last, whereas the analysis variables are space
+        # first, so transpose everything on the way out.
+        index = (slice(None), positions) if layer is None else (slice(None), layer, positions)
+        getattr(self, '{}_amp'.format(prefix))[index] = harmonics[:, 1, :].T
+        getattr(self, '{}_phase'.format(prefix))[index] = harmonics[:, 0, :].T
+        if self._predict and predicted is not None:
+            getattr(self, '{}_pred'.format(prefix))[index] = predicted.T
+
+    def write_raw(self, var, data, layer=None, positions=slice(None)):
+        """
+        Write the raw data used in the harmonic analysis of a variable.
+
+        Parameters
+        ----------
+        var : str
+            The analysed variable ('zeta', 'u', 'v', 'ua' or 'va').
+        data : np.ndarray
+            The raw data shaped [times, positions].
+        layer : int, optional
+            The sigma layer for depth-resolved variables ('u' and 'v').
+        positions : slice, np.ndarray, optional
+            The positions in the file to which to write the data. Defaults to all positions.
+
+        """
+
+        if self._dump_raw:
+            index = (slice(None), positions) if layer is None else (slice(None), layer, positions)
+            getattr(self, '{}_raw'.format(self._prefix(var)))[index] = data
+
+    @staticmethod
+    def _prefix(var):
+        """ Map a model variable name to the prefix of its output variables. """
+        prefixes = {'zeta': 'z', 'u': 'u', 'v': 'v', 'ua': 'ua', 'va': 'va'}
+        if var not in prefixes:
+            raise ValueError('Unsupported variable {}.'.format(var))
+
+        return prefixes[var]
+
 
 def add_harmonic_results(db, stationName, constituentName, phase, amplitude, speed, inferred, ident=None, noisy=False):
     """
@@ -1415,7 +1488,338 @@ def _spectral_filtering(x, window):
 
 
 
-def _analyse_harmonics(comm, times, elevations, domain_lats, constit, predict=False, noisy=False, report=10, debug=[], debug_start=None, **kwargs):
+def _harmonic_constituents(t, constit):
+    """
+    Select the given constituents with utide for the time series `t' (utide datenums).
+
+    Returns
+    -------
+    cnstit : utide.utilities.Bunch
+        The utide constituent selection (names, frequencies and indices of the non-reference constituents).
+    tref : float
+        The reference time (middle of the time series).
+    lor : float
+        The length of the time series in days.
+    order : list
+        The indices which put the utide constituents in the order of `constit'.
+
+    """
+
+    lor = np.ptp(t)
+    tref = 0.5 * (t[0] + t[-1])
+    # utide's default Rayleigh criterion is 1.
+    cnstit, _ = ut_cnstitsel(tref, 1 / (24 * lor), list(constit), None)
+    names = list(cnstit.NR.name)
+    order = [names.index(cc) for cc in constit]
+
+    return cnstit, tref, lor, order
+
+
+class _HarmonicBasis(object):
+    """
+    The utide complex exponential basis functions (utide.harmonics.ut_E) for a set of constituents on a fixed time
+    axis, with the astronomical arguments and the latitude-independent parts of the nodal corrections computed once
+    so the basis for any latitude is cheap to evaluate.
+
+    """
+
+    def __init__(self, t, lind):
+        """
+        Parameters
+        ----------
+        t : np.ndarray
+            Times (utide datenums).
+        lind : np.ndarray
+            The utide constituent indices.
+
+        """
+
+        self._lind = np.asarray(lind)
+
+        astro, _ = ut_astron(t)
+
+        # The satellite sums for the constituents (and any constituents from which the shallow water constituents
+        # are made), separated by the type of latitude dependence of the satellite amplitude ratios.
+        shallow_bases = {}
+        for i0, nshal, k in zip(ishallow, nshallow, kshallow):
+            ik = i0 + np.arange(nshal)
+            shallow_bases[k] = (_shallow.iname[ik] - 1, _shallow.coef[ik])
+        needed = set(self._lind.tolist())
+        for k in self._lind:
+            if k in shallow_bases:
+                needed.update(shallow_bases[k][0].tolist())
+        self._rows = np.asarray(sorted(needed))
+        self._shallow = {k: (np.searchsorted(self._rows, j), coef) for k, (j, coef) in shallow_bases.items()
+                         if k in self._lind}
+        self._columns = np.searchsorted(self._rows, self._lind)
+
+        uu = np.dot(_sat.deldood, astro[3:6, :]) + _sat.phcorr[:, None]
+        np.fmod(uu, 1, out=uu)
+        satellites = np.exp(1j * 2 * np.pi * uu)
+        iconst = _sat.iconst - 1
+        self._satellites = np.zeros((3, len(self._rows), len(t)), dtype=complex)
+        for row, constituent in enumerate(self._rows):
+            for factor in range(3):
+                selected = (iconst == constituent) & (_sat.ilatfac == factor)
+                if np.any(selected):
+                    self._satellites[factor, row] = np.sum(_sat.amprat[selected, None] * satellites[selected], axis=0)
+
+        # Astronomical arguments.
+        V = np.dot(_const.doodson, astro) + _const.semi[:, None]
+        with np.errstate(invalid='ignore'):
+            np.fmod(V, 1, out=V)
+        for i0, nshal, k in zip(ishallow, nshallow, kshallow):
+            ik = i0 + np.arange(nshal)
+            V[k, :] = np.sum(V[_shallow.iname[ik] - 1, :] * _shallow.coef[ik, None], axis=0)
+        self._V = V[self._lind, :].T
+
+    def __call__(self, lat):
+        """
+        Evaluate the basis functions at the given latitude.
+
+        Parameters
+        ----------
+        lat : float
+            Latitude (degrees).
+
+        Returns
+        -------
+        E : np.ndarray
+            The complex exponential basis functions [times, constituents].
+
+        """
+
+        if abs(lat) < 5:
+            lat = np.sign(lat) * 5
+        slat = np.sin(np.deg2rad(lat))
+
+        F = 1 + self._satellites[0] + \
+            0.36309 * (1.0 - 5.0 * slat**2) / slat * self._satellites[1] + \
+            2.59808 * slat * self._satellites[2]
+        U = np.angle(F) / (2 * np.pi)
+        F = np.abs(F)
+
+        F_out, U_out = F[self._columns], U[self._columns]
+        for k, (j, coef) in self._shallow.items():
+            for index in np.flatnonzero(self._lind == k):
+                F_out[index] = np.prod(F[j] ** np.abs(coef)[:, np.newaxis], axis=0)
+                U_out[index] = np.sum(U[j] * coef[:, np.newaxis], axis=0)
+
+        return F_out.T * np.exp(1j * (U_out.T + self._V) * 2 * np.pi)
+
+
+def _harmonic_design_matrix(t, tref, lor, E, trend=True):
+    """
+    Make the utide ordinary least squares design matrix from the basis functions `E' for the times `t'.
+
+    """
+
+    B = [E, E.conj(), np.ones((len(t), 1))]
+    if trend:
+        B.append(((t - tref) / lor)[:, np.newaxis])
+
+    return np.hstack(B)
+
+
+def harmonic_analysis(times, data, latitudes, constit, predict=False, trend=True, epoch=None, lat_resolution=0.1,
+                      noisy=False):
+    """
+    Ordinary least squares harmonic analysis of many time series which share a time axis (e.g. every node in a
+    model grid).
+
+    This is equivalent to calling utide.solve(method='ols') for each time series, but the design matrix is built
+    once for each group of latitudes (the only position-dependent part being the latitude-dependent nodal
+    corrections) and all the time series in the group are solved as a single multiple right hand side least
+    squares problem.
+
+    Parameters
+    ----------
+    times : np.ndarray
+        Times (as for utide.solve with `epoch') [times].
+    data : np.ndarray
+        The time series to analyse [positions, times]. Time series with missing (masked or NaN) values are analysed
+        individually with utide.solve.
+    latitudes : np.ndarray
+        Latitudes for each time series [positions]. Positions with NaN latitudes are skipped.
+    constit : list, tuple
+        List of harmonic constituents to use in the analysis.
+    predict : bool, optional
+        Set to True to also return the least squares fit to each time series. Defaults to False.
+    trend : bool, optional
+        Set to False to omit the linear trend from the model. Defaults to True.
+    epoch : str, datetime.datetime, optional
+        The epoch for numeric `times' (see utide.solve).
+    lat_resolution : float, optional
+        Positions whose latitudes round to the same multiple of `lat_resolution' (in degrees) share a design
+        matrix. The nodal corrections change very little with latitude, so the default of 0.1 degrees is
+        indistinguishable from exact latitudes for most purposes. Set to None to group only identical latitudes.
+    noisy : bool, optional
+        Set to True to enable verbose output. Defaults to False.
+
+    Returns
+    -------
+    harmonics : np.ndarray
+        The phases (degrees) and amplitudes of `constit' (in the given order) [positions, 2, nconsts], as for
+        `_analyse_harmonics'.
+    predicted : np.ndarray, optional
+        If `predict' is True, the least squares fit (all constituents, the mean and trend) [positions, times].
+
+    See Also
+    --------
+    utide.solve : the single time series equivalent.
+
+    Notes
+    -----
+    This uses utide's constituent tables and nodal corrections directly, so it is unavailable if the installed
+    version of utide doesn't provide them.
+
+    """
+
+    if not use_utide_internals:
+        raise RuntimeError('The installed version of utide lacks the constituent tables and nodal corrections needed '
+                           'by this function (harmonic_analysis). Use utide.solve instead.')
+
+    t = _normalize_time(np.asarray(times, dtype=float), epoch)
+    data = np.ma.masked_invalid(np.atleast_2d(data))
+    latitudes = np.atleast_1d(np.asarray(latitudes, dtype=float))
+    npositions = len(latitudes)
+
+    harmonics = np.full((npositions, 2, len(constit)), np.nan)
+    if predict:
+        predicted = np.full((npositions, len(t)), np.nan)
+
+    cnstit, tref, lor, order = _harmonic_constituents(t, constit)
+    nNR = len(cnstit.NR.frq)
+    basis = _HarmonicBasis(t, cnstit.NR.lind)
+
+    valid = ~np.isnan(latitudes)
+    complete = valid & ~np.ma.getmaskarray(data).any(axis=1)
+
+    # utide uses 5 degrees for the nodal corrections anywhere closer to the equator than that.
+    group_lats = np.where(np.abs(latitudes) < 5, np.sign(latitudes) * 5, latitudes)
+    if lat_resolution:
+        group_lats = np.round(group_lats / lat_resolution) * lat_resolution
+
+    groups = np.unique(group_lats[complete])
+    for counter, lat in enumerate(groups):
+        if noisy:
+            print(f'Latitude group {counter + 1} of {len(groups)}', flush=True)
+        members = np.flatnonzero(complete & (group_lats == lat))
+        B = _harmonic_design_matrix(t, tref, lor, basis(lat), trend=trend)
+        m = np.linalg.lstsq(B, data[members].filled().T, rcond=None)[0]
+        ap, am = m[:nNR], m[nNR:2 * nNR]
+        amplitude, _, _, phase = ut_cs2cep(np.real(ap + am), -np.imag(ap - am))
+        harmonics[members, 0, :] = phase[order].T
+        harmonics[members, 1, :] = amplitude[order].T
+        if predict:
+            predicted[members] = np.real(B @ m).T
+
+    # Gappy time series have their own time axes, so leave them to utide.
+    for position in np.flatnonzero(valid & ~complete):
+        if noisy:
+            print(f'Analysing gappy time series at position {position}', flush=True)
+        res = utide.solve(t=times, u=data[position], lat=latitudes[position], method='ols', constit=constit,
+                          trend=trend, epoch=epoch, verbose=False)
+        c_order = [res['name'].tolist().index(cc) for cc in constit]
+        harmonics[position, ...] = res['g'][c_order], res['A'][c_order]
+        if predict:
+            predicted[position] = utide.reconstruct(t=times, coef=res, epoch=epoch, verbose=False)['h']
+
+    if predict:
+        return harmonics, predicted
+    else:
+        return harmonics
+
+
+def harmonic_prediction(times, amplitudes, phases, latitudes, constit, mean=0, epoch=None, lat_resolution=None,
+                        chunk_size=None, noisy=False):
+    """
+    Predict the tidal time series for many positions which share a time axis (e.g. the nodes of an open boundary).
+
+    This is equivalent to calling utide.reconstruct for each position (with the nodal and Greenwich phase
+    corrections and no trend), but the astronomical arguments and the latitude-independent parts of the nodal
+    corrections are calculated once for the time axis and all the positions in a group of latitudes are predicted
+    with a single matrix product.
+
+    Parameters
+    ----------
+    times : np.ndarray
+        Times (as for utide.reconstruct with `epoch') [times].
+    amplitudes : np.ndarray
+        The amplitudes of the constituents in `constit' [positions, nconsts].
+    phases : np.ndarray
+        The phases (degrees) of the constituents in `constit' [positions, nconsts].
+    latitudes : np.ndarray
+        Latitudes for each position [positions]. Positions with NaN latitudes are returned as NaNs.
+    constit : list, tuple
+        List of harmonic constituents in `amplitudes' and `phases'.
+    mean : float, np.ndarray, optional
+        The mean to add to the predictions (either a single value or one per position). Defaults to zero.
+    epoch : str, datetime.datetime, optional
+        The epoch for numeric `times' (see utide.reconstruct).
+    lat_resolution : float, optional
+        Positions whose latitudes round to the same multiple of `lat_resolution' (in degrees) share their nodal
+        corrections. Defaults to None (only identical latitudes are grouped, which reproduces utide.reconstruct).
+    chunk_size : int, optional
+        Predict this many times at once to limit the memory used by the basis functions. Defaults to all times at
+        once.
+    noisy : bool, optional
+        Set to True to enable verbose output. Defaults to False.
+
+    Returns
+    -------
+    predicted : np.ndarray
+        The predicted time series [positions, times].
+
+    See Also
+    --------
+    utide.reconstruct : the single position equivalent.
+    harmonic_analysis : calculate the amplitudes and phases for many positions.
+
+    """
+
+    if not use_utide_internals:
+        raise RuntimeError('The installed version of utide lacks the constituent tables and nodal corrections needed '
+                           'by this function (harmonic_prediction). Use utide.reconstruct instead.')
+
+    t = _normalize_time(np.asarray(times, dtype=float), epoch)
+    amplitudes = np.atleast_2d(amplitudes)
+    phases = np.atleast_2d(phases)
+    latitudes = np.atleast_1d(np.asarray(latitudes, dtype=float))
+    npositions = len(latitudes)
+
+    names = _const.name.tolist()
+    lind = np.asarray([names.index(cc) for cc in constit])
+
+    # The complex amplitudes of each constituent. Since utide's am is the conjugate of ap, the prediction
+    # E @ ap + conj(E) @ am is just 2 * real(E @ ap).
+    coefficients = (amplitudes * np.exp(-1j * np.deg2rad(phases))).T
+
+    predicted = np.full((npositions, len(t)), np.nan)
+
+    valid = ~np.isnan(latitudes)
+    group_lats = np.where(np.abs(latitudes) < 5, np.sign(latitudes) * 5, latitudes)
+    if lat_resolution:
+        group_lats = np.round(group_lats / lat_resolution) * lat_resolution
+    groups = np.unique(group_lats[valid])
+    members = [np.flatnonzero(valid & (group_lats == lat)) for lat in groups]
+
+    if chunk_size is None:
+        chunk_size = len(t)
+    for start in range(0, len(t), chunk_size):
+        if noisy:
+            print(f'Predicting times {start + 1} to {min(start + chunk_size, len(t))} of {len(t)}', flush=True)
+        chunk = slice(start, start + chunk_size)
+        basis = _HarmonicBasis(t[chunk], lind)
+        for lat, group in zip(groups, members):
+            predicted[group, chunk] = np.real(basis(lat) @ coefficients[:, group]).T
+
+    predicted += np.reshape(mean, (-1, 1))
+
+    return predicted
+
+
+def _analyse_harmonics(comm, times, elevations, domain_lats, constit, predict=False, noisy=False, report=10, debug=[], debug_start=None, batched=False, **kwargs):
     """
     Worker function to analyse the time series [`times', `elevations'] for the locations in `latitudes'.
 
@@ -1440,6 +1844,12 @@ def _analyse_harmonics(comm, times, elevations, domain_lats, constit, predict=Fa
     debug : list, optional
         Control debugging level. Multiple strings from 'memory', 'shape' or 'values' can be specified resulting in
         debugging statements related to that aspect of the script. Defaults to no debugging output.
+    batched : bool, optional
+        Set to True to solve all the positions together with `harmonic_analysis' instead of calling utide.solve for
+        each one (ignored if kwargs other than `verbose', `epoch' or `trend' are given). Defaults to False. The
+        batched results differ slightly from utide.solve: the nodal corrections are calculated for latitudes rounded
+        to 0.1 degrees and the predictions include all the constituents (utide.reconstruct omits those with a
+        signal-to-noise ratio below 2).
 
     The remaining kwargs are the same as for :meth:`~utide.solve()`.
 
@@ -1470,6 +1880,12 @@ def _analyse_harmonics(comm, times, elevations, domain_lats, constit, predict=Fa
     if 'memory' in debug:
         print('09 : rank {}: analyse: memory usage (analyse start): {} MB'.format(rank, pid.memory_info().rss >> 20), flush=True)
 
+    if batched and not set(kwargs) - {'verbose', 'epoch', 'trend'}:
+        if noisy and rank == 0:
+            print('Analysing {} positions in a single batch'.format(len(domain_lats) * size), flush=True)
+        return harmonic_analysis(times, elevations, domain_lats, constit, predict=predict,
+                                 trend=kwargs.get('trend', True), epoch=kwargs.get('epoch'))
+
     npositions = len(domain_lats)
 
     harmonics = np.full((npositions, 2, len(constit)), np.nan)
@@ -1506,7 +1922,7 @@ def _analyse_harmonics(comm, times, elevations, domain_lats, constit, predict=Fa
             verbose = kwargs['verbose']
 
         if predict:
-            reconstructed = utide.reconstruct(t=times, coef=res, verbose=verbose)
+            reconstructed = utide.reconstruct(t=times, coef=res, epoch=kwargs.get('epoch'), verbose=verbose)
             predicted[counter, ...] = reconstructed['h']
         # Get some estimated time to completion.
         if rank == 0:
@@ -1545,7 +1961,7 @@ def _analyse_harmonics(comm, times, elevations, domain_lats, constit, predict=Fa
         return harmonics
 
 
-def fvcomOutputHarmonicsMPI(output_file, model_files, analysisvars,  dims={}, constit = ('M2', 'S2', 'N2', 'K2', 'K1', 'O1', 'P1', 'Q1', 'M4', 'MS4', 'MN4'), debug=[], report=10, dump_raw=False, predict=False, noisy=True, filetype='fvcom'):
+def fvcomOutputHarmonicsMPI(output_file, model_files, analysisvars,  dims={}, constit = ('M2', 'S2', 'N2', 'K2', 'K1', 'O1', 'P1', 'Q1', 'M4', 'MS4', 'MN4'), debug=[], report=10, dump_raw=False, predict=False, noisy=True, filetype='fvcom', layers_per_read=None, positions_per_read=None, batched=False):
     """
     Parameters
     ----------
@@ -1570,7 +1986,17 @@ def fvcomOutputHarmonicsMPI(output_file, model_files, analysisvars,  dims={}, co
     noisy : boolean
 
     filetype : string
-        Either 'fvcom' or '
+        Either 'fvcom' or 'regular'.
+    layers_per_read : int, optional
+        The number of sigma layers to read from the model files at once. Defaults to all of them, so each file is
+        read in a single pass. Set this (and/or `positions_per_read') to read the files in smaller (time, layer,
+        position) hyperslabs, which bounds the memory used by the reads at the cost of more passes through the files.
+        The root process holds `layers_per_read' whole layers at a time.
+    positions_per_read : int, optional
+        The number of positions (nodes or elements) to read from the model files at once. Defaults to all of them.
+    batched : bool, optional
+        Set to True to analyse each process's positions together with `harmonic_analysis' rather than calling
+        utide.solve for each of them (see `_analyse_harmonics' for the differences in the results). Defaults to False.
 
     """
     if not use_MPI:
@@ -1663,39 +2089,44 @@ def fvcomOutputHarmonicsMPI(output_file, model_files, analysisvars,  dims={}, co
         else:
             nz_local = 1
 
+        if rank == 0:
+            if 'node' in variable_dimensions:
+                npositions_local = nx_per_process
+                npositions_global = nx
+            elif 'nele' in variable_dimensions:
+                npositions_local = ne_per_process
+                npositions_global = ne
+            else:
+                raise ValueError('Unsupported spatial dimension for {} (dimensions = {}).'.format(var, variable_dimensions))
+
+            # Read the variable in (time, layer block, position block) hyperslabs (by default in a single pass
+            # through the files) and take the layers from that in turn.
+            blocks = _layer_series(model_files, filetype, var, dims=dims, layers_per_read=layers_per_read,
+                                   positions_per_read=positions_per_read)
+            layers = _whole_layers(blocks, npositions_global)
+
         for zlev in np.arange(0,nz_local):
             if noisy and rank == 0:
                 print('Depth {} of {}'.format(zlev + 1, nz_local), flush=True)
 
             if rank == 0:
-                current_dims = copy.copy(dims)
-                current_dims.update({'siglay': [zlev]})  # iterable for MFileReader!
-                fvcom = _load_multi_files(model_files, filetype, dims=current_dims, var=[var])
+                _, layer_data = next(layers)
 
                 # Drop the raw data into the netCDF now.
                 if dump_raw:
                     if var == 'zeta':
-                        ncout.z_raw[:] = getattr(fvcom.data, var)
+                        ncout.z_raw[:] = layer_data
                     elif var == 'u':
-                        ncout.u_raw[:, zlev, :] = getattr(fvcom.data, var)
+                        ncout.u_raw[:, zlev, :] = layer_data
                     elif var == 'v':
-                        ncout.v_raw[:, zlev, :] = getattr(fvcom.data, var)
+                        ncout.v_raw[:, zlev, :] = layer_data
                     elif var == 'ua':
-                        ncout.ua_raw[:] = getattr(fvcom.data, var)
+                        ncout.ua_raw[:] = layer_data
                     elif var == 'va':
-                        ncout.va_raw[:] = getattr(fvcom.data, var)
-
-                if 'node' in variable_dimensions:
-                    npositions_local = nx_per_process
-                    npositions_global = nx
-                elif 'nele' in variable_dimensions:
-                    npositions_local = ne_per_process
-                    npositions_global = ne
-                else:
-                    raise ValueError('Unsupported spatial dimension for {} (dimensions = {}).'.format(var, variable_dimensions))
+                        ncout.va_raw[:] = layer_data
 
                 flow = np.full((nt, npositions_local * size), np.nan)
-                flow[:, :npositions_global] = np.squeeze(getattr(fvcom.data, var))
+                flow[:, :npositions_global] = layer_data
                 # Only fill with NaNs when we're running in multiple cores.
                 if npositions_global != npositions_local:
                     flow[:, npositions_global:] = np.nan
@@ -1729,7 +2160,7 @@ def fvcomOutputHarmonicsMPI(output_file, model_files, analysisvars,  dims={}, co
                    raise ValueError('Unsupported spatial dimension for {} (dimensions = {}.'.format(var, variable_dimensions))
 
                 flow = np.full((npositions_local * size, nt), np.nan)
-                flow[:npositions_global, :] = np.squeeze(getattr(fvcom.data, var)).T
+                flow[:npositions_global, :] = layer_data.T
 
                 if 'shape' in debug:
                     print('rank {}: lats shape: {}'.format(rank, lats.shape), flush=True)
@@ -1756,6 +2187,8 @@ def fvcomOutputHarmonicsMPI(output_file, model_files, analysisvars,  dims={}, co
                            predict=predict,
                            constit=constit,
                            debug=debug,
+                           batched=batched,
+                           epoch='1858-11-17',
                            verbose=False)
             if predict:
                 harm, pred = harm
@@ -1828,6 +2261,326 @@ def fvcomOutputHarmonicsMPI(output_file, model_files, analysisvars,  dims={}, co
         print('Done.')
 
 
+def fvcomOutputHarmonics(output_file, model_files, analysisvars, dims={}, constit=('M2', 'S2', 'N2', 'K2', 'K1', 'O1', 'P1', 'Q1', 'M4', 'MS4', 'MN4'), pool_size=None, block_size=None, dump_raw=False, predict=False, noisy=True, filetype='fvcom', layers_per_read=None, positions_per_read=None):
+    """
+    Harmonic analysis of FVCOM model output using all the cores on a single machine (no MPI required).
+
+    Each variable is read from the model files (in a single pass by default) into shared memory. Blocks
+    of positions are analysed by a pool of worker processes with `harmonic_analysis', reading the time series from
+    and writing their results to shared memory (so nothing is copied between processes), and the results are written
+    to the output file as each block completes.
+
+    Parameters
+    ----------
+    output_file : str
+        Name of output file
+    model_files : list
+        List of strings of model files in sequential (time) order
+    analysisvars : list
+        List of strings of variables to analyse, admissable values are 'u', 'v', 'ua', 'va', 'zeta'
+    dims : dict
+        Dictionary of space dimensions to slice model files as required (is passed to FileReader)
+    constit : tuple-like
+        List of constituents to calculate
+    pool_size : int, optional
+        The number of worker processes. Defaults to the number of CPUs.
+    block_size : int, optional
+        The number of positions in each block sent to the workers. Defaults to enough to give each worker four
+        blocks per layer.
+    dump_raw : boolean
+        Set to True to save the raw data to the output file.
+    predict : boolean
+        Set to True to save the predicted time series to the output file.
+    noisy : boolean
+        Set to True to enable verbose output.
+    filetype : string
+        Either 'fvcom' or 'regular'.
+    layers_per_read : int, optional
+        The number of sigma layers to read from the model files at once. Defaults to all of them, so each file is
+        read in a single pass. Set this (and/or `positions_per_read') to read the files in smaller (time, layer,
+        position) hyperslabs, which bounds the memory used by the reads (in addition to the shared memory for the
+        whole variable) at the cost of more passes through the files.
+    positions_per_read : int, optional
+        The number of positions (nodes or elements) to read from the model files at once. Defaults to all of them.
+
+    See Also
+    --------
+    fvcomOutputHarmonicsMPI : the same analysis using MPI.
+
+    """
+
+    if pool_size is None:
+        pool_size = multiprocessing.cpu_count()
+
+    # Fixed width constituent names for netCDF output.
+    cnames = [list(j) for j in ['{:4s}'.format(i) for i in constit]]
+
+    fvcom = _load_multi_files(model_files, filetype, dims=dims)
+    nz = 0
+    if any(s in analysisvars for s in ('u', 'v')):
+        nz = fvcom.dims.siglay
+
+    # utide needs the epoch for numeric times.
+    times = date2num(fvcom.time.datetime, units='days since 1858-11-17 00:00:00')
+    epoch = '1858-11-17'
+
+    ncout = HarmonicOutput(output_file, fvcom, consts=cnames, files=model_files, predict=predict, dump_raw=dump_raw)
+
+    for var in analysisvars:
+        if noisy:
+            print('Processing {}'.format(var), flush=True)
+
+        variable_dimensions = fvcom.ds.variables[var].dimensions
+        if 'node' in variable_dimensions:
+            latitudes = fvcom.grid.lat
+        elif 'nele' in variable_dimensions:
+            latitudes = fvcom.grid.latc
+        else:
+            raise ValueError('Unsupported spatial dimension for {} (dimensions = {}).'.format(var, variable_dimensions))
+        layered = 'siglay' in variable_dimensions
+        nz_local = nz if layered else 1
+
+        with _SharedHarmonicAnalysis(times, latitudes, constit, nz_local, predict=predict, epoch=epoch) as analysis:
+            # Read the variable (in a single pass through the files unless we've been asked for smaller hyperslabs)
+            # straight into shared memory.
+            for zlev, positions, block in _layer_series(model_files, filetype, var, dims=dims,
+                                                        layers_per_read=layers_per_read,
+                                                        positions_per_read=positions_per_read):
+                ncout.write_raw(var, block, layer=zlev if layered else None, positions=positions)
+                analysis.data[zlev, positions] = block.T
+
+            for zlev, positions, harmonics, predicted in analysis.run(pool_size=pool_size, block_size=block_size,
+                                                                      noisy=noisy):
+                ncout.write_harmonics(var, harmonics, predicted, layer=zlev if layered else None,
+                                      positions=positions)
+
+        ncout.sync()
+
+    ncout.close()
+
+    if noisy:
+        print('Done.')
+
+
+class _SharedHarmonicAnalysis(object):
+    """
+    Shared memory buffers for the time series and results of a harmonic analysis of many positions in parallel.
+
+    Fill `data' [layers, positions, times] and then iterate over `run()' to analyse blocks of positions in a pool of
+    worker processes which attach to the same buffers.
+
+    """
+
+    def __init__(self, times, latitudes, constit, nlayers=1, predict=False, epoch=None):
+        """
+        Parameters
+        ----------
+        times : np.ndarray
+            Times for the analysis (as for `harmonic_analysis' with `epoch').
+        latitudes : np.ndarray
+            Latitudes of the positions [positions].
+        constit : list, tuple
+            List of harmonic constituents to use in the analysis.
+        nlayers : int, optional
+            The number of layers of positions. Defaults to 1.
+        predict : bool, optional
+            Set to True to also calculate the predicted time series. Defaults to False.
+        epoch : str, datetime.datetime, optional
+            The epoch for numeric `times' (see utide.solve).
+
+        """
+
+        self._times = np.asarray(times, dtype=float)
+        self._epoch = epoch
+        self._latitudes = np.asarray(latitudes, dtype=float)
+        self._constit = constit
+        self._predict = predict
+        self._nlayers = nlayers
+        npositions, ntimes = len(self._latitudes), len(self._times)
+
+        self._shapes = {'data': (nlayers, npositions, ntimes), 'harmonics': (nlayers, npositions, 2, len(constit))}
+        if predict:
+            self._shapes['predicted'] = (nlayers, npositions, ntimes)
+        self._memory = {}
+        for name, shape in self._shapes.items():
+            # Shared memory blocks can't be empty.
+            self._memory[name] = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+            setattr(self, name, np.ndarray(shape, dtype=float, buffer=self._memory[name].buf))
+        self.data[:] = np.nan
+        self.harmonics[:] = np.nan
+
+    def run(self, pool_size=None, block_size=None, noisy=False):
+        """
+        Analyse the time series in `data' in blocks of positions.
+
+        Parameters
+        ----------
+        pool_size : int, optional
+            The number of worker processes. Defaults to the number of CPUs.
+        block_size : int, optional
+            The number of positions in each block. Defaults to enough to give each worker four blocks per layer.
+        noisy : bool, optional
+            Set to True to enable verbose output. Defaults to False.
+
+        Yields
+        ------
+        layer : int
+            The layer of the block.
+        positions : slice
+            The positions in the block.
+        harmonics : np.ndarray
+            The phases and amplitudes for the block [positions, 2, nconsts].
+        predicted : np.ndarray, None
+            The predicted time series for the block [positions, times] (None if `predict' was not set).
+
+        """
+
+        if pool_size is None:
+            pool_size = multiprocessing.cpu_count()
+        npositions = len(self._latitudes)
+        if block_size is None:
+            block_size = int(np.ceil(npositions / (4 * pool_size)))
+        block_size = max(block_size, 1)
+
+        blocks = [(layer, start, min(start + block_size, npositions)) for layer in range(self._nlayers)
+                  for start in range(0, npositions, block_size)]
+        buffers = {name: (self._memory[name].name, shape) for name, shape in self._shapes.items()}
+        initargs = (buffers, self._times, self._latitudes, self._constit, self._predict, self._epoch)
+        with multiprocessing.Pool(pool_size, initializer=_init_harmonics_worker, initargs=initargs) as pool:
+            for counter, (layer, start, stop) in enumerate(pool.imap_unordered(_analyse_harmonics_block, blocks)):
+                if noisy:
+                    print('Block {} of {}'.format(counter + 1, len(blocks)), flush=True)
+                # Return copies so nothing outside this object holds on to the shared memory.
+                positions = slice(start, stop)
+                predicted = self.predicted[layer, positions].copy() if self._predict else None
+                yield layer, positions, self.harmonics[layer, positions].copy(), predicted
+
+    def close(self):
+        """ Release the shared memory. """
+        for name, memory in self._memory.items():
+            # Drop our views before closing the memory they point to.
+            setattr(self, name, None)
+            memory.close()
+            memory.unlink()
+        self._memory = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# The shared memory and analysis settings for each worker process.
+_harmonics_worker = {}
+
+
+def _init_harmonics_worker(buffers, times, latitudes, constit, predict, epoch):
+    """ Attach a worker process to the shared memory of a `_SharedHarmonicAnalysis'. """
+    _harmonics_worker.clear()
+    _harmonics_worker.update(times=times, latitudes=latitudes, constit=constit, predict=predict, epoch=epoch,
+                             memory=[])
+    for name, (memory_name, shape) in buffers.items():
+        memory = shared_memory.SharedMemory(name=memory_name)
+        _harmonics_worker['memory'].append(memory)
+        _harmonics_worker[name] = np.ndarray(shape, dtype=float, buffer=memory.buf)
+
+
+def _analyse_harmonics_block(block):
+    """ Analyse a (layer, start, stop) block of positions and write the results to shared memory. """
+    layer, start, stop = block
+    worker = _harmonics_worker
+    result = harmonic_analysis(worker['times'], worker['data'][layer, start:stop], worker['latitudes'][start:stop],
+                               worker['constit'], predict=worker['predict'], epoch=worker['epoch'])
+    if worker['predict']:
+        result, worker['predicted'][layer, start:stop] = result
+    worker['harmonics'][layer, start:stop] = result
+
+    return block
+
+
+def _layer_series(model_files, filetype, var, dims={}, layers_per_read=None, positions_per_read=None):
+    """
+    Read a variable from the model files and yield the time series for each of its layers in turn.
+
+    FVCOM files are read with PyFVCOM.read.MultiFileReader in (time, layer, position) hyperslabs of `layers_per_read'
+    layers and `positions_per_read' positions, so each file is read once per hyperslab rather than once per layer
+    (and, by default, only once). Other file types are loaded in their entirety.
+
+    Parameters
+    ----------
+    model_files : list
+        List of model files in sequential (time) order.
+    filetype : str
+        Either 'fvcom' or 'regular'.
+    var : str
+        The variable to read.
+    dims : dict, optional
+        Dictionary of space dimensions to slice the model files.
+    layers_per_read : int, optional
+        The number of layers to read at once. Defaults to all of them.
+    positions_per_read : int, optional
+        The number of positions to read at once. Defaults to all of them.
+
+    Yields
+    ------
+    layer : int
+        The layer index (always 0 for variables without a vertical dimension).
+    positions : slice
+        The positions in this block.
+    data : np.ndarray
+        The time series for the layer at those positions [times, positions], with missing values as NaNs.
+
+    """
+
+    if filetype == 'fvcom':
+        reader = MultiFileReader(model_files, variables=[var], dims=dims)
+        for layer, positions, data in getattr(reader.data, var).iter_layers(layers_per_read=layers_per_read,
+                                                                            positions_per_read=positions_per_read):
+            yield layer, positions, np.ma.filled(data.astype(float), np.nan)
+    else:
+        data = getattr(_load_multi_files(model_files, filetype, dims=dims, var=var).data, var)
+        data = np.ma.filled(np.ma.asarray(data, dtype=float), np.nan)
+        if data.ndim == 2:
+            data = data[:, np.newaxis, :]
+        for layer in range(data.shape[1]):
+            yield layer, slice(0, data.shape[-1]), data[:, layer, :]
+
+
+def _whole_layers(blocks, npositions):
+    """
+    Assemble the blocks from `_layer_series' into complete layers.
+
+    Only the layers which have been started but not finished are held in memory (at most `layers_per_read' of them).
+
+    Parameters
+    ----------
+    blocks : generator
+        The blocks from `_layer_series'.
+    npositions : int
+        The number of positions in each layer.
+
+    Yields
+    ------
+    layer : int
+        The layer index.
+    data : np.ndarray
+        The time series for all the positions in the layer [times, positions].
+
+    """
+
+    partial, filled = {}, {}
+    for layer, positions, data in blocks:
+        if layer not in partial:
+            partial[layer] = np.full((data.shape[0], npositions), np.nan)
+            filled[layer] = 0
+        partial[layer][:, positions] = data
+        filled[layer] += data.shape[-1]
+        if filled[layer] == npositions:
+            del filled[layer]
+            yield layer, partial.pop(layer)
+
+
 def _load_multi_files(file_list, filetype, dims=None, var=None):
 
     if filetype == 'fvcom':
@@ -0,0 +1,110 @@
+"""
+Compare the edge-sorting implementation of PyFVCOM.grid.grid_metrics with the original loop-based translation of
+FVCOM's tge.F for a range of mesh sizes.
+
+Run as:
+
+    python benchmarks/grid_metrics.py [number of nodes ...]
+
+The loop implementation is very slow, so it is skipped for meshes larger than `--loop-limit' elements (default
+50000) and only the vectorised timing is reported.
+
+"""
+
+import argparse
+import time
+
+import numpy as np
+from scipy.spatial import Delaunay
+
+from PyFVCOM.grid import grid_metrics, get_attached_unique_nodes
+
+
+def grid_metrics_loop(tri):
+    """
+    The original loop-based implementation of PyFVCOM.grid.grid_metrics. The only change is that the `nbve' array is
+    sized for the most connected node rather than fixed at 10 columns so it works on arbitrary meshes.
+
+    """
+
+    m = len(np.unique(tri.ravel()))
+
+    isonb = np.zeros(m).astype(bool)
+    ntve = np.zeros(m, dtype=int)
+    nbe = np.ma.array(np.zeros(tri.shape, dtype=int), mask=True)
+    nbve = np.ma.array(np.zeros((m, max(10, np.bincount(tri.ravel()).max())), dtype=int), mask=True)
+    for i, (n1, n2, n3) in enumerate(tri):
+        nbve[tri[i, 0], ntve[n1]] = i
+        nbve[tri[i, 1], ntve[n2]] = i
+        nbve[tri[i, 2], ntve[n3]] = i
+        ntve[n1] += 1
+        ntve[n2] += 1
+        ntve[n3] += 1
+
+    for i, (n1, n2, n3) in enumerate(tri):
+        for j1 in range(ntve[n1]):
+            for j2 in range(ntve[n2]):
+                if nbve[n1, j1] == nbve[n2, j2] and nbve[n1, j1] != i:
+                    nbe[i, 2] = nbve[n1, j1]
+        for j2 in range(ntve[n2]):
+            for j3 in range(ntve[n3]):
+                if nbve[n2, j2] == nbve[n3, j3] and nbve[n2, j2] != i:
+                    nbe[i, 0] = nbve[n2, j2]
+        for j1 in range(ntve[n1]):
+            for j3 in range(ntve[n3]):
+                if nbve[n1, j1] == nbve[n3, j3] and nbve[n1, j1] != i:
+                    nbe[i, 1] = nbve[n3, j3]
+
+    isbce = np.max(nbe.mask, axis=1)
+
+    boundary_element_node_ids = np.unique(tri[isbce, :]).ravel()
+    boundary_nodes = []
+    for i in boundary_element_node_ids:
+        current_nodes = get_attached_unique_nodes(i, tri)
+        if np.any(current_nodes):
+            boundary_nodes += current_nodes.tolist()
+    boundary_nodes = np.unique(boundary_nodes)
+    isonb[boundary_nodes] = True
+
+    return ntve, nbve, nbe, isbce, isonb
+
+
+def make_mesh(nodes, seed=0):
+    """ Make a Delaunay triangulation of a jittered regular grid with approximately the given number of nodes. """
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(nodes)))
+    x, y = np.meshgrid(np.arange(side), np.arange(side))
+    points = np.column_stack((x.ravel(), y.ravel())) + rng.uniform(-0.25, 0.25, (side**2, 2))
+
+    return Delaunay(points).simplices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('nodes', nargs='*', type=int, default=[1000, 10000, 50000, 250000, 500000])
+    parser.add_argument('--loop-limit', type=int, default=50000,
+                        help='Skip the loop implementation for meshes with more elements than this.')
+    args = parser.parse_args()
+
+    print(f'{"nodes":>10} {"elements":>10} {"loop (s)":>10} {"vector (s)":>10} {"speedup":>8} identical')
+    for nodes in args.nodes:
+        tri = make_mesh(nodes)
+
+        tic = time.perf_counter()
+        vectorised = grid_metrics(tri)
+        vector_time = time.perf_counter() - tic
+
+        if len(tri) <= args.loop_limit:
+            tic = time.perf_counter()
+            loop = grid_metrics_loop(tri)
+            loop_time = time.perf_counter() - tic
+            identical = all(np.array_equal(np.ma.filled(a, -1), np.ma.filled(b[..., :np.shape(a)[-1]], -1))
+                            for a, b in zip(loop, vectorised))
+            print(f'{nodes:>10} {len(tri):>10} {loop_time:>10.3f} {vector_time:>10.3f} '
+                  f'{loop_time / vector_time:>8.0f} {identical}')
+        else:
+            print(f'{nodes:>10} {len(tri):>10} {"-":>10} {vector_time:>10.3f} {"-":>8} -')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare PyFVCOM.tide.harmonic_analysis with calling utide.solve for each position for a range of numbers of
+positions sharing a single time axis (as for every node in a model grid).
+
+Run as:
+
+    python benchmarks/harmonic_analysis.py [number of positions ...]
+
+The utide loop is slow, so it is skipped for more than `--loop-limit' positions (default 2000) and only the batched
+timing is reported.
+
+"""
+
+import argparse
+import time
+
+import numpy as np
+import utide
+
+from PyFVCOM.tide import harmonic_analysis
+
+
+def utide_loop(times, data, latitudes, constit):
+    """ The per-position analysis as done by PyFVCOM.tide._analyse_harmonics. """
+    harmonics = np.full((len(latitudes), 2, len(constit)), np.nan)
+    for counter, (timeseries, lat) in enumerate(zip(data, latitudes)):
+        res = utide.solve(t=times, u=timeseries, lat=lat, method='ols', constit=constit, epoch='python',
+                          verbose=False)
+        c_order = [res['name'].tolist().index(cc) for cc in constit]
+        harmonics[counter, ...] = res['g'][c_order], res['A'][c_order]
+
+    return harmonics
+
+
+def make_data(positions, days, seed=0):
+    """ Make hourly time series of a few tidal constituents with random amplitudes, phases and latitudes. """
+    rng = np.random.default_rng(seed)
+    times = np.arange(0, days, 1 / 24) + 730000
+    periods = np.array([12.4206012, 12, 12.65834751, 23.93447213, 25.81933871, 6.210300601]) / 24
+    amplitudes = rng.uniform(0.1, 2, (positions, len(periods)))
+    phases = rng.uniform(0, 2 * np.pi, (positions, len(periods)))
+    data = np.sum(amplitudes[..., np.newaxis] * np.cos(2 * np.pi * times / periods[:, np.newaxis] +
+                                                       phases[..., np.newaxis]), axis=1)
+    data += rng.normal(0, 0.05, data.shape)
+    latitudes = rng.uniform(48, 52, positions)
+
+    return times, data, latitudes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('positions', nargs='*', type=int, default=[100, 1000, 10000, 100000])
+    parser.add_argument('--days', type=float, default=30, help='Length of the hourly time series in days.')
+    parser.add_argument('--loop-limit', type=int, default=2000,
+                        help='Skip the utide loop for more positions than this.')
+    args = parser.parse_args()
+
+    constit = ['M2', 'S2', 'N2', 'K1', 'O1', 'M4']
+
+    print(f'{"positions":>10} {"loop (s)":>10} {"batch (s)":>10} {"speedup":>8} {"max amp diff":>12}')
+    for positions in args.positions:
+        times, data, latitudes = make_data(positions, args.days)
+
+        tic = time.perf_counter()
+        batched = harmonic_analysis(times, data, latitudes, constit, epoch='python')
+        batch_time = time.perf_counter() - tic
+
+        if positions <= args.loop_limit:
+            tic = time.perf_counter()
+            loop = utide_loop(times, data, latitudes, constit)
+            loop_time = time.perf_counter() - tic
+            difference = np.abs(loop[:, 1] - batched[:, 1]).max()
+            print(f'{positions:>10} {loop_time:>10.3f} {batch_time:>10.3f} {loop_time / batch_time:>8.0f} '
+                  f'{difference:>12.2e}')
+        else:
+            print(f'{positions:>10} {"-":>10} {batch_time:>10.3f} {"-":>8} {"-":>12}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare the KD-tree implementation of PyFVCOM.grid.mesh2grid with the original brute force search over every mesh
+node for each sample for a range of regular grid sizes.
+
+Run as:
+
+    python benchmarks/mesh2grid.py [samples along each axis ...]
+
+The brute force search is slow, so it is skipped for more than `--loop-limit' samples (default 40000) and only the
+KD-tree timings (nearest and linear) are reported.
+
+"""
+
+import argparse
+import time
+
+import numpy as np
+from scipy.spatial import Delaunay
+
+from PyFVCOM.grid import mesh2grid
+
+
+def mesh2grid_loop(mesh_x, mesh_y, mesh_z, nx, ny, thresh=np.inf):
+    """ The original brute force implementation of PyFVCOM.grid.mesh2grid for regularly sampled grids. """
+    xx = np.linspace(mesh_x.min(), mesh_x.max(), nx)
+    yy = np.linspace(mesh_y.min(), mesh_y.max(), ny)
+    zz = np.empty((nx, ny) + mesh_z.shape[1:]) * np.nan
+    for xi, xpos in enumerate(xx):
+        for yi, ypos in enumerate(yy):
+            dist = np.sqrt((mesh_x - xpos)**2 + (mesh_y - ypos)**2)
+            if dist.min() < thresh:
+                zz[xi, yi, ...] = mesh_z[dist.argmin(), ...]
+
+    return xx, yy, zz
+
+
+def make_mesh(nodes, seed=0):
+    """ Make a Delaunay triangulation of a jittered regular grid with approximately the given number of nodes. """
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(nodes)))
+    x, y = np.meshgrid(np.arange(side), np.arange(side))
+    points = np.column_stack((x.ravel(), y.ravel())) + rng.uniform(-0.25, 0.25, (side**2, 2))
+
+    return points[:, 0], points[:, 1], Delaunay(points).simplices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('samples', nargs='*', type=int, default=[50, 100, 200, 500, 1000])
+    parser.add_argument('--nodes', type=int, default=100000, help='Approximate number of mesh nodes.')
+    parser.add_argument('--loop-limit', type=int, default=40000,
+                        help='Skip the brute force search for more samples than this.')
+    args = parser.parse_args()
+
+    x, y, triangles = make_mesh(args.nodes)
+    z = np.sin(x / 10) * np.cos(y / 10)
+
+    print(f'{"samples":>10} {"loop (s)":>10} {"nearest (s)":>11} {"linear (s)":>10} {"speedup":>8} identical')
+    for side in args.samples:
+        tic = time.perf_counter()
+        _, _, nearest = mesh2grid(x, y, z, side, side)
+        nearest_time = time.perf_counter() - tic
+
+        tic = time.perf_counter()
+        mesh2grid(x, y, z, side, side, method='linear', triangles=triangles)
+        linear_time = time.perf_counter() - tic
+
+        if side**2 <= args.loop_limit:
+            tic = time.perf_counter()
+            _, _, loop = mesh2grid_loop(x, y, z, side, side)
+            loop_time = time.perf_counter() - tic
+            identical = np.array_equal(loop, nearest, equal_nan=True)
+            print(f'{side**2:>10} {loop_time:>10.3f} {nearest_time:>11.3f} {linear_time:>10.3f} '
+                  f'{loop_time / nearest_time:>8.0f} {identical}')
+        else:
+            print(f'{side**2:>10} {"-":>10} {nearest_time:>11.3f} {linear_time:>10.3f} {"-":>8} -')
+
+
+if __name__ == '__main__':
+    main()
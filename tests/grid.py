@@ -1,7 +1,9 @@
 from __future__ import division
 
+import tempfile
 import numpy.testing as test
 import numpy as np
+import scipy.spatial
 
 from unittest import TestCase
 
@@ -40,6 +42,14 @@ class GridToolsTest(TestCase):
         test.assert_equal(y, test_y)
         test.assert_equal(dist, test_dist)
 
+    def test_find_nearest_point_kdtree(self):
+        target_x, target_y = np.array([0.5, 1.9]), np.array([0.75, 0.1])
+        kdtree = scipy.spatial.cKDTree(np.column_stack((self.x, self.y)))
+        _, _, test_dist, test_index = find_nearest_point(self.x, self.y, target_x, target_y)
+        _, _, dist, index = find_nearest_point(self.x, self.y, target_x, target_y, kdtree=kdtree)
+        test.assert_equal(index, test_index)
+        test.assert_equal(dist, test_dist)
+
     def test_find_nearest_point_multiple(self):
         target_x, target_y = [0.5, 0.2], [0.75, 0.2]
         test_x, test_y, test_dist, test_index = [0, 0], [1, 0], [np.min(np.hypot(self.x - i[0], self.y - i[1])) for i in zip(target_x, target_y)], [2, 0]
@@ -82,6 +92,18 @@ class GridToolsTest(TestCase):
         test.assert_equal(y, test_y)
         test.assert_equal(z, test_z)
 
+    def test_mesh2grid_linear(self):
+        nx, ny = np.meshgrid(np.array([0.25, 1.5, 3]), np.array([0.5, 1.75]))
+        x, y, z = mesh2grid(self.x, self.y, self.z, nx, ny, method='linear', triangles=self.tri)
+        known = LinearTriInterpolator(Triangulation(self.x, self.y, self.tri), self.z)(nx, ny).filled(np.nan)
+        test.assert_almost_equal(z, known)
+        # Trailing dimensions are carried through and the threshold still masks distant samples.
+        _, _, z = mesh2grid(self.x, self.y, np.column_stack((self.z, self.z * 2)), nx, ny, thresh=0.6,
+                            method='linear', triangles=self.tri)
+        test.assert_equal(z.shape, (2, 3, 2))
+        test.assert_almost_equal(z[0, 0], known[0, 0] * np.array([1, 2]))
+        test.assert_equal(np.isnan(z[..., 0]), [[False, True, True], [False, False, True]])
+
     def test_line_sample(self):
         start, end = np.array((0, 0.1)), np.array((0.7, 2.1))
         test_idx = (0, 2, 3)
@@ -189,6 +211,27 @@ class GridToolsTest(TestCase):
         boundary_nodes = get_attached_unique_nodes(node, self.tri)
         test.assert_equal(boundary_nodes, test_boundary_nodes)
 
+    def test_mesh_topology(self):
+        topology = MeshTopology(self.tri)
+        test.assert_equal(topology.element_counts, [1, 4, 4, 4, 1, 4, 1, 4, 1])
+        test.assert_equal(topology.boundary, [True, True, True, False, True, True, True, True, True])
+        test.assert_equal(topology.elements([5, 0]), [0, 2, 3, 6, 7])
+        test.assert_equal(topology.neighbours(2), [0, 1, 3, 4, 5])
+        test.assert_equal(topology.neighbours([0, 2]), [1, 3, 4, 5])
+        test.assert_equal(topology.boundary_neighbours(2), [0, 4])
+        test.assert_equal(topology.boundary_neighbours(0), [0, 1, 2])
+        test.assert_equal(topology.is_bad([0, 1, 8]), [True, False, True])
+        test.assert_equal(topology.expand(0, 0), [True] + [False] * 8)
+        test.assert_equal(topology.expand(0, 1), [True, True, True, False, False, False, False, False, False])
+        test.assert_equal(topology.expand(0, 2), [True] * 8 + [False])
+        # The delegating functions should match their searches of the triangulation.
+        for node in range(len(self.x)):
+            test.assert_equal(find_connected_nodes(node, self.tri, topology=topology),
+                              find_connected_nodes(node, self.tri))
+            test.assert_equal(get_attached_unique_nodes(node, self.tri, topology=topology),
+                              get_attached_unique_nodes(node, self.tri))
+            test.assert_equal(find_bad_node(self.tri, node, topology=topology), find_bad_node(self.tri, node))
+
     def test_grid_metrics(self):
         test_ntve = [1, 4, 4, 4, 1, 4, 1, 4, 1]
         test_nbve = np.ma.empty((len(self.x), 10), dtype=int)
@@ -246,6 +289,14 @@ class GridToolsTest(TestCase):
         test.assert_almost_equal(node_areas, test_node_areas)
         test.assert_almost_equal(element_areas, test_element_areas)
 
+    def test_get_control_volumes_points(self):
+        node_areas, node_points = control_volumes(self.x, self.y, self.tri, element_control=False, return_points=True)
+        for node in range(len(self.x)):
+            test_node_area, test_node_points = node_control_area(node, self.x, self.y, self.xc, self.yc, self.tri,
+                                                                 return_points=True)
+            test.assert_almost_equal(node_areas[node], test_node_area)
+            test.assert_almost_equal(node_points[node], test_node_points)
+
     def test_get_node_control_area(self):
         test_node_area = 2 / 3
         node = 1
@@ -285,6 +336,64 @@ class GridToolsTest(TestCase):
         moved_elements = elems2nodes(nodes2elems(self.z, self.tri), self.tri)
         test.assert_almost_equal(moved_elements, test_elements)
 
+    def test_elems2nodes_multiple_dimensions(self):
+        elements = nodes2elems(self.z, self.tri)
+        stacked = np.tile(elements, (3, 2, 1)) * np.arange(1, 4)[:, np.newaxis, np.newaxis]
+        test_nodes = elems2nodes(elements, self.tri)[np.newaxis, np.newaxis, :] * np.arange(1, 4)[:, np.newaxis, np.newaxis]
+        moved_nodes = elems2nodes(stacked, self.tri)
+        test.assert_equal(moved_nodes.shape, (3, 2, len(self.x)))
+        test.assert_almost_equal(moved_nodes, np.repeat(test_nodes, 2, axis=1))
+
+    def test_elems2nodes_weighted(self):
+        elements = nodes2elems(self.z, self.tri)
+        weights = np.arange(1, len(self.tri) + 1)
+        test_nodes = np.zeros(len(self.x))
+        total = np.zeros(len(self.x))
+        for element, nodes in enumerate(self.tri):
+            test_nodes[nodes] += elements[element] * weights[element]
+            total[nodes] += weights[element]
+        test_nodes /= total
+        operator = elems2nodes_operator(self.tri, weights=weights)
+        test.assert_almost_equal(elems2nodes(elements, self.tri, weights=weights), test_nodes)
+        test.assert_almost_equal(elems2nodes(elements, None, operator=operator), test_nodes)
+
+    def test_nodes2elems_masked(self):
+        nodes = np.ma.masked_array(self.z, mask=self.z == 3)
+        elements = nodes2elems(nodes, self.tri)
+        test_elements = np.ma.array([np.mean(nodes[i].compressed()) if nodes[i].count() else np.nan for i in self.tri],
+                                    mask=[nodes[i].count() == 0 for i in self.tri])
+        test.assert_almost_equal(elements.filled(-1), test_elements.filled(-1))
+        test.assert_equal(elements.mask, test_elements.mask)
+
+    def test_grid_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = GridCache(cache_dir)
+            key = cache.key(self.tri, self.x, self.y)
+            test.assert_equal(cache.get(key, 'areas'), None)
+            test.assert_equal(cache.misses, 1)
+
+            areas = get_area(np.asarray((self.x[self.tri[:, 0]], self.y[self.tri[:, 0]])).T,
+                             np.asarray((self.x[self.tri[:, 1]], self.y[self.tri[:, 1]])).T,
+                             np.asarray((self.x[self.tri[:, 2]], self.y[self.tri[:, 2]])).T)
+            cache.put(key, 'areas', areas=areas)
+            test.assert_equal(cache.get(key, 'areas')['areas'], areas)
+            test.assert_equal(cache.hits, 1)
+
+            # A different grid should have a different key.
+            self.assertNotEqual(cache.key(self.tri, self.x + 1, self.y), key)
+
+            cache.invalidate(key)
+            test.assert_equal(cache.get(key, 'areas'), None)
+            test.assert_equal((cache.hits, cache.misses), (1, 2))
+
+            # Invalidating a name should only remove that name, not others which end with it.
+            for name in ('elements', 'spherical_elements', 'cartesian_elements'):
+                cache.put(key, name, areas=areas)
+            cache.invalidate(name='elements')
+            test.assert_equal(cache.get(key, 'elements'), None)
+            test.assert_equal(cache.get(key, 'spherical_elements')['areas'], areas)
+            test.assert_equal(cache.get(key, 'cartesian_elements')['areas'], areas)
+
     def test_vincenty_distance(self):
         """
         Standard tests as defined in https://github.com/maurycyp/vincenty
@@ -315,6 +424,23 @@ class GridToolsTest(TestCase):
         test.assert_equal(known_good, result)
         test.assert_equal(known_good_miles, result_miles)
 
+    def test_vincenty_distance_arrays(self):
+        starts = np.array(((0.0, 0.0), (0.0, 0.0), (42.3541165, -71.0693514)))
+        ends = np.array(((0.0, 1.0), (0.5, 179.5), (40.7791472, -73.9680804)))
+        test_dists = [vincenty_distance(start, end) for start, end in zip(starts, ends)]
+        dists = vincenty_distance(starts.T, ends.T)
+        test.assert_equal(dists, test_dists)
+
+    def test_find_nearest_point_geodesic(self):
+        target_lon, target_lat = np.array([0.05, 0.1]), np.array([0.04, 0.09])
+        test_dists = haversine_distance((self.lonc[:, np.newaxis], self.latc[:, np.newaxis]), (target_lon, target_lat))
+        _, _, dist, index = find_nearest_point_geodesic(self.lonc, self.latc, target_lon, target_lat)
+        test.assert_equal(index, np.argmin(test_dists, axis=0))
+        test.assert_almost_equal(dist, np.min(test_dists, axis=0))
+        _, _, _, index = find_nearest_point_geodesic(self.lonc, self.latc, target_lon, target_lat, vincenty=True,
+                                                     maxDistance=0)
+        test.assert_equal(index, [np.nan, np.nan])
+
     def test_shape_coefficients(self):
         known_a1u = np.array([[np.nan, -0.5, -0.5, np.nan, 0.5, np.nan, 0.5, np.nan],
                               [np.nan, -0.25, 1.25, np.nan, 0.25, np.nan, 0.5, np.nan],
@@ -347,3 +473,66 @@ class GridToolsTest(TestCase):
         out_triangle = isintriangle(self.x[self.tri[0, :]], self.y[self.tri[0, :]], test_point_x_out, test_point_y_out)
         test.assert_equal(in_triangle, True)
         test.assert_equal(out_triangle, False)
+
+    def test_interpolate_node_barycentric(self):
+        positions = np.array([[0.25, 0.5], [1.5, 1.75], [0.5, 0.5], [3, 0.5]])
+        known = LinearTriInterpolator(Triangulation(self.x, self.y, self.tri), self.z)(*positions.T).filled(np.nan)
+        interped = interpolate_node_barycentric(positions, self.z, self.x, self.y, self.tri)
+        test.assert_almost_equal(interped, known)
+        # Trailing dimensions follow the positions.
+        interped = interpolate_node_barycentric(positions, np.column_stack((self.z, -self.z)), self.x, self.y, self.tri)
+        test.assert_almost_equal(interped, np.column_stack((known, -known)))
+
+    def test_regular_regridder(self):
+        lon, lat = np.linspace(-5, -3, 21), np.linspace(49, 51, 11)
+        depths = np.linspace(0, 50, 6)
+        coarse_depth = np.tile(depths[:, np.newaxis, np.newaxis], (1, len(lat), len(lon)))
+        rng = np.random.RandomState(0)
+        x, y = rng.uniform(-4.9, -3.1, 15), rng.uniform(49.1, 50.9, 15)
+        layer_depth = np.tile(np.linspace(5, 45, 4), (15, 1))
+        data = rng.rand(len(depths), len(lat), len(lon))
+        regridder = RegularRegridder(lon, lat, x, y, layer_depth, coarse_layer_depth=coarse_depth)
+
+        # The horizontal interpolation matches a LinearNDInterpolator on the same grid.
+        coarse_lon, coarse_lat = np.meshgrid(lon, lat)
+        interpolator = LinearNDInterpolator((coarse_lon.ravel(), coarse_lat.ravel()), data[2].ravel())
+        test.assert_almost_equal(regridder.horizontal(data[2]), interpolator((x, y)))
+
+        # The vertical interpolation is linear in depth once the coarse water column is squeezed into ours.
+        profiles = regridder.horizontal(data)
+        squashed = np.linspace(5, 45, len(depths))
+        known = np.asarray([np.interp(layer_depth[i], squashed, profiles[i]) for i in range(len(x))])
+        test.assert_almost_equal(regridder.interpolate(data), known)
+        self.assertTrue(regridder.matches(lon, lat, x, y, layer_depth, coarse_depth))
+        self.assertFalse(regridder.matches(lon, lat, x, y, layer_depth * 2, coarse_depth))
+
+        # Gaps (positions next to missing data or outside the grid) are filled with the inverse distance weighted
+        # mean of the nearest valid grid data.
+        fill_x, fill_y = np.append(x, [-6, -4.02]), np.append(y, [50, 50.05])
+        masked = np.ma.masked_where(coarse_lon > -4.5, data[2])
+        regridder = RegularRegridder(lon, lat, fill_x, fill_y, np.tile(np.linspace(5, 45, 4), (17, 1)))
+        valid = ~np.ma.getmaskarray(masked).ravel()
+        valid_points = np.column_stack((coarse_lon.ravel(), coarse_lat.ravel()))[valid]
+        valid_values = masked.compressed()
+        unfilled = regridder.horizontal(masked, fill=False)
+        self.assertTrue(np.isnan(unfilled[-2:]).all())
+        for neighbours in (1, 8, valid.sum()):
+            filled = regridder.horizontal(masked, neighbours=neighbours)
+            for i in np.flatnonzero(np.isnan(unfilled)):
+                distance = np.hypot(valid_points[:, 0] - fill_x[i], valid_points[:, 1] - fill_y[i])
+                nearest = np.argsort(distance)[:neighbours]
+                weight = 1 / distance[nearest]
+                test.assert_almost_equal(filled[i], (weight * valid_values[nearest]).sum() / weight.sum())
+            test.assert_equal(filled[~np.isnan(unfilled)], unfilled[~np.isnan(unfilled)])
+
+    def test_linear_interpolation_weights(self):
+        rng = np.random.RandomState(1)
+        points = rng.uniform(0, 10, (200, 2))
+        data = rng.rand(200, 3)
+        targets = np.column_stack((np.linspace(-1, 11, 50), np.linspace(11, -1, 50)))
+        weights, outside = linear_interpolation_weights(points, targets)
+        interpolated = weights @ data
+        for field in range(data.shape[-1]):
+            known = LinearNDInterpolator(points, data[:, field])(targets)
+            test.assert_equal(np.isnan(known), outside)
+            test.assert_almost_equal(interpolated[~outside, field], known[~outside])
@@ -0,0 +1,112 @@
+import os
+import tempfile
+
+import numpy.testing as test
+import numpy as np
+
+from unittest import TestCase
+
+import PyFVCOM.plot
+from PyFVCOM.grid import Domain, write_sms_mesh
+from PyFVCOM.plot import Plotter, _outside_mesh
+
+
+class PlotterTest(TestCase):
+
+    def setUp(self):
+        self.lon, self.lat, self.triangles = _prep()
+        self.grid = tempfile.NamedTemporaryFile(mode='w', suffix='.2dm', delete=False)
+        write_sms_mesh(self.triangles, np.arange(len(self.lon)) + 1, self.lon, self.lat, np.full(len(self.lon), 20.0),
+                       np.zeros(len(self.lon)), self.grid.name)
+        self.domain = Domain(self.grid.name, native_coordinates='spherical')
+        # Start each test with an empty land mask cache.
+        self._masks = PyFVCOM.plot._regular_grid_masks.copy()
+        PyFVCOM.plot._regular_grid_masks.clear()
+
+    def tearDown(self):
+        os.remove(self.grid.name)
+        PyFVCOM.plot._regular_grid_masks.clear()
+        PyFVCOM.plot._regular_grid_masks.update(self._masks)
+
+    def _plotter(self, cartesian=False):
+        # Cartesian plots don't use a map projection.
+        mapper = 'basemap' if cartesian else 'cartopy'
+        return Plotter(self.domain, mapper=mapper, coast=False, add_coast=False, res='110m', cartesian=cartesian)
+
+    def test_outside_mesh(self):
+        sample_x, sample_y = np.meshgrid(np.linspace(-5.2, -2.8, 37), np.linspace(49.9, 51.1, 23))
+        outside = _outside_mesh(self.domain.grid.lon, self.domain.grid.lat, self.domain.grid.triangles,
+                                sample_x, sample_y)
+        # The same as checking each point in turn.
+        known = np.asarray([not self.domain.in_domain(x, y) for x, y in zip(sample_x.ravel(), sample_y.ravel())])
+        test.assert_equal(outside, known.reshape(sample_x.shape))
+        # We've got points in the sea, on the island and outside the domain.
+        self.assertTrue(outside[11, 18])
+        self.assertFalse(outside[11, 10])
+        self.assertTrue(outside[0, 0])
+
+    def test_regular_grid_mask(self):
+        for cartesian in (False, True):
+            plot = self._plotter(cartesian=cartesian)
+            plot._make_regular_grid(5000, 5000)
+            if cartesian:
+                node_x, node_y = self.domain.grid.x, self.domain.grid.y
+            else:
+                node_x, node_y = self.domain.grid.lon, self.domain.grid.lat
+            known = np.asarray([not self.domain.in_domain(x, y, cartesian=cartesian)
+                                for x, y in zip(plot._regular_x.data.ravel(), plot._regular_y.data.ravel())])
+            test.assert_equal(plot._mask_for_regular, known.reshape(plot._regular_x.shape))
+            test.assert_equal(plot._mask_for_regular,
+                              _outside_mesh(node_x, node_y, self.domain.grid.triangles, plot._regular_x.data,
+                                            plot._regular_y.data))
+            self.assertTrue(plot._mask_for_regular.any() and not plot._mask_for_regular.all())
+        self.assertEqual(len(PyFVCOM.plot._regular_grid_masks), 2)
+
+        # A new plot of the same grid and sample points reuses the mask.
+        first = self._plotter()
+        first._make_regular_grid(5000, 5000)
+        second = self._plotter()
+        second._make_regular_grid(5000, 5000)
+        self.assertIs(second._mask_for_regular, first._mask_for_regular)
+        self.assertEqual(len(PyFVCOM.plot._regular_grid_masks), 2)
+
+        # Different sample points get their own mask.
+        third = self._plotter()
+        third._make_regular_grid(7500, 7500)
+        self.assertIsNot(third._mask_for_regular, first._mask_for_regular)
+        self.assertNotEqual(third._mask_for_regular.shape, first._mask_for_regular.shape)
+        self.assertEqual(len(PyFVCOM.plot._regular_grid_masks), 3)
+
+
+def _prep():
+    """
+    Make a small mesh with an island and a notch cut out of one corner.
+
+    Returns
+    -------
+    lon, lat : np.ndarray
+        The node positions.
+    triangles : np.ndarray
+        The triangulation table (zero-indexed).
+
+    """
+
+    lon, lat = np.meshgrid(np.linspace(-5, -3, 21), np.linspace(50, 51, 11))
+    triangles = []
+    for row in range(lat.shape[0] - 1):
+        for column in range(lon.shape[1] - 1):
+            centre_x, centre_y = lon[0, column] + 0.05, lat[row, 0] + 0.05
+            # Skip the island and the notch.
+            if (-4.3 < centre_x < -3.9 and 50.3 < centre_y < 50.7) or (centre_x > -3.6 and centre_y > 50.6):
+                continue
+            corner = row * lon.shape[1] + column
+            triangles.append([corner, corner + 1, corner + lon.shape[1] + 1])
+            triangles.append([corner, corner + lon.shape[1] + 1, corner + lon.shape[1]])
+    triangles = np.asarray(triangles)
+
+    # Drop the nodes which aren't in any element.
+    used = np.unique(triangles)
+    renumber = np.full(lon.size, -1)
+    renumber[used] = np.arange(len(used))
+
+    return lon.ravel()[used], lat.ravel()[used], renumber[triangles]
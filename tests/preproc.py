@@ -8,8 +8,12 @@ from unittest import TestCase
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
-from PyFVCOM.preproc import Model
-from PyFVCOM.grid import write_sms_mesh
+from matplotlib.tri import LinearTriInterpolator, Triangulation
+from netCDF4 import Dataset
+from scipy.interpolate import RegularGridInterpolator
+
+from PyFVCOM.preproc import Model, NEMOReader, WriteForcing, _bilinear_weights
+from PyFVCOM.grid import write_sms_mesh, control_volumes, grid_cache, get_boundary_polygons
 from PyFVCOM.utilities.time import date_range
 
 
@@ -88,6 +92,155 @@ class PreProcessingTest(TestCase):
         test.assert_equal(self.model.river.temperature, temperature)
         test.assert_equal(self.model.river.salinity, salinity)
 
+    def test_calculate_control_area_and_volume_cached(self):
+        art1, art2 = control_volumes(self.model.grid.x, self.model.grid.y, self.model.grid.triangles)
+        cache_dir = grid_cache.cache_dir
+        try:
+            with tempfile.TemporaryDirectory() as grid_cache.cache_dir:
+                for _ in range(2):  # compute and then fetch from the cache
+                    self.model.calculate_control_area_and_volume()
+                    test.assert_almost_equal(self.model.grid.art1, art1)
+                    test.assert_almost_equal(self.model.grid.art2, art2)
+                # Partial calculations shouldn't use the cache.
+                del self.model.grid.art1, self.model.grid.art2
+                self.model.calculate_control_area_and_volume(element_control=False)
+                test.assert_almost_equal(self.model.grid.art1, art1)
+                self.assertFalse(hasattr(self.model.grid, 'art2'))
+                self.model.calculate_control_area_and_volume(node_control=False)
+                test.assert_almost_equal(self.model.grid.art2, art2)
+        finally:
+            grid_cache.cache_dir = cache_dir
+
+    def test_locate(self):
+        grid = self.model.grid
+        # Element centres, the first node of some elements and some positions outside the grid.
+        inside = np.column_stack((grid.lonc[::7], grid.latc[::7]))
+        nodes = np.column_stack((grid.lon[grid.triangles[::11, 0]], grid.lat[grid.triangles[::11, 0]]))
+        outside = np.array(((1.0, 1.0), (-1.0, 0.5)))
+        positions = np.row_stack((inside, nodes, outside))
+        elements, weights = self.model.locate(positions[:, 0], positions[:, 1])
+
+        test.assert_equal(elements[-len(outside):], -1)
+        self.assertTrue(np.all(np.isnan(weights[-len(outside):])))
+        test.assert_equal(elements[:len(inside)], np.arange(len(grid.lonc))[::7])
+        for (x, y), element in zip(positions[:-len(outside)], elements[:-len(outside)]):
+            self.assertTrue(self.model.in_element(x, y, element))
+        test.assert_almost_equal(weights[:-len(outside)].sum(axis=1), 1)
+
+        # Interpolating a linear field with the weights should match matplotlib.
+        field = 3 * grid.lon - 2 * grid.lat
+        interpolated = np.sum(field[grid.triangles[elements]] * weights, axis=1)
+        interpolator = LinearTriInterpolator(Triangulation(grid.lon, grid.lat, grid.triangles), field)
+        expected = interpolator(positions[:, 0], positions[:, 1])
+        test.assert_almost_equal(interpolated[:-len(outside)], expected[:-len(outside)])
+        self.assertTrue(np.all(expected.mask[-len(outside):]))
+
+    def test_write_nested_forcing_blocks(self):
+        self.model.add_sigma_coordinates(self.sigma.name)
+        self.model.grid.open_boundary_nodes = [get_boundary_polygons(self.model.grid.triangles)[0][:6].tolist()]
+        self.model._initialise_open_boundaries()
+        self.model.add_nests(2)
+        rng = np.random.default_rng(0)
+        times, layers = len(self.model.time.datetime), self.model.dims.layers
+        for nest in self.model.open_boundaries[0].nest:
+            for name in ('zeta', 'temp', 'salinity'):
+                shape = (times, len(nest.nodes)) if name == 'zeta' else (times, layers, len(nest.nodes))
+                setattr(nest.data, name, rng.normal(size=shape))
+            if np.any(nest.elements):
+                for name in ('ua', 'va', 'u', 'v'):
+                    shape = (times, len(nest.elements)) if name in ('ua', 'va') else (times, layers, len(nest.elements))
+                    setattr(nest.data, name, rng.normal(size=shape))
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            whole = os.path.join(output_dir, 'whole.nc')
+            blocks = os.path.join(output_dir, 'blocks.nc')
+            self.model.write_nested_forcing(whole, type=3)
+            self.model.write_nested_forcing(blocks, type=3, block_size=7)
+            with Dataset(whole) as expected, Dataset(blocks) as written:
+                self.assertEqual(set(written.variables), set(expected.variables))
+                for name in ('weight_node', 'weight_cell', 'zeta', 'temp', 'u', 'ua', 'hyw'):
+                    self.assertIn(name, written.variables)
+                for name in expected.variables:
+                    test.assert_equal(written[name][:], expected[name][:])
+                self.assertEqual(written['temp'].chunking()[0], 7)
+
+                # The nests are written one after the other, nodes from all the nests and elements from the nests
+                # which have them (i.e. not the last).
+                nests = self.model.open_boundaries[0].nest
+                element_nests = [nest for nest in nests if np.any(nest.elements)]
+                nodes = np.concatenate([nest.nodes for nest in nests])
+                elements = np.concatenate([nest.elements for nest in element_nests])
+                known = {'weight_node': np.tile(np.concatenate([nest.weight_node for nest in nests]), (times, 1)),
+                         'weight_cell': np.tile(np.concatenate([nest.weight_element for nest in element_nests]),
+                                                (times, 1)),
+                         'hyw': np.zeros((times, self.model.dims.levels, len(nodes))),
+                         'lon': self.model.grid.lon[nodes],
+                         'latc': self.model.grid.latc[elements]}
+                for name in ('zeta', 'temp', 'salinity'):
+                    known[name] = np.concatenate([getattr(nest.data, name) for nest in nests], axis=-1)
+                for name in ('ua', 'va', 'u', 'v'):
+                    known[name] = np.concatenate([getattr(nest.data, name) for nest in element_nests], axis=-1)
+                for name in known:
+                    test.assert_allclose(written[name][:], known[name], rtol=1e-6)
+
+                # Spot check a few values against the nests directly.
+                first, second = len(nests[0].nodes), len(nests[0].nodes) + len(nests[1].nodes)
+                test.assert_allclose(written['zeta'][4, first + 2], nests[1].data.zeta[4, 2], rtol=1e-6)
+                test.assert_allclose(written['temp'][9, 3, second + 1], nests[2].data.temp[9, 3, 1], rtol=1e-6)
+                test.assert_allclose(written['salinity'][0, 0, 5], nests[0].data.salinity[0, 0, 5], rtol=1e-6)
+                test.assert_allclose(written['ua'][7, len(nests[0].elements)], nests[1].data.ua[7, 0], rtol=1e-6)
+                test.assert_allclose(written['v'][-1, -1, -1], element_nests[-1].data.v[-1, -1, -1], rtol=1e-6)
+                self.assertEqual(written.dimensions['node'].size, 15)
+                self.assertEqual(written.dimensions['nele'].size, 13)
+
+    def test_interp_sst_assimilation_streamed(self):
+        rng = np.random.default_rng(0)
+        sst_lon, sst_lat = np.linspace(-7, 2, 13), np.linspace(49.5, 59, 11)
+        with tempfile.TemporaryDirectory() as sst_dir:
+            os.mkdir(os.path.join(sst_dir, '2015'))
+            # Include two files for the same day.
+            for day, name in ((3, 'a'), (5, 'a'), (5, 'b'), (9, 'a')):
+                with Dataset(os.path.join(sst_dir, '2015', '201501{:02d}-{}.nc'.format(day, name)), 'w') as sst:
+                    sst.createDimension('time', 1)
+                    sst.createDimension('lat', len(sst_lat))
+                    sst.createDimension('lon', len(sst_lon))
+                    sst.createVariable('lon', 'f8', ['lon'])[:] = sst_lon
+                    sst.createVariable('lat', 'f8', ['lat'])[:] = sst_lat
+                    time = sst.createVariable('time', 'f8', ['time'])
+                    time.units = 'days since 2015-01-01 00:00:00'
+                    time[:] = day - 1
+                    data = np.ma.masked_array(rng.uniform(280, 290, (1, len(sst_lat), len(sst_lon))))
+                    data[:, :3, :3] = np.ma.masked  # some land
+                    sst.createVariable('analysed_sst', 'f8', ['time', 'lat', 'lon'], fill_value=-999)[:] = data
+
+            self.model.interp_sst_assimilation(sst_dir, serial=True)
+            in_memory = self.model.sst.sst
+            times = self.model.sst.time
+            self.assertEqual(len(times), 4)
+            self.assertTrue(np.any(np.isnan(in_memory)) and np.any(np.isfinite(in_memory)))
+            expected = os.path.join(sst_dir, 'expected.nc')
+            self.model.write_sstgrd(expected)
+
+            streamed = os.path.join(sst_dir, 'streamed.nc')
+            self.model.interp_sst_assimilation(sst_dir, serial=True, output_file=streamed)
+            test.assert_equal(self.model.sst.time, times)
+            with Dataset(expected) as expected, Dataset(streamed) as streamed:
+                self.assertEqual(set(streamed.variables), set(expected.variables))
+                for name in expected.variables:
+                    test.assert_equal(streamed[name][:], expected[name][:])
+
+    def test_bilinear_weights(self):
+        rng = np.random.default_rng(0)
+        x, y = np.cumsum(rng.uniform(0.5, 1, 7)), np.cumsum(rng.uniform(0.5, 1, 5))
+        positions = np.column_stack((rng.uniform(x[0], x[-1], 50), rng.uniform(y[0], y[-1], 50)))
+        positions[:2] = ((x[0], y[0]), (x[-1], y[-1]))  # the corners
+        data = rng.normal(size=(len(y), len(x)))
+        interpolator = RegularGridInterpolator((y, x), data, method='linear')
+        weights = _bilinear_weights(x, y, positions)
+        test.assert_almost_equal(weights @ data.ravel(), interpolator(positions[:, ::-1]))
+        with self.assertRaises(ValueError):
+            _bilinear_weights(x, y, [[x[0] - 1, y[0]]])
+
     def test_add_probes(self):
         positions = [[-5, 50], [-8, 60]]
         names = ['probe1', 'probe2']
@@ -96,11 +249,71 @@ class PreProcessingTest(TestCase):
         # Need sigma coordinates for this.
         self.model.add_sigma_coordinates(self.sigma.name)
         self.model.add_probes(positions, names, variables, interval)
-        test.assert_equal(self.model.probes.grid, [[8, 8, 67], [72, 72, 30]])
+        test.assert_equal(self.model.probes.grid, [[8, 8, 67], [77, 77, 34]])
         test.assert_equal(self.model.probes.variables, [variables] * len(names))
         test.assert_equal(self.model.probes.interval, interval)
 
 
+class WriteForcingTest(TestCase):
+
+    def test_append(self):
+        times = date_range(datetime(2015, 1, 1), datetime(2015, 1, 2), inc=1 / 24)
+        data = np.random.RandomState(0).rand(len(times), 5)
+        with tempfile.NamedTemporaryFile(suffix='.nc') as output:
+            with WriteForcing(output.name, {'node': 5, 'time': 0, 'DateStrLen': 26}) as forcing:
+                forcing.add_variable('zeta', None, ['time', 'node'], format='f8')
+                forcing.add_variable('h', np.arange(5), ['node'])
+                for block in np.array_split(np.arange(len(times)), 4):
+                    forcing.write_fvcom_time(times[block])
+                    forcing.append('zeta', data[block])
+                with self.assertRaises(ValueError):
+                    forcing.append('h', np.arange(5))
+            with Dataset(output.name) as ds:
+                test.assert_equal(ds.variables['zeta'][:], data)
+                test.assert_allclose(ds.variables['Itime2'][:], np.arange(len(times)) % 24 * 3600000, atol=1)
+                test.assert_equal(ds.variables['Itime'][:], [57023] * 24 + [57024])
+                test.assert_equal(len(ds.variables['Times']), len(times))
+
+
+class NEMOReaderTest(TestCase):
+
+    def test_unstructured_triangulation(self):
+        x, y = np.meshgrid(np.linspace(-5, 0, 40), np.linspace(50, 53, 30))
+        # Some blobs of land and a scattering of single land points to make awkward coastlines.
+        rng = np.random.default_rng(0)
+        mask = np.ones(x.shape, dtype=bool)
+        for centre_x, centre_y, radius in ((-4, 51, 0.8), (-1, 52.5, 0.6), (-2.5, 50, 0.5)):
+            mask[np.hypot(x - centre_x, (y - centre_y) * 1.5) < radius] = False
+        mask[rng.uniform(size=x.shape) < 0.05] = False
+
+        original_indices, triangles = NEMOReader._unstructured_triangulation(x, y, mask)
+
+        # The nodes are sea points from the regular grid in order and are all used.
+        self.assertTrue(np.all(mask.ravel()[original_indices]))
+        self.assertTrue(np.all(np.diff(original_indices) > 0))
+        self.assertLess(len(original_indices), mask.sum())
+        counts = np.bincount(triangles.ravel(), minlength=len(original_indices))
+        self.assertEqual(len(counts), len(original_indices))
+        # No node is in fewer than two elements and no node joins two elements at a single point.
+        self.assertTrue(np.all(counts >= 2))
+        for node in np.flatnonzero(counts == 2):
+            first, second = triangles[np.any(triangles == node, axis=1)]
+            self.assertGreater(len(np.intersect1d(first, second)), 1)
+
+        cache_dir = grid_cache.cache_dir
+        try:
+            with tempfile.TemporaryDirectory() as grid_cache.cache_dir:
+                grid_cache.reset_counters()
+                for _ in range(2):  # compute and then fetch from the cache
+                    cached_indices, cached_triangles = NEMOReader._unstructured_triangulation(x, y, mask)
+                    test.assert_equal(cached_indices, original_indices)
+                    test.assert_equal(cached_triangles, triangles)
+                test.assert_equal((grid_cache.hits, grid_cache.misses), (1, 1))
+        finally:
+            grid_cache.cache_dir = cache_dir
+            grid_cache.reset_counters()
+
+
 def _prep():
     """
     Make some input data (a grid and a time range).
@@ -8,7 +8,7 @@ from unittest import TestCase
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
-from PyFVCOM.read import FileReader
+from PyFVCOM.read import FileReader, MultiFileReader
 from PyFVCOM.grid import nodes2elems
 from PyFVCOM.coordinate import utm_from_lonlat
 from PyFVCOM.utilities.time import date_range
@@ -506,6 +506,125 @@ class FileReader_test(TestCase):
         test.assert_equal(F.time.datetime, all_times)
         test.assert_equal(F.data.ww, all_data)
 
+    def test_lazy_variable(self):
+        F = FileReader(self.stub.ncfile.name, variables=['temp', 'zeta'], lazy=True, chunk_size=5, cache_size=2)
+        nodes = [10, 3, 3, 50]
+        test.assert_equal(F.data.temp.shape, self.reference.data.temp.shape)
+        test.assert_equal(F.data.temp[7, :, nodes], self.reference.data.temp[7, :, nodes])
+        test.assert_equal(F.data.temp[3:19, -1, nodes], self.reference.data.temp[3:19, -1, nodes])
+        test.assert_equal(F.data.zeta[::-7, 20], self.reference.data.zeta[::-7, 20])
+        test.assert_equal(np.asarray(F.data.zeta), self.reference.data.zeta)
+
+    def test_lazy_variable_with_dims(self):
+        dims = {'siglay': [2, 5], 'node': [0, 1, 2, 3, 66, 67], 'time': np.arange(10, 60)}
+        F = FileReader(self.stub.ncfile.name, variables=['temp'], dims=dims, lazy=True, chunk_size=7)
+        G = FileReader(self.stub.ncfile.name, variables=['temp'], dims=dims)
+        test.assert_equal(F.data.temp.shape, G.data.temp.shape)
+        test.assert_equal(F.data.temp[..., [4, 1]], G.data.temp[..., [4, 1]])
+        test.assert_equal(F.data.temp[-1, 1, 2], G.data.temp[-1, 1, 2])
+
+    def test_multi_file_reader(self):
+        # Two files which share a time step at the join, given in the wrong order.
+        middle = self.starttime + relativedelta(days=14)
+        stubs = [StubFile(self.starttime, middle, self.interval, lon=self.lon, lat=self.lat,
+                          triangles=self.triangles, zone='30N'),
+                 StubFile(middle, self.endtime, self.interval, lon=self.lon, lat=self.lat,
+                          triangles=self.triangles, zone='30N')]
+        files = [stub.ncfile.name for stub in stubs]
+        try:
+            F = MultiFileReader(files[::-1], variables=['temp', 'zeta'], chunk_size=5)
+            first = FileReader(files[0], variables=['temp', 'zeta'])
+            second = FileReader(files[1], variables=['temp', 'zeta'])
+            # The duplicated time comes from the first file in the list we gave.
+            test_datetime = np.concatenate((first.time.datetime[:-1], second.time.datetime))
+            test_temp = np.concatenate((first.data.temp[:-1], second.data.temp))
+            test_zeta = np.concatenate((first.data.zeta[:-1], second.data.zeta))
+            test.assert_equal(F.time.datetime, test_datetime)
+            test.assert_equal(F.dims.time, len(test_datetime))
+            test.assert_equal(F.data.temp.shape, test_temp.shape)
+            test.assert_equal(F.data.temp[:, 2, [5, 1]], test_temp[:, 2, [5, 1]])
+            test.assert_equal(F.data.temp[330:340, :, 7], test_temp[330:340, :, 7])
+            test.assert_equal(np.asarray(F.data.zeta), test_zeta)
+
+            # Whole time series for blocks of layers and positions.
+            layers = list(F.data.temp.iter_layers(layers_per_read=4, positions_per_read=7))
+            test.assert_equal(len(layers), test_temp.shape[1] * int(np.ceil(test_temp.shape[2] / 7)))
+            for layer, positions, data in layers:
+                test.assert_equal(data, test_temp[:, layer, positions])
+            (layer, positions, data), = F.data.zeta.iter_layers()
+            test.assert_equal((layer, positions), (0, slice(0, test_zeta.shape[1])))
+            test.assert_equal(data, test_zeta)
+
+            G = MultiFileReader(files, variables=['zeta'], dims={'time': np.arange(300, 400), 'node': [3, 9]})
+            test_zeta = np.concatenate((first.data.zeta, second.data.zeta[1:]))[300:400][:, [3, 9]]
+            test.assert_equal(G.data.zeta[:], test_zeta)
+        finally:
+            for stub in stubs:
+                stub.ncfile.close()
+                os.remove(stub.ncfile.name)
+
+    def test_time_average(self):
+        F = FileReader(self.stub.ncfile.name)
+        times = F.time_average('temp', 'daily', return_times=True)
+        # Daily means of the whole days in the (hourly) time series.
+        days = np.array([i.date() for i in self.reference.time.datetime])
+        whole_days = np.unique(days)[1:-1]
+        test_temp = np.asarray([self.reference.data.temp[days == day].mean(axis=0) for day in whole_days])
+        test.assert_almost_equal(F.data.temp_daily, test_temp, decimal=5)
+        test.assert_equal([i.date() for i in times], whole_days)
+        test.assert_equal([i.hour for i in times], [12] * len(times))
+        self.assertFalse(hasattr(F.data, 'temp'))
+
+        ncfile = tempfile.NamedTemporaryFile(suffix='.nc', delete=False).name
+        try:
+            F.write_time_average(ncfile, ['temp', 'zeta'], 'daily', chunk_size=7)
+            averaged = FileReader(ncfile, variables=['temp'])
+            test.assert_almost_equal(averaged.data.temp, test_temp, decimal=5)
+            test.assert_equal(averaged.time.datetime, times)
+            averaged.ds.close()
+
+            F.write_time_average(ncfile, 'zeta', 'monthly', complete=False)
+            with Dataset(ncfile) as ds:
+                months = np.array([i.month for i in self.reference.time.datetime])
+                test.assert_equal(ds.variables['samples'][:], [np.sum(months == 2), np.sum(months == 3)])
+                test.assert_almost_equal(ds.variables['zeta'][0], self.reference.data.zeta[months == 2].mean(axis=0),
+                                         decimal=5)
+        finally:
+            os.remove(ncfile)
+
+    def test_total_volume_var(self):
+        self.reference._get_cv_volumes()
+        test_total = np.sum(self.reference.data.temp * self.reference.grid.depth_volume, axis=(1, 2))
+        F = FileReader(self.stub.ncfile.name)
+        F.total_volume_var('temp', chunk_size=50)
+        test.assert_allclose(F.data.temp_total, test_total, rtol=1e-6)
+        # Two regions which cover the domain add up to the total.
+        regions = np.zeros((2, F.dims.node), dtype=bool)
+        regions[0, :30] = True
+        regions[1, 30:] = True
+        F.total_volume_var('temp', regions=regions, chunk_size=7)
+        test.assert_equal(F.data.temp_total.shape, (F.dims.time, 2))
+        test.assert_allclose(F.data.temp_total.sum(axis=1), test_total, rtol=1e-6)
+
+    def test_avg_volume_var(self):
+        self.reference._get_cv_volumes()
+        # The volume-weighted mean through the water column at each node, summed over the nodes.
+        node_average = np.average(self.reference.data.temp, weights=np.broadcast_to(self.reference.grid.depth_volume,
+                                                                                    self.reference.data.temp.shape),
+                                  axis=1)
+        test_average = node_average.sum(axis=1)
+        F = FileReader(self.stub.ncfile.name)
+        F.avg_volume_var('temp', chunk_size=50)
+        test.assert_allclose(F.data.temp_average, test_average, rtol=1e-6)
+        # Each region only includes its own nodes.
+        regions = np.zeros((2, F.dims.node), dtype=bool)
+        regions[0, :30] = True
+        regions[1, 30:] = True
+        F.avg_volume_var('temp', regions=regions, chunk_size=7)
+        test.assert_equal(F.data.temp_average.shape, (F.dims.time, 2))
+        test.assert_allclose(F.data.temp_average[:, 0], node_average[:, :30].sum(axis=1), rtol=1e-6)
+        test.assert_allclose(F.data.temp_average[:, 1], node_average[:, 30:].sum(axis=1), rtol=1e-6)
+
     def test_get_time_with_string(self):
         time_dims = ['2001-02-12 09:00:00.00000', '2001-02-14 12:00:00.00000']
         returned_indices = np.arange(26, 77)
@@ -79,3 +79,92 @@ class TideTest(TestCase):
         test.assert_almost_equal(filtered, self.test_signal)
 
 
+
+    def test_harmonic_analysis(self):
+        import utide
+
+        constit = ['M2', 'S2', 'K1', 'O1', 'M4']
+        times = np.arange(0, 30, 1 / 24) + 730000
+        latitudes = np.array([50.1, 50.4, np.nan, 52.7])
+        series = np.array([make_signal(times, self.amplitude * (i + 1), self.phase + i * 10, self.period)
+                           for i in range(len(latitudes))])
+        series[1, 100:110] = np.nan  # gappy series are handled separately
+
+        harmonics = harmonic_analysis(times, series, latitudes, constit, epoch='python', lat_resolution=None)
+        test.assert_equal(harmonics.shape, (len(latitudes), 2, len(constit)))
+        self.assertTrue(np.all(np.isnan(harmonics[2])))
+        for i in (0, 1, 3):
+            res = utide.solve(times, series[i], lat=latitudes[i], method='ols', constit=constit, epoch='python',
+                              verbose=False)
+            order = [res['name'].tolist().index(c) for c in constit]
+            test.assert_almost_equal(harmonics[i, 0], res['g'][order], decimal=6)
+            test.assert_almost_equal(harmonics[i, 1], res['A'][order], decimal=6)
+
+    def test_harmonic_prediction(self):
+        import utide
+
+        constit = ['M2', 'S2', 'K1', 'O1', 'M4']
+        times = np.arange(0, 30, 1 / 24) + 730000
+        latitudes = np.array([50.1, np.nan, 2, -52.7])
+        amplitudes = np.array([[2, 1, 0.5, 0.3, 0.1]]) * np.arange(1, len(latitudes) + 1)[:, np.newaxis]
+        phases = np.array([[10, 50, 100, 200, 300]]) + np.arange(len(latitudes))[:, np.newaxis] * 15
+
+        predicted = harmonic_prediction(times, amplitudes, phases, latitudes, constit, mean=0.5, epoch='python',
+                                        chunk_size=100)
+        test.assert_equal(predicted.shape, (len(latitudes), len(times)))
+        self.assertTrue(np.all(np.isnan(predicted[1])))
+        names = utide.harmonics.const.name.tolist()
+        lind = np.asarray([names.index(c) for c in constit])
+        for i in (0, 2, 3):
+            coef = utide.utilities.Bunch(name=constit, mean=0.5, slope=0, A=amplitudes[i], g=phases[i],
+                                         A_ci=np.zeros(len(constit)), g_ci=np.zeros(len(constit)))
+            coef['aux'] = utide.utilities.Bunch(reftime=times.mean(), lind=lind, frq=utide.harmonics.const.freq[lind],
+                                                lat=latitudes[i])
+            coef['aux']['opt'] = utide.utilities.Bunch(twodim=False, nodsatlint=False, nodsatnone=False,
+                                                       gwchlint=False, gwchnone=False, notrend=True, prefilt=[],
+                                                       nodiagn=True)
+            expected = utide.reconstruct(times, coef, epoch='python', verbose=False)['h']
+            test.assert_almost_equal(predicted[i], expected, decimal=10)
+
+    def test_shared_harmonic_analysis(self):
+        from PyFVCOM.tide import _SharedHarmonicAnalysis
+
+        constit = ['M2', 'S2', 'K1', 'O1']
+        times = np.arange(0, 30, 1 / 24) + 730000
+        latitudes = np.array([50.1, 50.4, np.nan, 52.7, 49.3])
+        series = np.array([[make_signal(times, self.amplitude * (i + j + 1), self.phase + i * 10, self.period)
+                            for i in range(len(latitudes))] for j in range(2)])
+        series[1, 3, 100:110] = np.nan
+
+        harmonics = np.full((2, len(latitudes), 2, len(constit)), np.nan)
+        predicted = np.full(series.shape, np.nan)
+        with _SharedHarmonicAnalysis(times, latitudes, constit, nlayers=2, predict=True, epoch='python') as analysis:
+            analysis.data[:] = series
+            for layer, positions, harm, pred in analysis.run(pool_size=2, block_size=2):
+                harmonics[layer, positions] = harm
+                predicted[layer, positions] = pred
+
+        for layer in range(2):
+            expected, expected_predicted = harmonic_analysis(times, series[layer], latitudes, constit, predict=True,
+                                                             epoch='python')
+            test.assert_almost_equal(harmonics[layer], expected)
+            test.assert_almost_equal(predicted[layer], expected_predicted)
+
+    def test_whole_layers(self):
+        from PyFVCOM.tide import _whole_layers
+
+        data = np.random.RandomState(0).rand(10, 5, 23)  # [time, layer, position]
+
+        def blocks(layers_per_read, positions_per_read):
+            # The same order as PyFVCOM.read._LazyVariable.iter_layers.
+            for layer_start in range(0, data.shape[1], layers_per_read):
+                for position_start in range(0, data.shape[2], positions_per_read):
+                    positions = slice(position_start, min(position_start + positions_per_read, data.shape[2]))
+                    for layer in range(layer_start, min(layer_start + layers_per_read, data.shape[1])):
+                        yield layer, positions, data[:, layer, positions]
+
+        for layers_per_read, positions_per_read in ((5, 23), (1, 23), (2, 7), (5, 1)):
+            layers = list(_whole_layers(blocks(layers_per_read, positions_per_read), data.shape[2]))
+            test.assert_equal([layer for layer, _ in layers], np.arange(data.shape[1]))
+            for layer, layer_data in layers:
+                test.assert_equal(layer_data, data[:, layer, :])